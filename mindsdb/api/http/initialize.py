@@ -235,6 +235,8 @@ def initialize_app(config, no_studio):
     @app.teardown_appcontext
     def remove_session(*args, **kwargs):
         db.session.remove()
+        # return connections to integrations to the pool
+        integration_controller.handlers_cache.release()
 
     @app.before_request
     def before_request():
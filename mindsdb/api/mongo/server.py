@@ -295,6 +295,7 @@ class MongoRequestHandler(SocketServer.BaseRequestHandler):
             if answer is not None:
                 self.request.send(answer)
 
+            integration_controller.handlers_cache.release()
             db.session.close()
 
     def get_answer(self, request_id, opcode, msg_bytes):
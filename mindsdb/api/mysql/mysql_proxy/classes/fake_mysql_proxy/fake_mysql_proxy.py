@@ -12,6 +12,9 @@ class Dummy:
 
 
 class FakeMysqlProxy(MysqlProxy):
+    # result is returned as a whole (http api), it can't be streamed
+    stream_results = False
+
     def __init__(self):
         request = Dummy()
         client_address = ['', '']
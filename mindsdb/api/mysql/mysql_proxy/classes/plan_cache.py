@@ -0,0 +1,118 @@
+"""
+Cache of parsed SQL statements and of metadata which is used for planning of queries.
+
+Parsing of statement is the most expensive part of the query preparation and the result
+depends only on the text of statement: parsed AST is cached by text.
+
+Metadata for planner (list of databases, models used in query) is cached by:
+ - tables used in the query
+ - current database of session
+ - company_id
+ - generation of metadata: fingerprint of models, integrations and projects records.
+   It changes when any of them is created, changed or deleted (in any process)
+
+Configuration in mindsdb config:
+    "plan_cache": {
+        "max_size": 1000  # max count of records of every type, 0 disables cache
+    }
+"""
+
+import copy
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import func, select
+
+from mindsdb_sql import parse_sql
+
+import mindsdb.interfaces.storage.db as db
+from mindsdb.utilities.config import Config
+from mindsdb.utilities.context import context as ctx
+
+
+class PlanCache:
+    def __init__(self, max_size=None):
+        self._max_size = max_size
+        self.statements = OrderedDict()
+        self.plans = OrderedDict()
+        self.lock = threading.Lock()
+        self.statistic = {
+            'parse_hits': 0,
+            'parse_misses': 0,
+            'plan_hits': 0,
+            'plan_misses': 0
+        }
+
+    @property
+    def max_size(self):
+        if self._max_size is None:
+            self._max_size = Config().get('plan_cache', {}).get('max_size', 1000)
+        return self._max_size
+
+    def _get(self, storage, key, stat_name):
+        with self.lock:
+            value = storage.get(key)
+            if value is None:
+                self.statistic[f'{stat_name}_misses'] += 1
+            else:
+                storage.move_to_end(key)
+                self.statistic[f'{stat_name}_hits'] += 1
+            return value
+
+    def _set(self, storage, key, value):
+        if self.max_size <= 0:
+            return
+        with self.lock:
+            storage[key] = value
+            storage.move_to_end(key)
+            while len(storage) > self.max_size:
+                storage.popitem(last=False)
+
+    def parse(self, sql: str, dialect: str = 'mindsdb'):
+        """ Parse sql statement, returns copy of cached AST if statement was parsed before """
+        key = (dialect, sql.strip())
+        query = self._get(self.statements, key, 'parse')
+        if query is None:
+            query = parse_sql(sql, dialect=dialect)
+            self._set(self.statements, key, query)
+        # AST can be changed by the caller
+        return copy.deepcopy(query)
+
+    @staticmethod
+    def get_metadata_generation():
+        """ Fingerprint of records which are used in planning: models, integrations, projects """
+        company_id = ctx.company_id
+        columns = []
+        for model in (db.Predictor, db.Integration, db.Project):
+            columns.append(select(func.count(model.id)).where(model.company_id == company_id).scalar_subquery())
+            columns.append(select(func.max(model.updated_at)).where(model.company_id == company_id).scalar_subquery())
+        return tuple(db.session.query(*columns).first())
+
+    def get_plan_key(self, query_tables: list, database: str):
+        """ Key of planner metadata for the list of tables used in query """
+        return (tuple(query_tables), database, ctx.company_id, self.get_metadata_generation())
+
+    def get_plan_metadata(self, key):
+        """ Get cached planner metadata, returns None if it is not cached """
+        value = self._get(self.plans, key, 'plan')
+        if value is None:
+            return None
+        return copy.deepcopy(value)
+
+    def set_plan_metadata(self, key, value: dict):
+        self._set(self.plans, key, copy.deepcopy(value))
+
+    def clear(self):
+        with self.lock:
+            self.statements.clear()
+            self.plans.clear()
+
+    def stats(self):
+        stats = dict(self.statistic)
+        for name in ('parse', 'plan'):
+            total = stats[f'{name}_hits'] + stats[f'{name}_misses']
+            stats[f'{name}_hit_rate'] = stats[f'{name}_hits'] / total if total > 0 else 0
+        return stats
+
+
+plan_cache = PlanCache()
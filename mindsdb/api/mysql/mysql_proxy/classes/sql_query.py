@@ -10,15 +10,16 @@
 """
 import copy
 import re
-import hashlib
+import itertools
 import datetime as dt
 from collections import defaultdict
+from multiprocessing.pool import ThreadPool
 
 import dateinfer
+import duckdb
 import pandas as pd
 import numpy as np
 
-from mindsdb_sql import parse_sql
 from mindsdb_sql.parser.ast import (
     BinaryOperation,
     UnaryOperation,
@@ -65,6 +66,7 @@ from mindsdb_sql.planner import query_planner
 from mindsdb_sql.planner.utils import query_traversal
 
 from mindsdb.api.mysql.mysql_proxy.utilities.sql import query_df, query_df_with_type_infer_fallback
+from mindsdb.api.mysql.mysql_proxy.classes.plan_cache import plan_cache
 from mindsdb.interfaces.model.functions import get_model_record
 from mindsdb.api.mysql.mysql_proxy.utilities import (
     ErKeyColumnDoesNotExist,
@@ -74,7 +76,9 @@ from mindsdb.api.mysql.mysql_proxy.utilities import (
     ErSqlWrongArguments
 )
 from mindsdb.interfaces.query_context.context_controller import query_context_controller
-from mindsdb.utilities.cache import get_cache, json_checksum
+from mindsdb.utilities.cache import get_cache, json_checksum, dataframe_checksum, str_checksum
+from mindsdb.utilities.config import Config
+from mindsdb.utilities.context import context as ctx
 import mindsdb.utilities.profiler as profiler
 from mindsdb.utilities.fs import create_process_mark, delete_process_mark
 
@@ -177,14 +181,119 @@ def replaceQueryVar(where, var_value, var_name):
             where.value = var_value
 
 
+def get_query_var_name(node):
+    """ returns name of variable if node is constant like '$var[name]', otherwise None """
+    if isinstance(node, Constant) and isinstance(node.value, str):
+        match = re.fullmatch(r'\$var\[(.+)\]', node.value)
+        if match is not None:
+            return match.group(1)
+    return None
+
+
+def split_query_vars(where):
+    """
+    Split WHERE condition of map-reduce substep to conditions 'column = $var[name]' and the rest conditions.
+    All conditions have to be joined by AND.
+
+    :param where: where condition of the query
+    :return: tuple (dict: variable name -> column identifier, list of the rest conditions),
+             None if variables are used in another way
+    """
+    def flatten(node):
+        if isinstance(node, BinaryOperation) and node.op.lower() == 'and':
+            return flatten(node.args[0]) + flatten(node.args[1])
+        return [node]
+
+    var_columns = {}
+    conditions = []
+    if where is None:
+        return var_columns, conditions
+
+    for node in flatten(where):
+        if isinstance(node, BinaryOperation) and node.op == '=':
+            column, value = node.args
+            if isinstance(value, Identifier):
+                column, value = value, column
+            var_name = get_query_var_name(value)
+            if isinstance(column, Identifier) and var_name is not None and var_name not in var_columns:
+                var_columns[var_name] = column
+                continue
+
+        has_vars = False
+
+        def find_vars(node, **kwargs):
+            nonlocal has_vars
+            if get_query_var_name(node) is not None:
+                has_vars = True
+
+        query_traversal(node, find_vars)
+        if has_vars:
+            return None
+        conditions.append(node)
+
+    return var_columns, conditions
+
+
+def join_conditions(conditions, op):
+    """ join list of conditions using balanced tree of binary operations (to keep recursion depth small) """
+    while len(conditions) > 1:
+        joined = [
+            BinaryOperation(op, args=conditions[i:i + 2]) if i + 1 < len(conditions) else conditions[i]
+            for i in range(0, len(conditions), 2)
+        ]
+        conditions = joined
+    return conditions[0]
+
+
+def make_vars_condition(var_columns, var_groups):
+    """
+    Make condition that selects rows for all groups of variables at once:
+     - 'column in (value1, value2, ...)' for single variable
+     - '(col1 = value1 and col2 = value2) or (...)' for several variables
+    """
+    if len(var_columns) == 1:
+        name, column = list(var_columns.items())[0]
+        return BinaryOperation('in', args=[
+            copy.deepcopy(column),
+            Tuple([Constant(var_group[name]) for var_group in var_groups])
+        ])
+
+    groups_conditions = []
+    for var_group in var_groups:
+        groups_conditions.append(join_conditions([
+            BinaryOperation('=', args=[copy.deepcopy(column), Constant(var_group[name])])
+            for name, column in var_columns.items()
+        ], 'and'))
+    return join_conditions(groups_conditions, 'or')
+
+
 def join_query_data(target, source):
     if len(target.columns) == 0:
         target = source
     else:
-        target.add_records(source.get_records())
+        target.add_result_set(source)
     return target
 
 
+def drop_duplicates(df):
+    """ Remove duplicated rows from dataframe, NULL values are considered as equal
+
+        Args:
+            df (pandas.DataFrame): input dataframe
+
+        Returns:
+            pandas.DataFrame
+    """
+    try:
+        duplicated = df.duplicated()
+    except TypeError:
+        # there are unhashable values (dict, list) in object columns: compare rows by string representation
+        duplicated = df.astype(str).duplicated()
+    if not duplicated.any():
+        return df
+    return df[~duplicated]
+
+
 def is_empty_prediction_row(predictor_value):
     "Define empty rows in predictor after JOIN"
     for key in predictor_value:
@@ -225,18 +334,26 @@ class Column:
 class ResultSet:
     def __init__(self, length=0):
         self._columns = []
-        # records is list of lists with the same length as columns
+        # records are stored in one of two views:
+        #   - _records: list of lists with the same length as columns
+        #   - _df: dataframe with positional column labels (0, 1, 2 ...)
+        # at least one of them is set, another is built on demand and cached until next change
         self._records = []
         for i in range(length):
             self._records.append([])
+        self._df = None
 
         self.is_prediction = False
 
     def __repr__(self):
         col_names = ', '.join([col.name for col in self._columns])
-        data = '\n'.join([str(rec) for rec in self._records[:20]])
+        if self._records is not None:
+            head = self._records[:20]
+        else:
+            head = self._df.head(20).to_dict(orient='split')['data']
+        data = '\n'.join([str(rec) for rec in head])
 
-        if len(self._records) > 20:
+        if self.length() > 20:
             data += '\n...'
 
         return f'{self.__class__.__name__}({self.length()} rows, cols: {col_names})\n {data}'
@@ -245,18 +362,16 @@ class ResultSet:
 
     def from_df(self, df, database, table_name, table_alias=None):
 
-        resp_dict = df.to_dict(orient='split')
-
-        self._records = resp_dict['data']
-
-        for col in resp_dict['columns']:
+        for i, col in enumerate(df.columns):
             self._columns.append(Column(
                 name=col,
                 table_name=table_name,
                 table_alias=table_alias,
                 database=database,
-                type=df.dtypes[col]
+                type=df.dtypes.iloc[i]
             ))
+
+        self.set_raw_df(df)
         return self
 
     def from_df_cols(self, df, col_names, strict=True):
@@ -266,11 +381,7 @@ class ResultSet:
             if col.alias is not None:
                 alias_idx[col.alias] = col
 
-        resp_dict = df.to_dict(orient='split')
-
-        self._records = resp_dict['data']
-
-        for col in resp_dict['columns']:
+        for col in df.columns:
             if col in col_names or strict:
                 column = col_names[col]
             elif col in alias_idx:
@@ -278,11 +389,14 @@ class ResultSet:
             else:
                 column = Column(col)
             self._columns.append(column)
+
+        self.set_raw_df(df)
         return self
 
     def to_df(self):
-        columns = self.get_column_names()
-        return pd.DataFrame(self._records, columns=columns)
+        df = self.get_raw_df().copy(deep=False)
+        df.columns = self.get_column_names()
+        return df
 
     def to_df_cols(self, prefix=''):
         # returns dataframe and dict of columns
@@ -295,7 +409,24 @@ class ResultSet:
             columns.append(name)
             col_names[name] = col
 
-        return pd.DataFrame(self._records, columns=columns), col_names
+        df = self.get_raw_df().copy(deep=False)
+        df.columns = columns
+        return df, col_names
+
+    def get_raw_df(self):
+        # dataframe with positional column names. It shares data with result set, don't change it inplace
+        if self._df is None:
+            self._df = pd.DataFrame(self._records, columns=range(len(self._columns)))
+        return self._df
+
+    def set_raw_df(self, df):
+        # replace records with dataframe, columns of dataframe are matched to result set columns by position
+        if len(df.columns) != len(self._columns):
+            raise ErSqlWrongArguments(f'Dataframe width mismatch columns length: {len(df.columns)} != {len(self._columns)}')
+        df = df.copy(deep=False)
+        df.columns = range(len(df.columns))
+        self._df = df
+        self._records = None
 
     # --- tables ---
 
@@ -327,7 +458,18 @@ class ResultSet:
 
         if values is None:
             values = []
+
+        if self._records is None:
+            # columnar view: add column to dataframe
+            length = len(self._df)
+            values = list(values[:length]) + [None] * (length - len(values))
+            df = self._df.copy(deep=False)
+            df[len(self._columns) - 1] = values
+            self._df = df
+            return
+
         # update records
+        self._df = None
         if len(self._records) > 0:
             for rec in self._records:
                 if len(values) > 0:
@@ -339,6 +481,14 @@ class ResultSet:
     def del_column(self, col):
         idx = self._locate_column(col)
         self._columns.pop(idx)
+
+        if self._records is None:
+            df = self._df.drop(columns=idx)
+            df.columns = range(len(df.columns))
+            self._df = df
+            return
+
+        self._df = None
         for row in self._records:
             row.pop(idx)
 
@@ -368,7 +518,10 @@ class ResultSet:
         # copy with values
         idx = self._locate_column(col)
 
-        values = [row[idx] for row in self._records]
+        if self._records is None:
+            values = self._df[idx].tolist()
+        else:
+            values = [row[idx] for row in self._records]
 
         col2 = copy.deepcopy(col)
 
@@ -379,6 +532,8 @@ class ResultSet:
 
     def add_records(self, data):
         names = self.get_column_names()
+        records = self.get_records_raw()
+        self._df = None
         for rec in data:
             # if len(rec) != len(self._columns):
             #     raise ErSqlWrongArguments(f'Record length mismatch columns length: {len(rec)} != {len(self._columns)}')
@@ -387,15 +542,33 @@ class ResultSet:
                 rec[name]
                 for name in names
             ]
-            self._records.append(record)
+            records.append(record)
+
+    def add_result_set(self, result_set):
+        # append records from another result set, columns are matched by names
+        names_idx = {}
+        for i, name in enumerate(result_set.get_column_names()):
+            names_idx[name] = i
+        try:
+            positions = [names_idx[name] for name in self.get_column_names()]
+        except KeyError as e:
+            raise ErSqlWrongArguments(f'Column is not found: {e}')
+
+        df = result_set.get_raw_df().iloc[:, positions]
+        df.columns = range(len(positions))
+        self.set_raw_df(pd.concat([self.get_raw_df(), df], ignore_index=True))
 
     def get_records_raw(self):
+        if self._records is None:
+            # conversion to python objects, it is done only once
+            self._records = self._df.to_dict(orient='split')['data']
         return self._records
 
     def add_record_raw(self, rec):
         if len(rec) != len(self._columns):
             raise ErSqlWrongArguments(f'Record length mismatch columns length: {len(rec)} != {len(self.columns)}')
-        self._records.append(rec)
+        self.get_records_raw().append(rec)
+        self._df = None
 
     @property
     def records(self):
@@ -407,7 +580,7 @@ class ResultSet:
         # if resultSet contents duplicate column name: only one of them will be in output
         names = self.get_column_names()
         records = []
-        for row in self._records:
+        for row in self.get_records_raw():
             records.append(dict(zip(names, row)))
         return records
 
@@ -415,6 +588,8 @@ class ResultSet:
     #     self._records = []
 
     def length(self):
+        if self._records is None:
+            return len(self._df)
         return len(self._records)
 
 
@@ -439,7 +614,7 @@ class SQLQuery():
                     self.outer_query = sql.replace(subquery, 'dataframe')
                     sql = subquery.strip('()')
             # endregion
-            self.query = parse_sql(sql, dialect='mindsdb')
+            self.query = plan_cache.parse(sql, dialect='mindsdb')
             self.query_str = sql
         else:
             self.query = sql
@@ -452,6 +627,9 @@ class SQLQuery():
         self.planner = None
         self.parameters = []
         self.fetched_data = None
+        # iterator of records chunks, is used instead of fetched_data records when result is streamed
+        self.fetched_chunks = None
+        self.duckdb_connection = None
         # self._process_query(sql)
         self.create_planner()
         if execute:
@@ -460,10 +638,6 @@ class SQLQuery():
 
     @profiler.profile()
     def create_planner(self):
-        databases = self.session.database_controller.get_list()
-
-        predictor_metadata = []
-
         query_tables = []
 
         def get_all_query_tables(node, is_table, **kwargs):
@@ -481,6 +655,29 @@ class SQLQuery():
 
         query_traversal(self.query, get_all_query_tables)
 
+        database = None if self.session.database == '' else self.session.database.lower()
+
+        plan_key = plan_cache.get_plan_key(query_tables, database)
+        metadata = plan_cache.get_plan_metadata(plan_key)
+        if metadata is None:
+            metadata = self._get_planner_metadata(query_tables)
+            plan_cache.set_plan_metadata(plan_key, metadata)
+
+        self.predictor_metadata = metadata['predictor_metadata']
+        self.model_types.update(metadata['model_types'])
+        self.planner = query_planner.QueryPlanner(
+            self.query,
+            integrations=metadata['databases'],
+            predictor_metadata=self.predictor_metadata,
+            default_namespace=database,
+        )
+
+    def _get_planner_metadata(self, query_tables):
+        databases = self.session.database_controller.get_list()
+
+        predictor_metadata = []
+        model_types = {}
+
         for table_name, table_version, project_name in query_tables:
             args = {
                 'name': table_name,
@@ -521,23 +718,56 @@ class SQLQuery():
                 })
             predictor_metadata.append(predictor)
 
-            self.model_types.update(model_record.data.get('dtypes', {}))
+            model_types.update(model_record.data.get('dtypes', {}))
 
-        database = None if self.session.database == '' else self.session.database.lower()
+        return {
+            'databases': databases,
+            'predictor_metadata': predictor_metadata,
+            'model_types': model_types
+        }
 
-        self.predictor_metadata = predictor_metadata
-        self.planner = query_planner.QueryPlanner(
-            self.query,
-            integrations=databases,
-            predictor_metadata=predictor_metadata,
-            default_namespace=database,
-        )
+    def get_duckdb_connection(self):
+        # all steps of the query are executed in the same duckdb connection
+        if self.duckdb_connection is None:
+            self.duckdb_connection = duckdb.connect(database=':memory:')
+        return self.duckdb_connection
+
+    def close_duckdb_connection(self):
+        if self.duckdb_connection is not None:
+            self.duckdb_connection.close()
+            self.duckdb_connection = None
 
     def fetch(self, view='list'):
+        """ Get result of the query
+
+            Args:
+                view (str): format of result:
+                    - list: list of records
+                    - dataframe: pandas.DataFrame
+                    - chunks: iterator of lists of records. It is the only view which keeps
+                      streamed result out of memory
+
+            Returns:
+                dict
+        """
         data = self.fetched_data
 
+        if self.fetched_chunks is not None:
+            chunks = self.fetched_chunks
+            self.fetched_chunks = None
+            if view == 'chunks':
+                return {
+                    'success': True,
+                    'result': chunks
+                }
+            for chunk in chunks:
+                for record in chunk:
+                    data.add_record_raw(record)
+
         if view == 'dataframe':
             result = data.to_df()
+        elif view == 'chunks':
+            result = iter([data.get_records_raw()])
         else:
             result = data.get_records_raw()
 
@@ -597,6 +827,73 @@ class SQLQuery():
 
         return result
 
+    def _fetch_dataframe_step_chunks(self, step):
+        """ Start fetching of integration query result by chunks.
+            It is possible if session allows it and query doesn't depend on other steps or context variables
+
+            Returns:
+                ResultSet: empty result set with columns of the query, or None if the query can't be streamed
+                Iterator: chunks of records
+        """
+        fetch_size = getattr(self.session, 'fetch_chunk_size', None)
+        if fetch_size is None or step.query is None:
+            return None, None
+
+        dn = self.datahub.get(step.integration)
+        if dn is None or hasattr(dn, 'query_stream') is False:
+            return None, None
+
+        is_dependent = False
+
+        def find_dependencies(node, **kwargs):
+            nonlocal is_dependent
+            if isinstance(node, Parameter):
+                is_dependent = True
+
+        query_traversal(step.query, find_dependencies)
+        if is_dependent:
+            return None, None
+
+        table_alias = get_table_alias(step.query.from_table, self.database)
+
+        query, context_callback = query_context_controller.handle_db_context_vars(step.query, dn, self.session)
+
+        chunks = dn.query_stream(query, fetch_size=fetch_size)
+        # the first chunk is fetched immediately: to get columns and to raise errors of the query at this moment
+        try:
+            df = next(chunks)
+        except Exception:
+            chunks.close()
+            raise
+
+        result = ResultSet()
+        for i, name in enumerate(df.columns):
+            result.add_column(Column(
+                name=name,
+                type=df.dtypes.iloc[i],
+                table_name=table_alias[1],
+                table_alias=table_alias[2],
+                database=table_alias[0]
+            ))
+
+        def records_chunks():
+            # context variables are updated using the whole result
+            context_dfs = []
+            try:
+                for chunk in itertools.chain([df], chunks):
+                    if context_callback is not None:
+                        context_dfs.append(chunk)
+                    yield chunk.to_dict(orient='split')['data']
+            finally:
+                # stream can be interrupted by the consumer: close the cursor of the handler
+                chunks.close()
+
+            if context_callback is not None:
+                context_df = pd.concat(context_dfs)
+                context_callback(context_df.to_dict(orient='records'), dn._get_columns_info(context_df))
+
+        return result, records_chunks()
+
     def _multiple_steps(self, steps, steps_data):
         data = ResultSet()
         for substep in steps:
@@ -610,23 +907,153 @@ class SQLQuery():
 
         data = ResultSet()
 
-        # mark vars
-        steps = []
         for substep in step.steps:
             if isinstance(substep, FetchDataframeStep) is False:
                 raise ErLogicError(f'Wrong step type for MultipleSteps: {step}')
+
+        for substep in step.steps:
+            sub_data = self._map_reduce_fetch(substep, vars, steps_data)
+            data = join_query_data(data, sub_data)
+
+        return data
+
+    def _get_map_reduce_batches(self, substep, vars):
+        """
+        Try to rewrite fetch step of map-reduce into queries for several groups of variables at once
+
+        :return: tuple (list of steps, names of variables) or None if the query can't be rewritten
+        """
+        query = substep.query
+        if (
+            not isinstance(query, Select)
+            or query.limit is not None
+            or query.offset is not None
+            or query.group_by is not None
+            or query.having is not None
+            or query.distinct is True
+        ):
+            return None
+
+        # the result for each group has to be independent of other groups
+        for target in query.targets:
+            if not isinstance(target, (Identifier, Star, Constant)):
+                return None
+
+        split = split_query_vars(query.where)
+        if split is None:
+            return None
+        var_columns, conditions = split
+        if len(var_columns) == 0:
+            return None
+        for var_group in vars:
+            if set(var_columns) - set(var_group) != set():
+                return None
+
+        batch_size = Config().get('map_reduce', {}).get('batch_size', 1000)
+
+        # values of variables' columns are added to the result: to split it by groups
+        key_targets = [
+            Identifier(parts=column.parts, alias=Identifier(f'__mindsdb_var_{i}'))
+            for i, column in enumerate(var_columns.values())
+        ]
+
+        steps = []
+        for i in range(0, len(vars), batch_size):
+            substep2 = copy.deepcopy(substep)
+            substep2.query.targets.extend(copy.deepcopy(key_targets))
+            substep2.query.where = join_conditions(
+                conditions + [make_vars_condition(var_columns, vars[i:i + batch_size])],
+                'and'
+            )
+            steps.append(substep2)
+        return steps, list(var_columns.keys())
+
+    @staticmethod
+    def _split_map_reduce_result(data, var_names, vars):
+        """
+        Split result of batched queries by groups of variables. The result is the same as
+        if the query was executed for every group: rows are ordered by groups and repeated for
+        duplicated groups
+
+        :param data: ResultSet with values of variables' columns in the last columns
+        :param var_names: names of variables
+        :param vars: groups of variables
+        :return: ResultSet without variables' columns
+        """
+        def make_key(values):
+            # the same value can have different type in variable and in the result
+            return tuple(
+                float(value) if isinstance(value, (int, float, np.number)) and not isinstance(value, bool) else str(value)
+                for value in values
+            )
+
+        keys_count = len(var_names)
+        if len(data.columns) < keys_count:
+            # empty response
+            return data
+        df = data.get_raw_df()
+        columns_count = len(df.columns) - keys_count
+
+        rows_by_key = defaultdict(list)
+        for i, key in enumerate(zip(*[df[col] for col in df.columns[columns_count:]])):
+            rows_by_key[make_key(key)].append(i)
+
+        idx = []
+        for var_group in vars:
+            idx.extend(rows_by_key.get(make_key([var_group[name] for name in var_names]), []))
+
+        result = ResultSet()
+        for column in data.columns[:columns_count]:
+            result.add_column(column)
+        result.set_raw_df(df.iloc[idx, :columns_count].reset_index(drop=True))
+        return result
+
+    def _map_reduce_fetch(self, substep, vars, steps_data):
+        """
+        Execute fetch step of map-reduce for every group of variables and union the results.
+        If it is possible, the groups are fetched in batches using single query for every batch.
+        Otherwise, queries are executed concurrently
+        """
+        data = ResultSet()
+        if len(vars) == 0:
+            return data
+
+        var_names = None
+        batches = self._get_map_reduce_batches(substep, vars)
+        if batches is not None:
+            steps, var_names = batches
+        else:
+            steps = []
             substep = copy.deepcopy(substep)
             markQueryVar(substep.query.where)
-            steps.append(substep)
+            for var_group in vars:
+                substep2 = copy.deepcopy(substep)
+                for name, value in var_group.items():
+                    replaceQueryVar(substep2.query.where, value, name)
+                steps.append(substep2)
+
+        max_workers = Config().get('map_reduce', {}).get('max_workers', 1)
+        if len(steps) == 1 or max_workers <= 1:
+            results = [self._fetch_dataframe_step(substep2, steps_data) for substep2 in steps]
+        else:
+            # every worker leases its own connection from the pool of the integration
+            ctx_dump = ctx.dump()
 
-        for var_group in vars:
-            steps2 = copy.deepcopy(steps)
-            for name, value in var_group.items():
-                for substep in steps2:
-                    replaceQueryVar(substep.query.where, value, name)
-            sub_data = self._multiple_steps(steps2, steps_data)
+            def fetch(substep2):
+                ctx.load(ctx_dump)
+                try:
+                    return self._fetch_dataframe_step(substep2, steps_data)
+                finally:
+                    self.session.integration_controller.handlers_cache.release()
+
+            with ThreadPool(min(len(steps), max_workers)) as pool:
+                results = pool.map(fetch, steps)
+
+        for sub_data in results:
             data = join_query_data(data, sub_data)
 
+        if var_names is not None:
+            data = self._split_map_reduce_result(data, var_names, vars)
         return data
 
     def prepare_query(self, prepare=True):
@@ -640,6 +1067,8 @@ class SQLQuery():
                     steps_data.append(data)
             except PlanningException as e:
                 raise ErLogicError(e)
+            finally:
+                self.close_duckdb_connection()
 
             statement_info = self.planner.get_statement_info()
 
@@ -674,6 +1103,22 @@ class SQLQuery():
         process_mark = None
         try:
             steps = list(self.planner.execute_steps(params))
+
+            if (
+                len(steps) == 1
+                and isinstance(steps[0], FetchDataframeStep)
+                and self.outer_query is None
+            ):
+                # simple select from integration: result can be sent to client without loading it to memory
+                data, chunks = self._fetch_dataframe_step_chunks(steps[0])
+                if data is not None:
+                    self.query = self.planner.query
+                    self.fetched_data = data
+                    self.fetched_chunks = chunks
+                    if self.columns_list is None:
+                        self.columns_list = data.columns
+                    return
+
             steps_classes = (x.__class__ for x in steps)
             predict_steps = (ApplyPredictorRowStep, ApplyPredictorStep, ApplyTimeseriesPredictorStep)
             if any(s in predict_steps for s in steps_classes):
@@ -688,6 +1133,7 @@ class SQLQuery():
         except Exception as e:
             raise e
         finally:
+            self.close_duckdb_connection()
             if process_mark is not None:
                 delete_process_mark('predict', process_mark)
 
@@ -788,14 +1234,10 @@ class SQLQuery():
             for col in left_result.columns:
                 result.add_column(col)
 
-            records_hashes = []
-            for row in left_result.get_records_raw() + right_result.get_records_raw():
-                if step.unique:
-                    checksum = hashlib.sha256(str(row).encode()).hexdigest()
-                    if checksum in records_hashes:
-                        continue
-                    records_hashes.append(checksum)
-                result.add_record_raw(row)
+            df = pd.concat([left_result.get_raw_df(), right_result.get_raw_df()], ignore_index=True)
+            if step.unique:
+                df = drop_duplicates(df)
+            result.set_raw_df(df)
 
             data = result
 
@@ -813,22 +1255,9 @@ class SQLQuery():
                         if name != '__mindsdb_row_id':
                             var_group[name] = value
 
-                data = ResultSet()
-
                 substep = step.step
                 if type(substep) == FetchDataframeStep:
-                    query = substep.query
-                    for var_group in vars:
-                        markQueryVar(query.where)
-                        for name, value in var_group.items():
-                            replaceQueryVar(query.where, value, name)
-                        sub_data = self._fetch_dataframe_step(substep, steps_data)
-                        if len(data.columns) == 0:
-                            data = sub_data
-                        else:
-                            data.add_records(sub_data.get_records())
-
-                        unmarkQueryVar(query.where)
+                    data = self._map_reduce_fetch(substep, vars, steps_data)
                 elif type(substep) == MultipleSteps:
                     data = self._multiple_steps_reduce(substep, vars, steps_data)
                 else:
@@ -845,7 +1274,7 @@ class SQLQuery():
                 if data is None:
                     data = subdata
                 else:
-                    data.add_records(subdata.get_records())
+                    data.add_result_set(subdata)
         elif type(step) == ApplyPredictorRowStep:
 
             project_name = step.namespace
@@ -973,7 +1402,12 @@ class SQLQuery():
                         ))
                 else:
                     predictor_id = predictor_metadata['id']
-                    key = f'{predictor_name}_{predictor_id}_{json_checksum(where_data)}'
+                    # input is hashed column-wise, small parts of key are hashed as json
+                    key = str_checksum(
+                        json_checksum([data.get_column_names(), params, _mdb_forecast_offset])
+                        + dataframe_checksum(data.get_raw_df())
+                    )
+                    key = f'{predictor_name}_{predictor_id}_{key}'
 
                     if self.session.predictor_cache is False:
                         data = None
@@ -1070,7 +1504,7 @@ class SQLQuery():
                 resp_df, _description = query_df_with_type_infer_fallback(query, {
                     'table_a': table_a,
                     'table_b': table_b
-                })
+                }, connection=self.get_duckdb_connection())
 
                 resp_df = resp_df.replace({np.nan: None})
 
@@ -1115,7 +1549,7 @@ class SQLQuery():
 
             query = Select(targets=[Star()], from_table=Identifier('df'), where=where_query)
 
-            res = query_df(df, query)
+            res = query_df(df, query, connection=self.get_duckdb_connection())
 
             result_set2 = ResultSet().from_df_cols(res, col_names)
 
@@ -1129,15 +1563,14 @@ class SQLQuery():
                 for col in step_data.columns:
                     step_data2.add_column(col)
 
-                records = step_data.get_records_raw()
+                df = step_data.get_raw_df()
 
                 if isinstance(step.offset, Constant) and isinstance(step.offset.value, int):
-                    records = records[step.offset.value:]
+                    df = df.iloc[step.offset.value:]
                 if isinstance(step.limit, Constant) and isinstance(step.limit.value, int):
-                    records = records[:step.limit.value]
+                    df = df.iloc[:step.limit.value]
 
-                for record in records:
-                    step_data2.add_record_raw(record)
+                step_data2.set_raw_df(df)
 
                 data = step_data2
 
@@ -1202,7 +1635,7 @@ class SQLQuery():
                     targets.append(target)
             query.targets = targets
 
-            res = query_df(df, query)
+            res = query_df(df, query, connection=self.get_duckdb_connection())
 
             result_set2 = ResultSet().from_df_cols(res, col_names, strict=False)
 
@@ -1215,7 +1648,7 @@ class SQLQuery():
             df = step_data.to_df()
 
             query = Select(targets=step.targets, from_table='df', group_by=step.columns).to_string()
-            res = query_df(df, query)
+            res = query_df(df, query, connection=self.get_duckdb_connection())
 
             # stick all columns to first table
             appropriate_table = step_data.get_tables()[0]
@@ -1255,7 +1688,7 @@ class SQLQuery():
                         result.add_column(Column(col_name))
 
             df = result.to_df()
-            res = query_df(df, query)
+            res = query_df(df, query, connection=self.get_duckdb_connection())
 
             result2 = ResultSet()
             # get database from first column
@@ -57,6 +57,8 @@ class SessionController:
         self.packet_sequence_number = 0
         self.profiling = False
         self.predictor_cache = True
+        # if set: simple selects from integrations are fetched by chunks of this size
+        self.fetch_chunk_size = None
 
     def inc_packet_sequence_number(self):
         self.packet_sequence_number = (self.packet_sequence_number + 1) % 256
@@ -11,7 +11,16 @@
 
 from mindsdb.api.mysql.mysql_proxy.data_types.mysql_datum import Datum
 from mindsdb.api.mysql.mysql_proxy.data_types.mysql_packet import Packet
-from mindsdb.api.mysql.mysql_proxy.libs.constants.mysql import NULL_VALUE
+from mindsdb.api.mysql.mysql_proxy.libs.constants.mysql import (
+    NULL_VALUE,
+    TWO_BYTE_ENC,
+    THREE_BYTE_ENC,
+    EIGHT_BYTE_ENC,
+    MAX_PACKET_SIZE
+)
+
+# length prefixes for short values
+ONE_BYTE_LENGTHS = [bytes((i,)) for i in range(NULL_VALUE[0])]
 
 
 class ResultsetRowPacket(Packet):
@@ -42,6 +51,61 @@ class ResultsetRowPacket(Packet):
         self.setBody(string)
         return self._body
 
+    @staticmethod
+    def encode_rows(rows: list, sequence_number: int, max_lengths: list = None) -> tuple:
+        """ Encode rows to string of ResultsetRow packets. It gives the same result as
+            sequence of ResultsetRowPacket, but doesn't create objects for every value
+            and writes all packets into one buffer
+
+            Args:
+                rows (list): list of rows, every row is list of values
+                sequence_number (int): sequence number of the first packet
+                max_lengths (list): if set - it is updated with max length of values in columns
+
+            Returns:
+                bytearray: packets string
+                int: sequence number for the next packet
+        """
+        buffer = bytearray()
+        for row in rows:
+            start = len(buffer)
+            # placeholder for packet header
+            buffer += b'\x00\x00\x00\x00'
+            for i, val in enumerate(row):
+                if val is None:
+                    buffer += NULL_VALUE
+                    continue
+                val = str(val).encode('utf-8')
+                length = len(val)
+                if length < NULL_VALUE[0]:
+                    buffer += ONE_BYTE_LENGTHS[length]
+                elif length < 0x10000:
+                    buffer += TWO_BYTE_ENC + length.to_bytes(2, 'little')
+                elif length < 0x1000000:
+                    buffer += THREE_BYTE_ENC + length.to_bytes(3, 'little')
+                else:
+                    buffer += EIGHT_BYTE_ENC + length.to_bytes(8, 'little')
+                buffer += val
+                if max_lengths is not None and max_lengths[i] < length:
+                    max_lengths[i] = length
+
+            body_length = len(buffer) - start - 4
+            if body_length < MAX_PACKET_SIZE:
+                buffer[start:start + 3] = body_length.to_bytes(3, 'little')
+                buffer[start + 3] = sequence_number
+                sequence_number = (sequence_number + 1) % 256
+                continue
+
+            # body is too long: it has to be split to several packets
+            body = bytes(buffer[start + 4:])
+            del buffer[start:]
+            for part_start in range(0, len(body) + 1, MAX_PACKET_SIZE):
+                part = body[part_start:part_start + MAX_PACKET_SIZE]
+                buffer += len(part).to_bytes(3, 'little') + bytes((sequence_number,)) + part
+                sequence_number = (sequence_number + 1) % 256
+
+        return buffer, sequence_number
+
     @staticmethod
     def test():
         import pprint
@@ -6,9 +6,10 @@ from sqlalchemy.types import (
     Integer, Float, Text
 )
 
-from mindsdb_sql.parser.ast import Insert, Identifier, CreateTable, TableColumn, DropTables
+from mindsdb_sql.parser.ast import Identifier, CreateTable, TableColumn, DropTables
 
 from mindsdb.api.mysql.mysql_proxy.datahub.datanodes.datanode import DataNode
+from mindsdb.integrations.libs.base import DatabaseHandler
 from mindsdb.api.mysql.mysql_proxy.libs.constants.response_type import RESPONSE_TYPE
 from mindsdb.api.mysql.mysql_proxy.datahub.classes.tables_row import TablesRow
 import mindsdb.utilities.profiler as profiler
@@ -25,13 +26,24 @@ class IntegrationDataNode(DataNode):
         self.integration_name = integration_name
         self.ds_type = ds_type
         self.integration_controller = integration_controller
-        self.integration_handler = self.integration_controller.get_handler(self.integration_name)
+        # check that handler can be created. Handler is leased from the pool only while it is used
+        with self._use_handler():
+            pass
+
+    @property
+    def integration_handler(self):
+        # handler stays leased by the thread until the end of the query
+        return self.integration_controller.get_handler(self.integration_name)
+
+    def _use_handler(self):
+        return self.integration_controller.use_handler(self.integration_name)
 
     def get_type(self):
         return self.type
 
     def get_tables(self):
-        response = self.integration_handler.get_tables()
+        with self._use_handler() as handler:
+            response = handler.get_tables()
         if response.type == RESPONSE_TYPE.TABLE:
             result_dict = response.data_frame.to_dict(orient='records')
             result = []
@@ -52,16 +64,21 @@ class IntegrationDataNode(DataNode):
             tables=[name],
             if_exists=if_exists
         )
-        result = self.integration_handler.query(drop_ast)
+        with self._use_handler() as handler:
+            result = handler.query(drop_ast)
         if result.type == RESPONSE_TYPE.ERROR:
             raise Exception(result.error_message)
 
     def create_table(self, table_name: Identifier, result_set, is_replace=False, is_create=False):
+        with self._use_handler() as handler:
+            self._create_table(handler, table_name, result_set, is_replace=is_replace, is_create=is_create)
+
+    def _create_table(self, handler, table_name: Identifier, result_set, is_replace=False, is_create=False):
         # is_create - create table
         # is_replace - drop table if exists
         # is_create==False and is_replace==False: just insert
 
-        table_columns_meta = {}
+        table_columns_meta = []
         table_columns = []
         for col in result_set.columns:
             # assume this is pandas type
@@ -78,7 +95,7 @@ class IntegrationDataNode(DataNode):
                     type=column_type
                 )
             )
-            table_columns_meta[col.alias] = column_type
+            table_columns_meta.append(column_type)
 
         if is_replace:
             # drop
@@ -86,7 +103,7 @@ class IntegrationDataNode(DataNode):
                 tables=[table_name],
                 if_exists=True
             )
-            result = self.integration_handler.query(drop_ast)
+            result = handler.query(drop_ast)
             if result.type == RESPONSE_TYPE.ERROR:
                 raise Exception(result.error_message)
             is_create = True
@@ -98,44 +115,28 @@ class IntegrationDataNode(DataNode):
                 is_replace=True
             )
 
-            result = self.integration_handler.query(create_table_ast)
+            result = handler.query(create_table_ast)
             if result.type == RESPONSE_TYPE.ERROR:
                 raise Exception(result.error_message)
 
-        insert_columns = [Identifier(parts=[x.alias]) for x in result_set.columns]
-        formatted_data = []
-
-        for rec in result_set.get_records():
-            new_row = []
-            for col in result_set.columns:
-                value = rec[col.alias]
-                column_type = table_columns_meta[col.alias]
-
-                python_type = str
-                if column_type == Integer:
-                    python_type = int
-                elif column_type == Float:
-                    python_type = float
-
-                try:
-                    value = python_type(value) if value is not None else value
-                except Exception:
-                    pass
-                new_row.append(value)
-            formatted_data.append(new_row)
-
-        if len(formatted_data) == 0:
+        if result_set.length() == 0:
             # not need to insert
             return
 
-        insert_ast = Insert(
-            table=table_name,
-            columns=insert_columns,
-            values=formatted_data
-        )
+        # raw df is shared with result set: make a copy of columns before changing them
+        df = result_set.get_raw_df().copy(deep=False)
+        for i, column_type in enumerate(table_columns_meta):
+            if column_type == Text:
+                values = df[i].astype(object)
+                df[i] = values.where(values.isna(), values.map(str))
+        df.columns = [col.alias for col in result_set.columns]
 
         try:
-            result = self.integration_handler.query(insert_ast)
+            if hasattr(handler, 'insert_dataframe'):
+                result = handler.insert_dataframe(table_name, df)
+            else:
+                # handler is not inherited from DatabaseHandler: use batched inserts
+                result = DatabaseHandler.insert_dataframe(handler, table_name, df)
         except Exception as e:
             msg = f'[{self.ds_type}/{self.integration_name}]: {str(e)}'
             raise DBHandlerException(msg) from e
@@ -146,29 +147,84 @@ class IntegrationDataNode(DataNode):
     @profiler.profile()
     def query(self, query=None, native_query=None, session=None):
         try:
-            if query is not None:
-                result = self.integration_handler.query(query)
-            else:
-                # try to fetch native query
-                result = self.integration_handler.native_query(native_query)
+            with self._use_handler() as handler:
+                if query is not None:
+                    result = handler.query(query)
+                else:
+                    # try to fetch native query
+                    result = handler.native_query(native_query)
         except Exception as e:
-            msg = str(e).strip()
-            if msg == '':
-                msg = e.__class__.__name__
-            msg = f'[{self.ds_type}/{self.integration_name}]: {msg}'
-            raise DBHandlerException(msg) from e
+            raise self._handler_exception(e) from e
 
         if result.type == RESPONSE_TYPE.ERROR:
             raise Exception(f'Error in {self.integration_name}: {result.error_message}')
         if result.type == RESPONSE_TYPE.OK:
             return [], []
 
-        df = result.data_frame
+        df = self._clear_df(result.data_frame)
+
+        columns_info = self._get_columns_info(df)
+        data = df.to_dict(orient='records')
+        return data, columns_info
+
+    def query_stream(self, query, fetch_size=1000):
+        """ Fetch result of select query from integration by chunks
+
+            Args:
+                query (ASTNode): select query
+                fetch_size (int): max count of rows in one chunk
+
+            Returns:
+                Iterator[pd.DataFrame]: chunks of result cleared from NaN values
+        """
+        # handler is leased until the stream is finished or closed
+        with self._use_handler() as handler:
+            if hasattr(handler, 'query_stream') is False:
+                data, columns_info = self.query(query=query)
+                yield pd.DataFrame(data, columns=[x['name'] for x in columns_info])
+                return
+
+            chunks = handler.query_stream(query, fetch_size=fetch_size)
+            try:
+                while True:
+                    try:
+                        df = next(chunks)
+                    except StopIteration:
+                        break
+                    except Exception as e:
+                        raise self._handler_exception(e) from e
+                    yield self._clear_df(df)
+            finally:
+                chunks.close()
+
+    def _handler_exception(self, e):
+        msg = str(e).strip()
+        if msg == '':
+            msg = e.__class__.__name__
+        msg = f'[{self.ds_type}/{self.integration_name}]: {msg}'
+        return DBHandlerException(msg)
+
+    @staticmethod
+    def _get_columns_info(df):
+        return [
+            {
+                'name': k,
+                'type': v
+            }
+            for k, v in df.dtypes.items()
+        ]
+
+    @staticmethod
+    def _clear_df(df):
         # region clearing df from NaN values
         # recursion error appears in pandas 1.5.3 https://github.com/pandas-dev/pandas/pull/45749
         if isinstance(df, pd.Series):
             df = df.to_frame()
 
+        if len(df) == 0 or not df.isna().values.any():
+            # nothing to clear, skip copying of df
+            return df
+
         try:
             df = df.replace(np.NaN, pd.NA)
         except Exception as e:
@@ -179,13 +235,4 @@ class IntegrationDataNode(DataNode):
         except Exception as e:
             print(f'Issue with clearing DF from NaN values: {e}')
         # endregion
-
-        columns_info = [
-            {
-                'name': k,
-                'type': v
-            }
-            for k, v in df.dtypes.items()
-        ]
-        data = df.to_dict(orient='records')
-        return data, columns_info
+        return df
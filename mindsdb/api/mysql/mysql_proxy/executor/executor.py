@@ -3,6 +3,7 @@ from mindsdb_sql import parse_sql
 from mindsdb_sql.planner import utils as planner_utils
 
 from mindsdb.api.mysql.mysql_proxy.classes.sql_query import Column, SQLQuery
+from mindsdb.api.mysql.mysql_proxy.classes.plan_cache import plan_cache
 from mindsdb.api.mysql.mysql_proxy.utilities import (
     ErBadDbError,
     SqlApiException,
@@ -188,7 +189,7 @@ class Executor:
         self.sql_lower = sql_lower.replace("`", "")
 
         try:
-            self.query = parse_sql(sql, dialect="mindsdb")
+            self.query = plan_cache.parse(sql, dialect="mindsdb")
         except Exception as mdb_error:
             try:
                 self.query = parse_sql(sql, dialect="mysql")
@@ -2054,7 +2054,11 @@ class ExecuteCommands:
         return ExecuteAnswer(ANSWER_TYPE.OK)
 
     def answer_select(self, query):
-        data = query.fetch()
+        if query.fetched_chunks is not None:
+            # result is streamed from integration
+            data = query.fetch(view='chunks')
+        else:
+            data = query.fetch()
 
         return ExecuteAnswer(
             answer_type=ANSWER_TYPE.TABLE,
@@ -22,6 +22,7 @@ from functools import partial
 import select
 import base64
 from typing import List, Dict
+from collections.abc import Iterator
 
 from numpy import dtype as np_dtype
 from pandas.api import types as pd_types
@@ -74,6 +75,7 @@ from mindsdb.api.mysql.mysql_proxy.data_types.mysql_packets import (
 )
 
 from mindsdb.api.mysql.mysql_proxy.executor import Executor
+from mindsdb.interfaces.database.integrations import integration_controller
 from mindsdb.utilities.context import context as ctx
 import mindsdb.utilities.hooks as hooks
 import mindsdb.utilities.profiler as profiler
@@ -122,6 +124,10 @@ def check_auth(username, password, scramble_func, salt, company_id, config):
         logger.error(traceback.format_exc())
 
 
+# max size of string for one socket.sendall call
+SEND_CHUNK_SIZE = 1024 * 1024
+
+
 class SQLAnswer:
     def __init__(self, resp_type: RESPONSE_TYPE, columns: List[Dict] = None, data: List[Dict] = None,
                  status: int = None, state_track: List[List] = None, error_code: int = None, error_message: str = None):
@@ -143,6 +149,9 @@ class MysqlProxy(SocketServer.BaseRequestHandler):
     The Main Server controller class
     """
 
+    # send result of simple selects to client by chunks
+    stream_results = True
+
     @staticmethod
     def server_close(srv):
         srv.server_close()
@@ -306,18 +315,17 @@ class MysqlProxy(SocketServer.BaseRequestHandler):
     def answer_stmt_close(self, stmt_id):
         self.session.unregister_stmt(stmt_id)
 
+    def send_string(self, string):
+        # big strings are sent by parts, to not make a copy of the whole string for sending
+        view = memoryview(string)
+        for start in range(0, len(view), SEND_CHUNK_SIZE):
+            self.socket.sendall(view[start:start + SEND_CHUNK_SIZE])
+
     def send_query_answer(self, answer: SQLAnswer):
-        if answer.type == RESPONSE_TYPE.TABLE:
-            packages = []
-            packages += self.get_tabel_packets(
-                columns=answer.columns,
-                data=answer.data
-            )
-            if answer.status is not None:
-                packages.append(self.last_packet(status=answer.status))
-            else:
-                packages.append(self.last_packet())
-            self.send_package_group(packages)
+        if answer.type == RESPONSE_TYPE.TABLE and isinstance(answer.data, Iterator):
+            self.send_table_by_chunks(answer)
+        elif answer.type == RESPONSE_TYPE.TABLE:
+            self.send_table(answer)
         elif answer.type == RESPONSE_TYPE.OK:
             self.packet(OkPacket, state_track=answer.state_track).send()
         elif answer.type == RESPONSE_TYPE.ERROR:
@@ -327,9 +335,62 @@ class MysqlProxy(SocketServer.BaseRequestHandler):
                 msg=answer.error_message
             ).send()
 
-    def _get_column_defenition_packets(self, columns, data=None):
-        if data is None:
-            data = []
+    def send_table(self, answer: SQLAnswer):
+        columns = answer.columns
+        data = answer.data
+
+        # rows are encoded before header: to get max length of values in columns
+        header_count = len(columns) + 1
+        if self.client_capabilities.DEPRECATE_EOF is False:
+            header_count += 1
+        first_row_seq = (self.session.packet_sequence_number + header_count) % 256
+
+        max_lengths = None
+        if len(data) > 0:
+            max_lengths = [1] * len(columns)
+        rows_string, next_seq = ResultsetRowPacket.encode_rows(data, first_row_seq, max_lengths)
+
+        self.send_package_group(self.get_tabel_packets(columns, max_lengths))
+        self.send_string(rows_string)
+        self.session.packet_sequence_number = next_seq
+
+        if answer.status is not None:
+            self.send_package_group([self.last_packet(status=answer.status)])
+        else:
+            self.send_package_group([self.last_packet()])
+
+    def send_table_by_chunks(self, answer: SQLAnswer):
+        """ Send table which records are received as iterator of chunks.
+            Every chunk is sent right after it is received, so whole table is never kept in memory
+        """
+        # length of values is unknown before the end of data: it is not calculated
+        self.send_package_group(self.get_tabel_packets(answer.columns))
+
+        try:
+            for chunk in answer.data:
+                rows_string, next_seq = ResultsetRowPacket.encode_rows(chunk, self.session.packet_sequence_number)
+                self.send_string(rows_string)
+                self.session.packet_sequence_number = next_seq
+        except Exception as e:
+            # header is already sent, error packet terminates the result set
+            logger.error(f'Error while sending result set: {e}')
+            self.packet(
+                ErrPacket,
+                err_code=ERR.ER_UNKNOWN_ERROR,
+                msg=str(e)
+            ).send()
+            return
+        finally:
+            # client can disconnect before the end of data: release cursor of the handler
+            if hasattr(answer.data, 'close'):
+                answer.data.close()
+
+        if answer.status is not None:
+            self.send_package_group([self.last_packet(status=answer.status)])
+        else:
+            self.send_package_group([self.last_packet()])
+
+    def _get_column_defenition_packets(self, columns, max_lengths=None):
         packets = []
         for i, column in enumerate(columns):
             logger.info("%s._get_column_defenition_packets: handling column - %s of %s type", self.__class__.__name__, column, type(column))
@@ -337,15 +398,10 @@ class MysqlProxy(SocketServer.BaseRequestHandler):
             column_name = column.get('name', 'column_name')
             column_alias = column.get('alias', column_name)
             flags = column.get('flags', 0)
-            if len(data) == 0:
+            if max_lengths is None:
                 length = 0xffff
             else:
-                length = 1
-                for row in data:
-                    if isinstance(row, dict):
-                        length = max(len(str(row[column_alias])), length)
-                    else:
-                        length = max(len(str(row[i])), length)
+                length = max_lengths[i]
 
             packets.append(
                 self.packet(
@@ -363,15 +419,15 @@ class MysqlProxy(SocketServer.BaseRequestHandler):
             )
         return packets
 
-    def get_tabel_packets(self, columns, data, status=0):
+    def get_tabel_packets(self, columns, max_lengths=None, status=0):
+        # header of table: rows are sent separately
         # TODO remove columns order
         packets = [self.packet(ColumnCountPacket, count=len(columns))]
-        packets.extend(self._get_column_defenition_packets(columns, data))
+        packets.extend(self._get_column_defenition_packets(columns, max_lengths))
 
         if self.client_capabilities.DEPRECATE_EOF is False:
             packets.append(self.packet(EofPacket, status=status))
 
-        packets += [self.packet(ResultsetRowPacket, data=x) for x in data]
         return packets
 
     def decode_utf(self, text):
@@ -492,7 +548,13 @@ class MysqlProxy(SocketServer.BaseRequestHandler):
             sqlserver=self
         )
 
-        executor.query_execute(sql)
+        # result of simple selects from integrations is sent to client by chunks
+        if self.stream_results:
+            self.session.fetch_chunk_size = Config()['api']['mysql'].get('fetch_chunk_size')
+        try:
+            executor.query_execute(sql)
+        finally:
+            self.session.fetch_chunk_size = None
 
         if executor.data is None:
             resp = SQLAnswer(
@@ -764,6 +826,9 @@ class MysqlProxy(SocketServer.BaseRequestHandler):
                     error_code = response.error_code
                     error_type = error_type or 'expected'
 
+            # result is sent: return connections to integrations to the pool
+            integration_controller.handlers_cache.release()
+
             hooks.after_api_query(
                 company_id=ctx.company_id,
                 api='mysql',
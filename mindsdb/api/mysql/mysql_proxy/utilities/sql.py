@@ -1,8 +1,9 @@
 import copy
 
 import duckdb
-from duckdb import InvalidInputException
 import numpy as np
+import pandas as pd
+from pandas.api import types as pd_types
 
 from mindsdb_sql import parse_sql
 from mindsdb_sql.render.sqlalchemy_render import SqlalchemyRender
@@ -16,46 +17,97 @@ from mindsdb.utilities import log
 from mindsdb.utilities.json_encoder import CustomJSONEncoder
 
 
-def query_df_with_type_infer_fallback(query_str: str, dataframes: dict):
-    ''' Duckdb need to infer column types if column.dtype == object. By default it take 1000 rows,
-        but that may be not sufficient for some cases. This func try to run query multiple times
-        increasing butch size for type infer
+# types for 'object' columns by result of pandas.api.types.infer_dtype
+OBJECT_COLUMN_TYPES = {
+    'string': 'string',
+    'integer': 'Int64',
+    'floating': 'float64',
+    'mixed-integer-float': 'float64',
+    'boolean': 'boolean',
+}
+
+
+def set_column_types(df: pd.DataFrame) -> pd.DataFrame:
+    """ Duckdb infers type of 'object' columns by the sample of rows and fails if the rest of column doesn't
+        fit to that type. To avoid it: types of 'object' columns are detected by the whole column and declared
+        explicitly using pandas nullable types
+
+        Args:
+            df (pandas.DataFrame): input dataframe
+
+        Returns:
+            pandas.DataFrame: dataframe with the same data, it can share memory with input dataframe
+    """
+    columns = {}
+    for i, dtype in enumerate(df.dtypes):
+        if dtype != object:
+            continue
+        column = df.iloc[:, i]
+        inferred = pd_types.infer_dtype(column, skipna=True)
+        type_name = OBJECT_COLUMN_TYPES.get(inferred)
+        try:
+            if type_name is not None:
+                column = column.astype(type_name)
+            elif inferred in ('mixed', 'mixed-integer'):
+                # duckdb would convert such column to varchar anyway
+                column = column.where(column.isna(), column.astype(str)).astype('string')
+            else:
+                continue
+        except (ValueError, TypeError):
+            continue
+        columns[i] = column
+
+    if len(columns) == 0:
+        return df
+
+    df = df.copy(deep=False)
+    for i, column in columns.items():
+        df.isetitem(i, column)
+    return df
+
+
+def query_df_with_type_infer_fallback(query_str: str, dataframes: dict, connection=None):
+    ''' Execute query on dataframes using duckdb. Types of 'object' columns are declared before
+        dataframes are passed to duckdb, so it doesn't have to infer them from the sample of rows
 
         Args:
             query_str (str): query to execute
             dataframes (dict): dataframes
+            connection (duckdb.DuckDBPyConnection): connection to use, if not set - temporary in-memory connection is used
 
         Returns:
             pandas.DataFrame
             pandas.columns
     '''
 
-    for name, value in dataframes.items():
-        locals()[name] = value
+    if connection is None:
+        con = duckdb.connect(database=':memory:')
+    else:
+        con = connection
 
-    con = duckdb.connect(database=':memory:')
-    for sample_size in [1000, 10000, 1000000]:
-        try:
-            con.execute(f'set global pandas_analyze_sample={sample_size};')
-            result_df = con.execute(query_str).fetchdf()
-        except InvalidInputException:
-            pass
+    try:
+        for name, value in dataframes.items():
+            con.register(name, set_column_types(value))
+        result_df = con.execute(query_str).fetchdf()
+        description = con.description
+    finally:
+        if connection is None:
+            con.close()
         else:
-            break
-    else:
-        raise InvalidInputException
-    description = con.description
-    con.close()
+            for name in dataframes:
+                con.unregister(name)
 
     return result_df, description
 
 
-def query_df(df, query, session=None):
+def query_df(df, query, session=None, connection=None):
     """ Perform simple query ('select' from one table, without subqueries and joins) on DataFrame.
 
         Args:
             df (pandas.DataFrame): data
             query (mindsdb_sql.parser.ast.Select | str): select query
+            session: session, is used to get current database
+            connection (duckdb.DuckDBPyConnection): connection to execute query in
 
         Returns:
             pandas.DataFrame
@@ -133,7 +185,7 @@ def query_df(df, query, session=None):
             if 'CONNECTION_DATA' in df.columns:
                 df = df.astype({'CONNECTION_DATA': 'string'})
 
-    result_df, description = query_df_with_type_infer_fallback(query_str, {'df': df})
+    result_df, description = query_df_with_type_infer_fallback(query_str, {'df': df}, connection=connection)
     result_df = result_df.replace({np.nan: None})
 
     new_column_names = {}
@@ -454,6 +454,8 @@ class PostgresProxyHandler(socketserver.StreamRequestHandler):
             tof = type(message)
             if tof in self.message_map:
                 res = self.message_map[tof](message)
+                # message is answered: return connections to integrations to the pool
+                self.session.integration_controller.handlers_cache.release()
                 if not res:
                     break
             else:
@@ -4,6 +4,7 @@ import duckdb
 import pandas as pd
 from duckdb import DuckDBPyConnection
 from mindsdb_sql import parse_sql
+from mindsdb_sql.parser.ast import Identifier
 from mindsdb_sql.parser.ast.base import ASTNode
 from mindsdb_sql.render.sqlalchemy_render import SqlalchemyRender
 
@@ -146,6 +147,44 @@ class DuckDBHandler(DatabaseHandler):
         query_str = self.renderer.get_string(query, with_failback=True)
         return self.native_query(query_str)
 
+    def insert_dataframe(self, table: Identifier, df: pd.DataFrame, batch_size: int = 1000) -> Response:
+        """Insert rows of dataframe into a table.
+
+        The dataframe is registered in the connection and inserted with one
+        INSERT ... SELECT query, without converting of values to python objects.
+
+        Args:
+            table (Identifier): The name of the table.
+            df (pd.DataFrame): The data to insert.
+            batch_size (int): Not used, data is inserted at once.
+
+        Returns:
+            Response: The query result.
+        """
+        quote = self.renderer.dialect.identifier_preparer.quote
+        table_name = '.'.join(quote(part) for part in table.parts)
+        columns = ', '.join(quote(str(name)) for name in df.columns)
+        source = '__mindsdb_insert_data'
+
+        need_to_close = self.is_connected is False
+
+        connection = self.connect()
+        try:
+            connection.register(source, df)
+            connection.execute(f'INSERT INTO {table_name} ({columns}) SELECT * FROM {source}')
+            connection.unregister(source)
+            response = Response(RESPONSE_TYPE.OK)
+        except Exception as e:
+            log.logger.error(
+                f'Error inserting data into {table_name} on {self.connection_data["database"]}!'
+            )
+            response = Response(RESPONSE_TYPE.ERROR, error_message=str(e))
+
+        if need_to_close is True:
+            self.disconnect()
+
+        return response
+
     def get_tables(self) -> Response:
         """Get a list of all the tables in the database.
 
@@ -10,11 +10,14 @@ from urllib.parse import urlparse
 
 import magic
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 import requests
 from charset_normalizer import from_bytes
 from mindsdb_sql import parse_sql
-from mindsdb_sql.parser.ast import DropTables, Select
+from mindsdb_sql.parser.ast import BetweenOperation, BinaryOperation, Constant, DropTables, Identifier, Select, Star, Tuple
 from mindsdb_sql.parser.ast.base import ASTNode
+from mindsdb_sql.planner.utils import query_traversal
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.document_loaders import TextLoader, PyPDFLoader
 
@@ -27,6 +30,36 @@ from mindsdb.integrations.libs.response import HandlerStatusResponse as StatusRe
 DEFAULT_CHUNK_SIZE = 200
 DEFAULT_CHUNK_OVERLAP = 50
 
+# parsed copy of uploaded file, it is stored near the source file
+PARSED_FILE_NAME = "__parsed.parquet"
+PARSED_ROW_GROUP_SIZE = 100000
+
+# files are converted to parsed copy by chunks of rows
+INGEST_CHUNK_SIZE = 100000
+# size of the beginning of file used to detect encoding and format
+INGEST_SAMPLE_SIZE = 32 * 1024
+# how many times conversion can be restarted because of change of schema
+INGEST_MAX_ATTEMPTS = 5
+
+# operators of WHERE which can be used to skip row groups of parsed file
+FILTER_OPERATORS = {
+    "=": "=",
+    "!=": "!=",
+    "<>": "!=",
+    ">": ">",
+    "<": "<",
+    ">=": ">=",
+    "<=": "<=",
+}
+FILTER_OPERATORS_REVERSED = {
+    "=": "=",
+    "!=": "!=",
+    ">": "<",
+    "<": ">",
+    ">=": "<=",
+    "<=": ">=",
+}
+
 
 def clean_cell(val):
     if str(val) in ["", " ", "  ", "NaN", "nan", "NA"]:
@@ -90,13 +123,23 @@ class FileHandler(DatabaseHandler):
         elif type(query) == Select:
             table_name = query.from_table.parts[-1]
             file_path = self.file_controller.get_file_path(table_name)
-            df, _columns = self._handle_source(
-                file_path,
-                self.clean_rows,
-                self.custom_parser,
-                self.chunk_size,
-                self.chunk_overlap,
-            )
+            parsed_file_path = Path(file_path).parent.joinpath(PARSED_FILE_NAME)
+            if (
+                parsed_file_path.is_file()
+                and self.custom_parser is None
+                and self.clean_rows is True
+                and self.chunk_size == DEFAULT_CHUNK_SIZE
+                and self.chunk_overlap == DEFAULT_CHUNK_OVERLAP
+            ):
+                df = self._read_parsed_source(str(parsed_file_path), query)
+            else:
+                df, _columns = self._handle_source(
+                    file_path,
+                    self.clean_rows,
+                    self.custom_parser,
+                    self.chunk_size,
+                    self.chunk_overlap,
+                )
             result_df = query_df(df, query)
             return Response(RESPONSE_TYPE.TABLE, data_frame=result_df)
         else:
@@ -182,6 +225,330 @@ class FileHandler(DatabaseHandler):
         col_map = dict((col, col) for col in header)
         return df, col_map
 
+    @staticmethod
+    def _detect_encoding(sample: bytes):
+        """
+        Detect encoding of text file by its first bytes
+        :return: encoding and errors handling mode for decoding
+        """
+        if sample.startswith(codecs.BOM_UTF8):
+            return "utf-8-sig", "strict"
+        # sample can be cut in the middle of a character
+        if b"\n" in sample:
+            sample = sample[: sample.rindex(b"\n")]
+        best_meta = from_bytes(
+            sample,
+            steps=32,
+            chunk_size=1024,
+            explain=False,
+        ).best()
+        if best_meta is not None:
+            encoding = best_meta.encoding
+            try:
+                sample.decode(encoding, "strict")
+                return encoding, "strict"
+            except UnicodeDecodeError:
+                pass
+        return "utf-8", "replace"
+
+    @staticmethod
+    def _get_chunks_reader(file_path: str, chunk_size: int = None):
+        """
+        Get reader of file by chunks, it is possible for csv, json lines and parquet files
+        :return: function which returns iterator of dataframes, or None if file can't be read by chunks
+        """
+        if chunk_size is None:
+            chunk_size = INGEST_CHUNK_SIZE
+        suffix = Path(file_path).suffix.strip(".").lower()
+        with open(file_path, "rb") as fp:
+            sample = fp.read(INGEST_SAMPLE_SIZE)
+            fp.seek(-min(4, os.path.getsize(file_path)), 2)
+            end_meta = fp.read()
+
+        if suffix == "parquet" or (sample[:4] == b"PAR1" and end_meta == b"PAR1"):
+            def read_parquet():
+                for batch in pq.ParquetFile(file_path).iter_batches(batch_size=chunk_size):
+                    yield batch.to_pandas()
+            return read_parquet
+
+        if suffix not in ("csv", "jsonl", "ndjson"):
+            return None
+
+        encoding, errors = FileHandler._detect_encoding(sample)
+
+        if suffix in ("jsonl", "ndjson"):
+            def read_json_lines():
+                yield from pd.read_json(
+                    file_path, lines=True, chunksize=chunk_size, encoding=encoding, encoding_errors=errors
+                )
+            return read_json_lines
+
+        dialect = FileHandler._get_csv_dialect(StringIO(sample.decode(encoding, "replace")))
+        if dialect is None:
+            return None
+
+        def read_csv():
+            yield from pd.read_csv(
+                file_path,
+                sep=dialect.delimiter,
+                index_col=False,
+                chunksize=chunk_size,
+                encoding=encoding,
+                encoding_errors=errors,
+            )
+        return read_csv
+
+    @staticmethod
+    def _clean_chunk(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Vectorized version of cleaning of dataframe made in _handle_source
+        """
+        df = df.rename(columns={key: key.strip() for key in df.columns})
+        for i, dtype in enumerate(df.dtypes):
+            if dtype == object:
+                column = df.iloc[:, i]
+                df.iloc[:, i] = column.where(~column.isin(["", " ", "  ", "NaN", "nan", "NA"]), None)
+        return df
+
+    @staticmethod
+    def _get_arrow_type(column: pd.Series) -> pa.DataType:
+        try:
+            return pa.array(column, from_pandas=True).type
+        except (pa.ArrowException, TypeError, ValueError):
+            # values of different types
+            return pa.string()
+
+    @staticmethod
+    def _merge_arrow_types(type1: pa.DataType, type2: pa.DataType) -> pa.DataType:
+        """
+        Get type which can keep values of both types
+        """
+        if type1 == type2 or pa.types.is_null(type2):
+            return type1
+        if pa.types.is_null(type1):
+            return type2
+        if (
+            (pa.types.is_integer(type1) or pa.types.is_floating(type1))
+            and (pa.types.is_integer(type2) or pa.types.is_floating(type2))
+        ):
+            return pa.float64()
+        return pa.string()
+
+    @staticmethod
+    def _chunk_to_table(df: pd.DataFrame, schema: pa.Schema) -> pa.Table:
+        df = df.copy(deep=False)
+        for field in schema:
+            if pa.types.is_string(field.type):
+                column = df[field.name]
+                df[field.name] = column.astype(str).where(column.notna(), None)
+        return pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+
+    @staticmethod
+    def ingest_source(file_path: str, file_dir) -> dict:
+        """
+        Convert file to parsed parquet copy reading it by chunks: file is never loaded in memory whole.
+        Schema is inferred by the first chunk and is extended if next chunks don't fit it:
+        in this case file is converted again from the beginning
+        :param file_path: path to source file
+        :param file_dir: folder where parsed file will be saved
+        :return: dict with 'row_count' and 'column_names' or None if file can't be read by chunks
+        """
+        read_chunks = FileHandler._get_chunks_reader(file_path)
+        if read_chunks is None:
+            return None
+
+        parsed_file_path = Path(file_dir).joinpath(PARSED_FILE_NAME)
+        schema = None
+        for _attempt in range(INGEST_MAX_ATTEMPTS):
+            writer = None
+            row_count = 0
+            is_schema_changed = False
+            try:
+                for chunk in read_chunks():
+                    chunk = FileHandler._clean_chunk(chunk)
+                    if schema is None:
+                        schema = pa.schema([
+                            (name, FileHandler._get_arrow_type(chunk[name])) for name in chunk.columns
+                        ])
+                    if list(chunk.columns) != schema.names:
+                        raise ValueError("Columns of chunks are different")
+                    try:
+                        table = FileHandler._chunk_to_table(chunk, schema)
+                    except (pa.ArrowException, TypeError, ValueError):
+                        new_schema = pa.schema([
+                            (field.name, FileHandler._merge_arrow_types(
+                                field.type, FileHandler._get_arrow_type(chunk[field.name])
+                            ))
+                            for field in schema
+                        ])
+                        if new_schema == schema:
+                            raise
+                        schema = new_schema
+                        is_schema_changed = True
+                        break
+                    if writer is None:
+                        writer = pq.ParquetWriter(parsed_file_path, schema)
+                    writer.write_table(table, row_group_size=PARSED_ROW_GROUP_SIZE)
+                    row_count += len(chunk)
+            except Exception as e:
+                print(f"Could not read file by chunks: {e}")
+                is_schema_changed = False
+                schema = None
+            finally:
+                if writer is not None:
+                    writer.close()
+
+            if is_schema_changed:
+                continue
+            if schema is None:
+                # file is empty or it can't be read by chunks
+                break
+            if writer is None:
+                pq.write_table(schema.empty_table(), parsed_file_path)
+            return {
+                "row_count": row_count,
+                "column_names": schema.names,
+            }
+
+        if parsed_file_path.exists():
+            parsed_file_path.unlink()
+        return None
+
+    @staticmethod
+    def save_parsed_source(df: pd.DataFrame, file_dir) -> bool:
+        """
+        Save parsed file in parquet format. It is read on select instead of parsing of the source file
+        :param df: result of _handle_source
+        :param file_dir: folder of the source file
+        :return: True if file is saved
+        """
+        parsed_file_path = Path(file_dir).joinpath(PARSED_FILE_NAME)
+        try:
+            df.to_parquet(
+                parsed_file_path, index=False, row_group_size=PARSED_ROW_GROUP_SIZE
+            )
+        except Exception as e:
+            # for example, column contains values of different types
+            print(f"Could not save parsed file, it will be parsed on every query: {e}")
+            if parsed_file_path.exists():
+                parsed_file_path.unlink()
+            return False
+        return True
+
+    @staticmethod
+    def _get_query_columns(query: Select, file_columns: list):
+        """
+        Get columns of the file which are used in the query
+        :return: list of columns or None if all columns are needed
+        """
+        columns_map = {}
+        for name in file_columns:
+            columns_map.setdefault(name.lower(), []).append(name)
+
+        used_columns = set()
+        is_all = False
+
+        def find_columns(node, **kwargs):
+            nonlocal is_all
+            if isinstance(node, Star):
+                is_all = True
+            elif isinstance(node, Identifier):
+                if isinstance(node.parts[-1], Star):
+                    is_all = True
+                    return
+                # names which are not found in the file are aliases
+                used_columns.update(columns_map.get(node.parts[-1].lower(), []))
+
+        for target in query.targets:
+            if isinstance(target, Star):
+                return None
+        query_traversal(query, find_columns)
+        if is_all:
+            # star is used inside functions, count(*) for example
+            used_columns.update(file_columns[:1])
+        if len(used_columns) == 0:
+            # at least one column is required to keep count of rows
+            used_columns.update(file_columns[:1])
+        return [name for name in file_columns if name in used_columns]
+
+    @staticmethod
+    def _get_query_filters(where: ASTNode, file_columns: list) -> list:
+        """
+        Convert simple conditions of WHERE to filters of parquet reader: they are used to skip row groups.
+        The result is filtered by the query after reading anyway
+        """
+        conditions = []
+
+        def flatten(node):
+            if isinstance(node, BinaryOperation) and node.op.lower() == "and":
+                flatten(node.args[0])
+                flatten(node.args[1])
+            else:
+                conditions.append(node)
+
+        if where is not None:
+            flatten(where)
+
+        filters = []
+        for condition in conditions:
+            if (
+                isinstance(condition, BetweenOperation)
+                and isinstance(condition.args[1], Constant)
+                and isinstance(condition.args[2], Constant)
+            ):
+                condition = BinaryOperation(op="and", args=[
+                    BinaryOperation(op=">=", args=[condition.args[0], condition.args[1]]),
+                    BinaryOperation(op="<=", args=[condition.args[0], condition.args[2]]),
+                ])
+                filters += FileHandler._get_query_filters(condition, file_columns)
+                continue
+            if not isinstance(condition, BinaryOperation):
+                continue
+            op = condition.op.lower()
+            arg1, arg2 = condition.args
+            if isinstance(arg1, Constant) and isinstance(arg2, Identifier) and op in FILTER_OPERATORS:
+                arg1, arg2 = arg2, arg1
+                op = FILTER_OPERATORS_REVERSED[FILTER_OPERATORS[op]]
+            if not isinstance(arg1, Identifier) or isinstance(arg1.parts[-1], Star):
+                continue
+            column = arg1.parts[-1]
+            if column not in file_columns:
+                # names are not case sensitive in query
+                names = [x for x in file_columns if x.lower() == column.lower()]
+                if len(names) != 1:
+                    continue
+                column = names[0]
+            if op in FILTER_OPERATORS and isinstance(arg2, Constant) and arg2.value is not None:
+                filters.append((column, FILTER_OPERATORS[op], arg2.value))
+            elif (
+                op == "in"
+                and isinstance(arg2, Tuple)
+                and all(isinstance(x, Constant) and x.value is not None for x in arg2.items)
+            ):
+                filters.append((column, "in", [x.value for x in arg2.items]))
+        return filters
+
+    @staticmethod
+    def _read_parsed_source(file_path: str, query: Select) -> pd.DataFrame:
+        """
+        Read parsed file. Only columns used in query are read, row groups which don't match
+        simple conditions of query are skipped
+        """
+        file_columns = pq.read_schema(file_path, memory_map=True).names
+        columns = FileHandler._get_query_columns(query, file_columns)
+        filters = FileHandler._get_query_filters(query.where, file_columns)
+        if len(filters) > 0:
+            try:
+                table = pq.read_table(
+                    file_path, columns=columns, filters=filters, memory_map=True
+                )
+                return table.to_pandas()
+            except (pa.ArrowException, TypeError, ValueError):
+                # types of values in query are not compatible with types of columns
+                pass
+        table = pq.read_table(file_path, columns=columns, memory_map=True)
+        return table.to_pandas()
+
     @staticmethod
     def is_it_parquet(data: BytesIO) -> bool:
         # Check first and last 4 bytes equal to PAR1.
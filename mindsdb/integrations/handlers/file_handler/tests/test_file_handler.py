@@ -8,11 +8,12 @@ from unittest.mock import patch
 import pandas
 import pytest
 import responses
+from mindsdb_sql import parse_sql
 from mindsdb_sql.exceptions import ParsingException
 from mindsdb_sql.parser.ast import CreateTable, DropTables, Identifier, Select, Star
 from pytest_lazyfixture import lazy_fixture
 
-from mindsdb.integrations.handlers.file_handler.file_handler import FileHandler
+from mindsdb.integrations.handlers.file_handler.file_handler import FileHandler, PARSED_FILE_NAME
 from mindsdb.integrations.libs.response import RESPONSE_TYPE
 from mindsdb.interfaces.file.file_controller import FileController
 
@@ -226,6 +227,26 @@ class TestQuery:
         assert response.error_message is None
         assert expected_df.equals(response.data_frame)
 
+    def test_query_select_parsed(self, csv_file):
+        """Parsed copy of the file is used only with default parse options"""
+        file_dir = tempfile.mkdtemp(prefix="mindsdb_file_")
+        file_path = os.path.join(file_dir, "test.csv")
+        shutil.copy(csv_file, file_path)
+        parsed_df = pandas.DataFrame({"col_one": [100]})
+        assert FileHandler.save_parsed_source(parsed_df, file_dir) is True
+
+        class FileController(MockFileController):
+            def get_file_path(self, name):
+                return file_path
+
+        query = Select(targets=[Star()], from_table=Identifier(parts=["test"]))
+        file_handler = FileHandler(file_controller=FileController())
+        assert file_handler.query(query).data_frame.equals(parsed_df)
+
+        file_handler = FileHandler(file_controller=FileController(), connection_data={"clean_rows": False})
+        assert len(file_handler.query(query).data_frame) == len(test_file_content) - 1
+        shutil.rmtree(file_dir)
+
     def test_query_bad_type(self):
         """Test an invalid query type for files"""
         file_handler = FileHandler(file_controller=MockFileController())
@@ -293,6 +314,49 @@ def test_handle_source(file_path, expected_columns):
         assert df.values.tolist() == test_file_content[1:]
 
 
+def test_read_parsed_source(csv_file):
+    df, _col_map = FileHandler._handle_source(csv_file)
+    file_dir = tempfile.mkdtemp(prefix="mindsdb_file_")
+    assert FileHandler.save_parsed_source(df, file_dir) is True
+    parsed_file_path = os.path.join(file_dir, PARSED_FILE_NAME)
+
+    query = parse_sql("select col_one from test where col_two <= -2 and col_four != 'C'")
+    assert FileHandler._get_query_columns(query, df.columns.tolist()) == ["col_one", "col_two", "col_four"]
+    assert FileHandler._get_query_filters(query.where, df.columns.tolist()) == [
+        ("col_two", "<=", -2),
+        ("col_four", "!=", "C"),
+    ]
+    parsed_df = FileHandler._read_parsed_source(parsed_file_path, query)
+    assert parsed_df.values.tolist() == [[2, -2, "B"]]
+
+    query = parse_sql("select * from test")
+    assert FileHandler._read_parsed_source(parsed_file_path, query).equals(df)
+    shutil.rmtree(file_dir)
+
+
+def test_ingest_source(csv_file):
+    expected_df, _col_map = FileHandler._handle_source(csv_file)
+    file_dir = tempfile.mkdtemp(prefix="mindsdb_file_")
+    ds_meta = FileHandler.ingest_source(csv_file, file_dir)
+    assert ds_meta == {"row_count": 3, "column_names": test_file_content[0]}
+    parsed_df = pandas.read_parquet(os.path.join(file_dir, PARSED_FILE_NAME))
+    assert parsed_df.equals(expected_df)
+
+    # schema of the first chunk is extended by next chunks
+    csv_path = os.path.join(file_dir, "test_schema.csv")
+    with open(csv_path, "w") as f:
+        f.write("a,b,c\n" + "1,x,\n" * 10 + "1.5,2,y\n")
+    with patch("mindsdb.integrations.handlers.file_handler.file_handler.INGEST_CHUNK_SIZE", 5):
+        ds_meta = FileHandler.ingest_source(csv_path, file_dir)
+    assert ds_meta == {"row_count": 11, "column_names": ["a", "b", "c"]}
+    parsed_df = pandas.read_parquet(os.path.join(file_dir, PARSED_FILE_NAME))
+    assert parsed_df.values.tolist()[-2:] == [[1.0, "x", None], [1.5, "2", "y"]]
+
+    # files that can't be read by chunks
+    assert FileHandler.ingest_source(os.path.join(curr_dir(), "data", "test.json"), file_dir) is None
+    shutil.rmtree(file_dir)
+
+
 @pytest.mark.parametrize(
     "file_path,expected_file_type,expected_delimiter,expected_data_type",
     [
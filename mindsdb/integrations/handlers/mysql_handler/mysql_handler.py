@@ -7,10 +7,11 @@ from sqlalchemy import create_engine
 
 from mindsdb_sql import parse_sql
 from mindsdb_sql.render.sqlalchemy_render import SqlalchemyRender
+from mindsdb_sql.parser.ast import Identifier
 from mindsdb_sql.parser.ast.base import ASTNode
 
 from mindsdb.utilities import log
-from mindsdb.integrations.libs.base import DatabaseHandler
+from mindsdb.integrations.libs.base import DatabaseHandler, dataframe_to_rows
 from mindsdb.integrations.libs.response import (
     HandlerStatusResponse as StatusResponse,
     HandlerResponse as Response,
@@ -218,6 +219,39 @@ class MySQLHandler(DatabaseHandler):
         query_str = renderer.get_string(query, with_failback=True)
         return self.native_query(query_str)
 
+    def insert_dataframe(self, table: Identifier, df: pd.DataFrame, batch_size: int = 1000) -> Response:
+        """
+        Insert rows of dataframe into the table.
+        Rows are sent with executemany: the driver packs every batch into one multi-row INSERT
+        """
+        quote = SqlalchemyRender('mysql').dialect.identifier_preparer.quote
+        table_name = '.'.join(quote(part) for part in table.parts)
+        columns = ', '.join(quote(str(name)) for name in df.columns)
+        placeholders = ', '.join(['%s'] * len(df.columns))
+        query = f'INSERT INTO {table_name} ({columns}) VALUES ({placeholders})'
+
+        need_to_close = self.is_connected is False
+
+        connection = self.connect()
+        with connection.cursor() as cur:
+            try:
+                for start in range(0, len(df), batch_size):
+                    cur.executemany(query, dataframe_to_rows(df[start:start + batch_size]))
+                connection.commit()
+                response = Response(RESPONSE_TYPE.OK)
+            except Exception as e:
+                log.logger.error(f'Error inserting data into {table_name} on {self.connection_data["database"]}!')
+                response = Response(
+                    RESPONSE_TYPE.ERROR,
+                    error_message=str(e)
+                )
+                connection.rollback()
+
+        if need_to_close is True:
+            self.disconnect()
+
+        return response
+
     def get_tables(self) -> Response:
         """
         Get a list with all of the tabels in MySQL selected database
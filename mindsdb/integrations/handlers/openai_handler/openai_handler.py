@@ -119,6 +119,8 @@ class OpenAIHandler(BaseMLEngine):
                 "temperature",
                 "api_key",
                 "openai_api_key",
+                "cache_rows",
+                "predict_batching",
             }
         )
 
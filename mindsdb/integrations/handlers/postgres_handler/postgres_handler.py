@@ -1,15 +1,18 @@
 from collections import OrderedDict
+from uuid import uuid4
 
 import psycopg
+from psycopg import sql
 from psycopg.postgres import types
 from psycopg.pq import ExecStatus
 from pandas import DataFrame
 
 from mindsdb_sql import parse_sql
 from mindsdb_sql.render.sqlalchemy_render import SqlalchemyRender
+from mindsdb_sql.parser.ast import Identifier
 from mindsdb_sql.parser.ast.base import ASTNode
 
-from mindsdb.integrations.libs.base import DatabaseHandler
+from mindsdb.integrations.libs.base import DatabaseHandler, dataframe_to_rows
 from mindsdb.integrations.libs.const import HANDLER_CONNECTION_ARG_TYPE as ARG_TYPE
 from mindsdb.utilities import log
 from mindsdb.integrations.libs.response import (
@@ -179,6 +182,83 @@ class PostgresHandler(DatabaseHandler):
         query_str = self.renderer.get_string(query, with_failback=True)
         return self.native_query(query_str)
 
+    def query_stream(self, query: ASTNode, fetch_size: int = 1000):
+        """
+        Fetch result of SELECT query by chunks using server side cursor
+        :param query: The SQL query as AST
+        :param fetch_size: max count of rows in one chunk
+        :return: iterator of dataframes
+        """
+        query_str = self.renderer.get_string(query, with_failback=True)
+        need_to_close = self.is_connected is False
+
+        connection = self.connect()
+        try:
+            with connection.cursor(name=f'mindsdb_{uuid4().hex}') as cur:
+                cur.itersize = fetch_size
+                cur.execute(query_str)
+                columns = [x.name for x in cur.description]
+                is_first = True
+                while True:
+                    result = cur.fetchmany(fetch_size)
+                    if len(result) == 0 and not is_first:
+                        break
+                    is_first = False
+                    df = DataFrame(result, columns=columns)
+                    self._cast_dtypes(df, cur.description)
+                    yield df
+                    if len(result) < fetch_size:
+                        break
+            connection.commit()
+        except Exception:
+            log.logger.error(f'Error running query: {query_str} on {self.database}!')
+            connection.rollback()
+            raise
+        except GeneratorExit:
+            # consumer stopped reading before the end of result
+            connection.rollback()
+            raise
+        finally:
+            if need_to_close is True:
+                self.disconnect()
+
+    def insert_dataframe(self, table: Identifier, df: DataFrame, batch_size: int = 1000) -> Response:
+        """
+        Insert rows of dataframe into the table using COPY
+        :param table: name of the table
+        :param df: data to insert
+        :param batch_size: count of rows converted and sent to server at once
+        :return: response with status of operation
+        """
+        copy_query = sql.SQL('COPY {} ({}) FROM STDIN').format(
+            sql.Identifier(*table.parts),
+            sql.SQL(', ').join(sql.Identifier(str(name)) for name in df.columns)
+        )
+        need_to_close = self.is_connected is False
+
+        connection = self.connect()
+        try:
+            with connection.cursor() as cur:
+                with cur.copy(copy_query) as copy:
+                    for start in range(0, len(df), batch_size):
+                        for row in dataframe_to_rows(df[start:start + batch_size]):
+                            copy.write_row(row)
+            connection.commit()
+            response = Response(RESPONSE_TYPE.OK)
+        except Exception as e:
+            log.logger.error(f'Error inserting data into {table} on {self.database}!')
+            response = Response(
+                RESPONSE_TYPE.ERROR,
+                error_code=0,
+                error_message=str(e)
+            )
+            connection.rollback()
+
+        if need_to_close is True:
+            self.disconnect()
+
+        return response
+
     def get_tables(self) -> Response:
         """
         List all tables in PostgreSQL without the system tables information_schema and pg_catalog
@@ -3,7 +3,9 @@ from typing import List
 import pandas as pd
 
 from mindsdb.integrations.libs.api_handler import APITable
-from mindsdb.integrations.utilities.sql_utils import conditions_to_filter, project_dataframe, sort_dataframe
+from mindsdb.integrations.utilities.sql_utils import (
+    conditions_to_filter, extract_comparison_conditions, project_dataframe, sort_dataframe
+)
 from mindsdb_sql.parser import ast
 
 
@@ -131,13 +133,20 @@ class DirectMessagesTable(APITable):
 
     def select(self, query: ast.Select) -> pd.DataFrame:
 
-        filters = conditions_to_filter(query.where)
+        filters = {}
+        params = {}
+        for op, arg1, arg2 in extract_comparison_conditions(query.where):
+            if op == '=':
+                filters[arg1] = arg2
+            elif op == '>' and arg1 == 'sent_at':
+                # only messages after the date
+                params['oldest'] = arg2
+            else:
+                raise NotImplementedError
 
         if 'room_id' not in filters:
             raise NotImplementedError()
 
-        params = {}
-
         if query.limit:
             params['count'] = query.limit
 
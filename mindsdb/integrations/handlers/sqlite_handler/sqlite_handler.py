@@ -6,8 +6,9 @@ import sqlite3
 
 from mindsdb_sql import parse_sql
 from mindsdb_sql.render.sqlalchemy_render import SqlalchemyRender
-from mindsdb.integrations.libs.base import DatabaseHandler
+from mindsdb.integrations.libs.base import DatabaseHandler, dataframe_to_rows
 
+from mindsdb_sql.parser.ast import Identifier
 from mindsdb_sql.parser.ast.base import ASTNode
 
 from mindsdb.utilities import log
@@ -57,7 +58,8 @@ class SQLiteHandler(DatabaseHandler):
         if self.is_connected is True:
             return self.connection
 
-        self.connection = sqlite3.connect(self.connection_data['db_file'])
+        # handler can be used by different threads (one at a time) when it is returned to connections pool
+        self.connection = sqlite3.connect(self.connection_data['db_file'], check_same_thread=False)
         self.is_connected = True
 
         return self.connection
@@ -152,6 +154,46 @@ class SQLiteHandler(DatabaseHandler):
         query_str = renderer.get_string(query, with_failback=True)
         return self.native_query(query_str)
 
+    def insert_dataframe(self, table: Identifier, df: pd.DataFrame, batch_size: int = 1000) -> StatusResponse:
+        """
+        Insert rows of dataframe into the table using executemany.
+        Args:
+            table (Identifier): name of the table
+            df (pd.DataFrame): data to insert
+            batch_size (int): count of rows converted and sent at once
+        Returns:
+            HandlerResponse
+        """
+        quote = SqlalchemyRender('sqlite').dialect.identifier_preparer.quote
+        table_name = '.'.join(quote(part) for part in table.parts)
+        columns = ', '.join(quote(str(name)) for name in df.columns)
+        placeholders = ', '.join(['?'] * len(df.columns))
+        query = f'INSERT INTO {table_name} ({columns}) VALUES ({placeholders})'
+
+        need_to_close = self.is_connected is False
+
+        connection = self.connect()
+        cursor = connection.cursor()
+
+        try:
+            for start in range(0, len(df), batch_size):
+                cursor.executemany(query, dataframe_to_rows(df[start:start + batch_size]))
+            connection.commit()
+            response = Response(RESPONSE_TYPE.OK)
+        except Exception as e:
+            log.logger.error(f'Error inserting data into {table_name} on {self.connection_data["db_file"]}!')
+            response = Response(
+                RESPONSE_TYPE.ERROR,
+                error_message=str(e)
+            )
+            connection.rollback()
+
+        cursor.close()
+        if need_to_close is True:
+            self.disconnect()
+
+        return response
+
     def get_tables(self) -> StatusResponse:
         """
         Return list of entities that will be accessible as tables.
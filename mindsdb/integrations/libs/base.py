@@ -3,12 +3,14 @@ import inspect
 import logging
 import textwrap
 from _ast import AnnAssign, AugAssign
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 
 import pandas as pd
+from pandas.api import types as pd_types
+from mindsdb_sql.parser.ast import Identifier, Insert
 from mindsdb_sql.parser.ast.base import ASTNode
 
-from mindsdb.integrations.libs.response import HandlerResponse, HandlerStatusResponse
+from mindsdb.integrations.libs.response import HandlerResponse, HandlerStatusResponse, RESPONSE_TYPE
 
 LOG = logging.getLogger(__name__)
 
@@ -104,6 +106,29 @@ class BaseHandler:
         raise NotImplementedError()
 
 
+def dataframe_to_rows(df: pd.DataFrame) -> List[list]:
+    """ Convert dataframe to list of rows for DB-API drivers
+
+    Values are converted to python types, missing values (None, NaN, NaT, NA) are replaced with None
+
+    Args:
+        df (pd.DataFrame): input data
+
+    Returns:
+        List[list]: rows of dataframe
+    """
+    columns = []
+    for _, series in df.items():
+        if pd_types.is_datetime64_dtype(series.dtype):
+            # datetime.datetime instead of pd.Timestamp, NaT is converted to None
+            values = series.to_numpy().astype('datetime64[us]').astype(object)
+        else:
+            values = series.to_numpy(dtype=object, copy=True)
+        values[series.isna().to_numpy()] = None
+        columns.append(values)
+    return [list(row) for row in zip(*columns)]
+
+
 class DatabaseHandler(BaseHandler):
     """
     Base class for handlers associated to data storage systems (e.g. databases, data warehouses, streaming services, etc.)
@@ -112,6 +137,59 @@ class DatabaseHandler(BaseHandler):
     def __init__(self, name: str):
         super().__init__(name)
 
+    def query_stream(self, query: ASTNode, fetch_size: int = 1000) -> Iterator[pd.DataFrame]:
+        """ Receive SELECT query as AST and return its result by chunks
+
+        Default implementation executes the query with self.query and splits the result.
+        Handlers which are able to fetch data by portions (server side cursors, paging)
+        should override it to keep memory usage bounded
+
+        Args:
+            query (ASTNode): select query
+            fetch_size (int): max count of rows in one chunk
+
+        Returns:
+            Iterator[pd.DataFrame]: chunks of result. At least one chunk (can be empty) is returned
+        """
+        response = self.query(query)
+        if response.type == RESPONSE_TYPE.ERROR:
+            raise Exception(response.error_message)
+
+        df = response.data_frame
+        if response.type != RESPONSE_TYPE.TABLE or df is None:
+            df = pd.DataFrame()
+
+        yield df[:fetch_size]
+        for start in range(fetch_size, len(df), fetch_size):
+            yield df[start:start + fetch_size]
+
+    def insert_dataframe(self, table: Identifier, df: pd.DataFrame, batch_size: int = 1000) -> HandlerResponse:
+        """ Insert rows of dataframe into the table
+
+        Default implementation sends INSERT queries with batch_size rows in each of them using self.query.
+        Handlers which have faster way of bulk loading (COPY, executemany, native insert)
+        should override it
+
+        Args:
+            table (Identifier): name of the table
+            df (pd.DataFrame): data to insert, names of columns of df are the names of table columns
+            batch_size (int): max count of rows in one query
+
+        Returns:
+            HandlerResponse
+        """
+        columns = [Identifier(parts=[name]) for name in df.columns]
+        for start in range(0, len(df), batch_size):
+            insert_ast = Insert(
+                table=table,
+                columns=columns,
+                values=dataframe_to_rows(df[start:start + batch_size])
+            )
+            response = self.query(insert_ast)
+            if response.type == RESPONSE_TYPE.ERROR:
+                return response
+        return HandlerResponse(RESPONSE_TYPE.OK)
+
 
 class PredictiveHandler(BaseHandler):
     """
@@ -20,13 +20,17 @@ from mindsdb.utilities.context import context as ctx
 from mindsdb.utilities.config import Config
 
 
+# count of models which are kept loaded in one process
+HANDLERS_CACHE_SIZE = 5
+
+
 class HandlersCache(UserDict):
-    def __init__(self, max_size: int = 5) -> None:
+    def __init__(self, max_size: int = HANDLERS_CACHE_SIZE) -> None:
         self._max_size = max_size
         super().__init__()
 
     def __setitem__(self, key, value) -> None:
-        if len(self.data) > self._max_size:
+        if key not in self.data and len(self.data) >= self._max_size:
             sorted_elements = sorted(
                 self.data.items(),
                 key=lambda x: x[1]['last_usage_at']
@@ -16,10 +16,13 @@ In particular, three big components are included:
 
 """
 
+import json
 import socket
 import datetime as dt
 from typing import Optional
+from functools import partial
 
+import numpy as np
 import pandas as pd
 from sqlalchemy import func, null
 from sqlalchemy.sql.functions import coalesce
@@ -42,12 +45,14 @@ from mindsdb.integrations.libs.const import PREDICTOR_STATUS
 from mindsdb.interfaces.database.database import DatabaseController
 from mindsdb.interfaces.storage.model_fs import ModelStorage, HandlerStorage
 from mindsdb.utilities.context import context as ctx
+from mindsdb.utilities.cache import get_rows_cache
 from mindsdb.interfaces.model.functions import get_model_records
 from mindsdb.utilities.functions import mark_process
 import mindsdb.utilities.profiler as profiler
 from mindsdb.utilities.ml_task_queue.producer import MLTaskProducer
 from mindsdb.utilities.ml_task_queue.const import ML_TASK_TYPE
 from mindsdb.integrations.libs.process_cache import process_cache, empty_callback
+from mindsdb.integrations.libs.predict_batcher import predict_batcher
 
 try:
     import torch.multiprocessing as mp
@@ -60,6 +65,68 @@ class MLEngineException(Exception):
     pass
 
 
+def predict_unique_rows(df: pd.DataFrame, model_id: int, predict_fn, predict_args: dict = None) -> pd.DataFrame:
+    """ Get predictions for every unique input row only once
+
+    Identical rows are predicted once. Predictions are saved in the rows cache
+    and rows seen by the model before are not sent to predict_fn
+
+    Args:
+        df (pd.DataFrame): input data
+        model_id (int): id of the model (unique for every version of model)
+        predict_fn (Callable): function which makes predictions for dataframe
+        predict_args (dict): args of prediction, rows predicted with other args are not reused
+
+    Returns:
+        pd.DataFrame: predictions, one row for every row of input data
+    """
+    key_columns = sorted(col for col in df.columns if col != '__mindsdb_row_id')
+    if len(df) == 0 or len(key_columns) == 0:
+        return predict_fn(df)
+
+    # rows are comparable only with the same columns, types and args of prediction
+    key_df = df[key_columns]
+    scope = (
+        model_id,
+        tuple((column, str(dtype)) for column, dtype in key_df.dtypes.items()),
+        json.dumps(predict_args or {}, sort_keys=True, default=str)
+    )
+
+    # 128-bit key of row: two hashes with different salts
+    try:
+        hash1 = pd.util.hash_pandas_object(key_df, index=False).to_numpy()
+        hash2 = pd.util.hash_pandas_object(key_df, index=False, hash_key='mindsdb_rows_key').to_numpy()
+    except TypeError:
+        # values can't be hashed (for example, dicts or lists)
+        return predict_fn(df)
+    keys = [f'{h1:016x}{h2:016x}' for h1, h2 in zip(hash1, hash2)]
+
+    codes, unique_keys = pd.factorize(pd.Series(keys))
+    unique_keys = list(unique_keys)
+
+    rows_cache = get_rows_cache()
+    predicted = rows_cache.get_many(scope, unique_keys)
+
+    missed = [i for i, key in enumerate(unique_keys) if key not in predicted]
+    if len(missed) > 0:
+        _, first_positions = np.unique(codes, return_index=True)
+        df_missed = df.iloc[first_positions[missed]].reset_index(drop=True)
+        predictions = predict_fn(df_missed)
+
+        if len(predictions) != len(df_missed):
+            # predictions can't be matched with input rows
+            return predict_fn(df)
+
+        if '__mindsdb_row_id' in predictions.columns:
+            predictions = predictions.drop(columns=['__mindsdb_row_id'])
+        new_rows = dict(zip([unique_keys[i] for i in missed], predictions.to_dict(orient='records')))
+        rows_cache.set_many(scope, new_rows)
+        predicted.update(new_rows)
+
+    unique_predictions = pd.DataFrame([predicted[key] for key in unique_keys])
+    return unique_predictions.iloc[codes].reset_index(drop=True)
+
+
 class BaseMLEngineExec:
 
     def __init__(self, name, integration_id, integration_engine, handler_class):
@@ -258,35 +325,64 @@ class BaseMLEngineExec:
         if predictor_record.status != PREDICTOR_STATUS.COMPLETE:
             raise Exception("Error: model creation not completed")
 
+        params = {} if params is None else dict(params)
+        # memoization of predictions for rows, it can be enabled for model or for query
+        cache_rows = params.pop('cache_rows', None)
+        if cache_rows is None:
+            cache_rows = (predictor_record.learn_args or {}).get('using', {}).get('cache_rows', False)
+
+        # coalescing of concurrent predictions, it can be enabled in config, for model or for query
+        predict_batching = params.pop('predict_batching', None)
+        if predict_batching is None:
+            predict_batching = (predictor_record.learn_args or {}).get('using', {}).get(
+                'predict_batching', predict_batcher.is_enabled()
+            )
+
         args = {
             'pred_format': pred_format,
-            'predict_params': {} if params is None else params
+            'predict_params': params
         }
 
-        try:
-            task = self.base_ml_executor.apply_async(
-                task_type=ML_TASK_TYPE.PREDICT,
-                model_id=predictor_record.id,
-                payload={
-                    'handler_meta': {
-                        'module_path': self.handler_class.__module__,
-                        'class_name': self.handler_class.__name__,
-                        'engine': self.engine,
-                        'integration_id': self.integration_id
+        def run_predict(df):
+            try:
+                task = self.base_ml_executor.apply_async(
+                    task_type=ML_TASK_TYPE.PREDICT,
+                    model_id=predictor_record.id,
+                    payload={
+                        'handler_meta': {
+                            'module_path': self.handler_class.__module__,
+                            'class_name': self.handler_class.__name__,
+                            'engine': self.engine,
+                            'integration_id': self.integration_id
+                        },
+                        'context': ctx.dump(),
+                        'predictor_record': predictor_record,
+                        'args': args
                     },
-                    'context': ctx.dump(),
-                    'predictor_record': predictor_record,
-                    'args': args
-                },
-                dataframe=df
+                    dataframe=df
+                )
+                return task.result()
+            except Exception as e:
+                msg = str(e).strip()
+                if msg == '':
+                    msg = e.__class__.__name__
+                msg = f'[{self.name}/{model_name}]: {msg}'
+                raise MLEngineException(msg) from e
+
+        predict_fn = run_predict
+        if predict_batching is True and '__mdb_forecast_offset' not in df.columns:
+            # only requests with the same input columns and params can be predicted together
+            batch_key = (
+                predictor_record.id,
+                tuple((column, str(dtype)) for column, dtype in df.dtypes.items()),
+                json.dumps(args, sort_keys=True, default=str)
             )
-            predictions = task.result()
-        except Exception as e:
-            msg = str(e).strip()
-            if msg == '':
-                msg = e.__class__.__name__
-            msg = f'[{self.name}/{model_name}]: {msg}'
-            raise MLEngineException(msg) from e
+            predict_fn = partial(predict_batcher.predict, batch_key, predict_fn=run_predict)
+
+        if cache_rows is True and '__mdb_forecast_offset' not in df.columns:
+            predictions = predict_unique_rows(df, predictor_record.id, predict_fn, args)
+        else:
+            predictions = predict_fn(df)
 
         # mdb indexes
         if '__mindsdb_row_id' not in predictions.columns and '__mindsdb_row_id' in df.columns:
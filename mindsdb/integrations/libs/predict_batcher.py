@@ -0,0 +1,170 @@
+"""
+Micro-batching of concurrent predictions.
+
+Requests to the same model with the same parameters which come within short window are
+coalesced into one call of the ML engine. The first request of the batch waits for the
+window (or until the batch has 'max_rows' rows) and runs the prediction for all of them,
+other requests wait for their part of result.
+
+If predictions of the batch can not be matched to input rows (count of rows differs) or
+the prediction failed, requests are predicted one by one.
+
+Configuration in mindsdb config:
+    "predict_batching": {
+        "enabled": false,  # can be enabled for model by 'predict_batching' param in USING
+        "window_ms": 5,  # max time to wait for other requests
+        "max_rows": 1000  # max count of rows in batch
+    }
+
+Statistics:
+
+    predict_batcher.stats()  # {'requests': ..., 'batches': ..., 'batch_size': {...}, 'latency_ms': {...}}
+"""
+
+import time
+import bisect
+import threading
+from concurrent.futures import Future
+from typing import Callable, Hashable
+
+import pandas as pd
+
+from mindsdb.utilities.config import Config
+
+
+class Histogram:
+    """ Count of values by buckets, bucket is named by its upper bound
+    """
+
+    def __init__(self, bounds: list):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+
+    def add(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+
+    def to_dict(self) -> dict:
+        names = [f'<={x}' for x in self.bounds] + [f'>{self.bounds[-1]}']
+        return dict(zip(names, self.counts))
+
+
+class PredictBatch:
+    def __init__(self):
+        self.items = []
+        self.rows_count = 0
+        self.full = threading.Event()
+
+
+class PredictBatcher:
+    def __init__(self, window_ms: float = None, max_rows: int = None):
+        self._window_ms = window_ms
+        self._max_rows = max_rows
+        self._lock = threading.Lock()
+        self._batches = {}
+        self.statistic = {
+            'requests': 0,
+            'batches': 0,
+            'fallbacks': 0
+        }
+        self.batch_size_histogram = Histogram([1, 2, 4, 8, 16, 32, 64, 128, 256, 512])
+        self.latency_histogram = Histogram([1, 2, 5, 10, 20, 50, 100, 200, 500, 1000])
+
+    @property
+    def settings(self) -> dict:
+        return Config().get('predict_batching', {})
+
+    @property
+    def window_ms(self) -> float:
+        if self._window_ms is None:
+            return self.settings.get('window_ms', 5)
+        return self._window_ms
+
+    @property
+    def max_rows(self) -> int:
+        if self._max_rows is None:
+            return self.settings.get('max_rows', 1000)
+        return self._max_rows
+
+    def is_enabled(self) -> bool:
+        return self.settings.get('enabled', False) is True
+
+    def predict(self, key: Hashable, df: pd.DataFrame, predict_fn: Callable) -> pd.DataFrame:
+        """ Make predictions for dataframe together with concurrent requests with the same key
+
+        Args:
+            key (Hashable): requests with the same key can be predicted together
+            df (pd.DataFrame): input data
+            predict_fn (Callable): function which makes predictions for dataframe
+
+        Returns:
+            pd.DataFrame: predictions for the input data
+        """
+        if len(df) == 0 or len(df) >= self.max_rows:
+            return predict_fn(df)
+
+        start_time = time.perf_counter()
+        future = Future()
+        with self._lock:
+            batch = self._batches.get(key)
+            is_leader = batch is None
+            if is_leader:
+                batch = PredictBatch()
+                self._batches[key] = batch
+            batch.items.append((df, future))
+            batch.rows_count += len(df)
+            if batch.rows_count >= self.max_rows:
+                # the batch is closed, next requests start new one
+                del self._batches[key]
+                batch.full.set()
+
+        if is_leader:
+            batch.full.wait(self.window_ms / 1000)
+            with self._lock:
+                if self._batches.get(key) is batch:
+                    del self._batches[key]
+            self._run_batch(batch, predict_fn)
+
+        try:
+            return future.result()
+        finally:
+            with self._lock:
+                self.statistic['requests'] += 1
+                self.latency_histogram.add((time.perf_counter() - start_time) * 1000)
+
+    def _run_batch(self, batch: PredictBatch, predict_fn: Callable):
+        with self._lock:
+            self.statistic['batches'] += 1
+            self.batch_size_histogram.add(len(batch.items))
+
+        if len(batch.items) > 1:
+            try:
+                batch_df = pd.concat([df for df, _ in batch.items], ignore_index=True)
+                predictions = predict_fn(batch_df)
+                if len(predictions) == len(batch_df):
+                    predictions = predictions.reset_index(drop=True)
+                    offset = 0
+                    for df, future in batch.items:
+                        future.set_result(predictions.iloc[offset:offset + len(df)].reset_index(drop=True))
+                        offset += len(df)
+                    return
+            except Exception:
+                pass
+            # errors of one request must not affect others
+            with self._lock:
+                self.statistic['fallbacks'] += 1
+
+        for df, future in batch.items:
+            try:
+                future.set_result(predict_fn(df))
+            except Exception as e:
+                future.set_exception(e)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.statistic)
+            stats['batch_size'] = self.batch_size_histogram.to_dict()
+            stats['latency_ms'] = self.latency_histogram.to_dict()
+        return stats
+
+
+predict_batcher = PredictBatcher()
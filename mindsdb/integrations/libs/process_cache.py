@@ -1,15 +1,24 @@
+import os
 import sys
 import time
 import threading
 from typing import Optional, Callable
+from functools import partial
+from collections import OrderedDict, Counter, deque
 from concurrent.futures import ProcessPoolExecutor, Future
+from concurrent.futures.process import BrokenProcessPool
 
+import psutil
 from pandas import DataFrame
 
+from mindsdb.utilities import log
 from mindsdb.utilities.config import Config
 from mindsdb.utilities.context import context as ctx
+from mindsdb.utilities.frame_transport import SharedFrame, share_df, unshare_df
 from mindsdb.utilities.ml_task_queue.const import ML_TASK_TYPE
-from mindsdb.integrations.libs.learn_process import learn_process, predict_process
+from mindsdb.integrations.libs.learn_process import learn_process, predict_process, HANDLERS_CACHE_SIZE
+
+logger = log.get_log('main')
 
 
 def init_ml_handler(module_path):
@@ -35,21 +44,28 @@ class WarmProcess:
         produce daemon processes, which can not be used for learning. That
         bahaviour may be changed only using inheritance.
     """
-    def __init__(self, initializer: Optional[Callable] = None, initargs: tuple = ()):
+    def __init__(self, initializer: Optional[Callable] = None, initargs: tuple = (),
+                 max_markers: int = None, on_task_done: Optional[Callable] = None):
         """ create and init new process
 
             Args:
                 initializer (Callable): the same as ProcessPoolExecutor initializer
                 initargs (tuple): the same as ProcessPoolExecutor initargs
+                max_markers (int): count of models which process keeps loaded, older markers are forgotten
+                on_task_done (Callable): function which is called with the process when task is done
         """
         self.pool = ProcessPoolExecutor(1, initializer=initializer, initargs=initargs)
         self.last_usage_at = time.time()
-        self._markers = set()
+        self._markers = OrderedDict()
+        self._max_markers = max_markers
+        self._on_task_done = on_task_done
+        self._broken = False
         # region bacause of ProcessPoolExecutor does not start new process
         # untill it get a task, we need manually run dummy task to force init.
+        # Next task is queued by the executor until initialization is done.
         self.task = self.pool.submit(dummy_task)
-        self._init_done = False
-        self.task.add_done_callback(self._init_done_callback)
+        self._init_task = self.task
+        self.task.add_done_callback(self._task_done_callback)
         # endregion
 
     def __del__(self):
@@ -66,13 +82,12 @@ class WarmProcess:
     def _shutdown(self):
         self.pool.shutdown(wait=True)
 
-    def _init_done_callback(self, _task):
-        """ callback for initial task
-        """
-        self._init_done = True
-
-    def _update_last_usage_at_callback(self, _task):
+    def _task_done_callback(self, task):
         self.last_usage_at = time.time()
+        if isinstance(task.exception(), BrokenProcessPool):
+            self._broken = True
+        if self._on_task_done is not None:
+            self._on_task_done(self)
 
     def ready(self) -> bool:
         """ check is process ready to get a task or not
@@ -80,12 +95,20 @@ class WarmProcess:
             Returns:
                 bool
         """
-        if self._init_done is False:
-            self.task.result()
-            self._init_done = True
-        if self.task is None or self.task.done():
-            return True
-        return False
+        if self.is_broken():
+            return False
+        return self.task is None or self.task.done() or self.task is self._init_task
+
+    def is_broken(self) -> bool:
+        """ check if process was terminated abruptly and can not run tasks
+
+            Returns:
+                bool
+        """
+        # idle process can be killed by OS (for example, because of lack of memory): no task fails in this case
+        if self._broken is False and getattr(self.pool, '_broken', False):
+            self._broken = True
+        return self._broken
 
     def add_marker(self, marker: tuple):
         """ remember that that process processed task for that model
@@ -94,7 +117,10 @@ class WarmProcess:
                 marker (tuple): identifier of model
         """
         if marker is not None:
-            self._markers.add(marker)
+            self._markers[marker] = True
+            self._markers.move_to_end(marker)
+            if self._max_markers is not None and len(self._markers) > self._max_markers:
+                self._markers.popitem(last=False)
 
     def has_marker(self, marker: tuple) -> bool:
         """ check if that process processed task for model
@@ -117,6 +143,9 @@ class WarmProcess:
         """
         return len(self._markers) > 0
 
+    def markers_count(self) -> int:
+        return len(self._markers)
+
     def apply_async(self, func: Callable, *args: tuple, **kwargs: dict) -> Future:
         """ Run new task
 
@@ -130,58 +159,106 @@ class WarmProcess:
         """
         if not self.ready():
             raise Exception('Process task is not ready')
-        self.task = self.pool.submit(
-            func, *args, **kwargs
-        )
-        self.task.add_done_callback(self._update_last_usage_at_callback)
+        try:
+            self.task = self.pool.submit(
+                func, *args, **kwargs
+            )
+        except BrokenProcessPool:
+            self._broken = True
+            raise
+        self.task.add_done_callback(self._task_done_callback)
         self.last_usage_at = time.time()
         return self.task
 
 
 def warm_function(func, context: str, *args, **kwargs):
     ctx.load(context)
+    # dataframes are passed through shared memory in both directions
+    args = [unshare_df(arg) for arg in args]
     try:
-        return func(*args, **kwargs)
+        return share_df(func(*args, **kwargs))
     except Exception as e:
         raise RuntimeError(str(e)) from e
 
 
 class ProcessCache:
-    """ simple cache for WarmProcess-es
+    """ cache for WarmProcess-es
+
+        Task for a model is sent to the process which already processed the model (has marker of the model),
+        so the handler and the model are not loaded again. If there is no free process, then new one is started
+        while count of processes is less than 'max_processes' and memory usage is less than 'max_memory_usage',
+        otherwise the task waits in the queue. Count of simultaneous predictions of one model is limited by
+        'max_model_concurrency'. Learn tasks are not queued: they always get a process.
+
+        Configuration in mindsdb config:
+            "ml_process_pool": {
+                "ttl": 120,  # time to live of unused process
+                "max_processes": null,  # max count of processes for predictions, default is count of cpu
+                "max_model_concurrency": 2,  # max count of simultaneous predictions of one model
+                "max_memory_usage": 0.9,  # share of used memory at which idle processes are stopped
+                "preload": {"lightwood": 1}  # count of processes started beforehand for the handler
+            }
     """
-    def __init__(self, ttl: int = 120):
+    def __init__(self, ttl: int = None):
         """ Args:
-            ttl (int) time to live for unused process
+            ttl (int) time to live for unused process, default is taken from config
         """
         self.cache = {}
         self._init = False
-        self._lock = threading.Lock()
+        self._lock = threading.RLock()
+        self._condition = threading.Condition(self._lock)
         self._ttl = ttl
+        self._settings = None
         self._keep_alive = {}
+        self._queue = deque()
+        self._running_models = Counter()
+        self._statistic = {
+            'affinity_hits': 0,
+            'affinity_misses': 0,
+            'queued': 0,
+            'processes_started': 0,
+            'processes_stopped': 0
+        }
         self._stop_event = threading.Event()
         self.cleaner_thread = None
+        self.scheduler_thread = None
         self._start_clean()
 
     def __del__(self):
         self._stop_clean()
 
+    @property
+    def settings(self) -> dict:
+        if self._settings is None:
+            settings = Config().get('ml_process_pool', {})
+            self._settings = {
+                'ttl': self._ttl if self._ttl is not None else settings.get('ttl', 120),
+                'max_processes': settings.get('max_processes') or os.cpu_count() or 1,
+                'max_model_concurrency': settings.get('max_model_concurrency', 2),
+                'max_memory_usage': settings.get('max_memory_usage', 0.9),
+                'preload': settings.get('preload', {})
+            }
+        return self._settings
+
     def _start_clean(self) -> None:
-        """ start worker that close connections after ttl expired
+        """ start workers that run queued tasks and stop unused processes
         """
-        if (
-            isinstance(self.cleaner_thread, threading.Thread)
-            and self.cleaner_thread.is_alive()
-        ):
-            return
         self._stop_event.clear()
-        self.cleaner_thread = threading.Thread(target=self._clean)
-        self.cleaner_thread.daemon = True
-        self.cleaner_thread.start()
+        for attr_name, target in (('cleaner_thread', self._clean), ('scheduler_thread', self._schedule)):
+            thread = getattr(self, attr_name)
+            if isinstance(thread, threading.Thread) and thread.is_alive():
+                continue
+            thread = threading.Thread(target=target)
+            thread.daemon = True
+            thread.start()
+            setattr(self, attr_name, thread)
 
     def _stop_clean(self) -> None:
-        """ stop clean worker
+        """ stop workers
         """
         self._stop_event.set()
+        with self._condition:
+            self._condition.notify_all()
 
     def init(self):
         """ run processes for specified handlers
@@ -192,17 +269,18 @@ class ProcessCache:
         is_cloud = config.get('cloud', False)
 
         if config['ml_task_queue']['type'] != 'redis':
-            lightwood_handler = integration_controller.handler_modules['lightwood']
-            if lightwood_handler.Handler is not None:
-                preload_handlers[lightwood_handler.Handler] = 4 if is_cloud else 1
-
-            huggingface_handler = integration_controller.handler_modules['huggingface']
-            if huggingface_handler.Handler is not None:
-                preload_handlers[huggingface_handler.Handler] = 1 if is_cloud else 0
-
-            openai_handler = integration_controller.handler_modules['openai']
-            if openai_handler.Handler is not None:
-                preload_handlers[openai_handler.Handler] = 1 if is_cloud else 0
+            preload_counts = {
+                'lightwood': 4 if is_cloud else 1,
+                'huggingface': 1 if is_cloud else 0,
+                'openai': 1 if is_cloud else 0
+            }
+            preload_counts.update(self.settings['preload'])
+            for handler_name, count in preload_counts.items():
+                if count <= 0 or handler_name not in integration_controller.handler_modules:
+                    continue
+                handler = integration_controller.handler_modules[handler_name]
+                if handler.Handler is not None:
+                    preload_handlers[handler.Handler] = count
 
         with self._lock:
             if self._init is False:
@@ -213,20 +291,149 @@ class ProcessCache:
                         'last_usage_at': time.time(),
                         'handler_module': handler.__module__,
                         'processes': [
-                            WarmProcess(init_ml_handler, (handler.__module__,))
+                            self._start_process(handler.__module__)
                             for _x in range(preload_handlers[handler])
                         ]
                     }
 
+    def _start_process(self, handler_module: str) -> WarmProcess:
+        self._statistic['processes_started'] += 1
+        return WarmProcess(
+            init_ml_handler, (handler_module,),
+            max_markers=HANDLERS_CACHE_SIZE,
+            on_task_done=self._process_done_callback
+        )
+
+    def _stop_process(self, process: WarmProcess) -> None:
+        self._statistic['processes_stopped'] += 1
+        process.shutdown()
+
+    def _process_done_callback(self, _process: WarmProcess) -> None:
+        """ wake up scheduler: process is free for next task
+        """
+        with self._condition:
+            self._condition.notify_all()
+
+    def _processes_count(self) -> int:
+        return sum(len(x['processes']) for x in self.cache.values())
+
+    def _is_memory_exhausted(self) -> bool:
+        return psutil.virtual_memory().percent / 100 >= self.settings['max_memory_usage']
+
+    def _remove_broken(self, processes: list) -> None:
+        """ stop processes which can't run tasks. Must be called under lock
+        """
+        for process in [p for p in processes if p.is_broken()]:
+            processes.remove(process)
+            self._stop_process(process)
+
+    def _find_process(self, processes: list, model_marker: tuple) -> Optional[WarmProcess]:
+        """ choose free process for the task: with loaded model or, if there is no such, with the least
+            count of loaded models
+
+            Returns:
+                WarmProcess or None if there is no free processes
+        """
+        free_processes = [p for p in processes if p.ready()]
+        for process in free_processes:
+            if process.has_marker(model_marker):
+                return process
+        if len(free_processes) == 0:
+            return None
+        return min(free_processes, key=lambda p: (p.markers_count(), p.last_usage_at))
+
+    def _dispatch(self, item: dict) -> bool:
+        """ try to run task in free process. Must be called under lock
+
+            Args:
+                item (dict): task description
+
+            Returns:
+                bool: True if task is sent to process
+        """
+        if item['future'].cancelled():
+            return True
+
+        is_predict = item['task_type'] == ML_TASK_TYPE.PREDICT
+        model_marker = item['model_marker']
+        if is_predict and self._running_models[model_marker] >= self.settings['max_model_concurrency']:
+            return False
+
+        cache_record = self.cache[item['handler_name']]
+        self._remove_broken(cache_record['processes'])
+        warm_process = self._find_process(cache_record['processes'], model_marker)
+        if warm_process is None:
+            if (
+                is_predict
+                and (
+                    self._processes_count() >= self.settings['max_processes']
+                    or self._is_memory_exhausted()
+                )
+            ):
+                return False
+            warm_process = self._start_process(cache_record['handler_module'])
+            cache_record['processes'].append(warm_process)
+
+        if item['future'].set_running_or_notify_cancel() is False:
+            return True
+
+        if warm_process.has_marker(model_marker):
+            self._statistic['affinity_hits'] += 1
+        else:
+            self._statistic['affinity_misses'] += 1
+
+        payload = item['payload']
+        item['dataframe'] = share_df(item['dataframe'])
+        try:
+            task = warm_process.apply_async(
+                warm_function, item['func'], payload['context'], payload, item['dataframe']
+            )
+        except Exception as e:
+            # task is already marked as running: it can't be queued again
+            if warm_process.is_broken():
+                self._remove_broken(cache_record['processes'])
+            if isinstance(item['dataframe'], SharedFrame):
+                item['dataframe'].delete()
+            item['future'].set_exception(e)
+            return True
+        cache_record['last_usage_at'] = time.time()
+        warm_process.add_marker(model_marker)
+        self._running_models[model_marker] += 1
+        task.add_done_callback(partial(self._task_done_callback, item))
+        return True
+
+    def _task_done_callback(self, item: dict, task: Future) -> None:
+        """ pass result of the task to the future which was returned to caller
+        """
+        with self._lock:
+            model_marker = item['model_marker']
+            self._running_models[model_marker] -= 1
+            if self._running_models[model_marker] <= 0:
+                del self._running_models[model_marker]
+
+        if isinstance(item['dataframe'], SharedFrame):
+            # if the process did not take dataframe
+            item['dataframe'].delete()
+
+        exception = task.exception()
+        if exception is None:
+            try:
+                result = unshare_df(task.result())
+            except Exception as e:
+                exception = e
+        if exception is not None:
+            item['future'].set_exception(exception)
+        else:
+            item['future'].set_result(result)
+
     def apply_async(self, task_type: ML_TASK_TYPE, model_id: int, payload: dict, dataframe: DataFrame = None) -> Future:
-        """ run new task. If possible - do it in existing process, if not - start new one.
+        """ run new task. If possible - do it in existing process, if not - start new one or wait in queue.
 
-            Args: TODO rewrite!
-                handler (object): handler class
-                func (Callable): function to run
-                model_marker (tuple): if any of processes processed task with same marker - new task will be sent to it
-                args (tuple): args to be passed to function
-                kwargs (dict): kwargs to be passed to function
+            Args:
+                task_type (ML_TASK_TYPE): type of the task
+                model_id (int): id of the model
+                payload (dict): task parameters
+                dataframe (DataFrame): input data of the task
 
             Returns:
                 Future
@@ -240,71 +447,110 @@ class ProcessCache:
 
         handler_module_path = payload['handler_meta']['module_path']
         handler_name = payload['handler_meta']['engine']
-        model_marker = (model_id, payload['context']['company_id'])
+        item = {
+            'task_type': task_type,
+            'handler_name': handler_name,
+            'model_marker': (model_id, payload['context']['company_id']),
+            'func': func,
+            'payload': payload,
+            'dataframe': dataframe,
+            'future': Future()
+        }
         with self._lock:
             if handler_name not in self.cache:
-                warm_process = WarmProcess(init_ml_handler, (handler_module_path,))
                 self.cache[handler_name] = {
                     'last_usage_at': None,
                     'handler_module': handler_module_path,
-                    'processes': [warm_process]
+                    'processes': []
                 }
-            else:
-                warm_process = None
-                if model_marker is not None:
-                    try:
-                        warm_process = next(
-                            p for p in self.cache[handler_name]['processes']
-                            if p.ready() and p.has_marker(model_marker)
-                        )
-                    except StopIteration:
-                        pass
-                if warm_process is None:
-                    try:
-                        warm_process = next(
-                            p for p in self.cache[handler_name]['processes']
-                            if p.ready()
-                        )
-                    except StopIteration:
-                        pass
-                if warm_process is None:
-                    warm_process = WarmProcess(init_ml_handler, (handler_module_path,))
-                    self.cache[handler_name]['processes'].append(warm_process)
-
-            task = warm_process.apply_async(warm_function, func, payload['context'], payload, dataframe)
-            self.cache[handler_name]['last_usage_at'] = time.time()
-            warm_process.add_marker(model_marker)
-        return task
+            # tasks from the queue go first
+            self._run_queued()
+            if self._dispatch(item) is False:
+                self._statistic['queued'] += 1
+                self._queue.append(item)
+                self._condition.notify_all()
+        return item['future']
+
+    def _run_queued(self) -> None:
+        """ send queued tasks to free processes. Must be called under lock
+        """
+        for item in list(self._queue):
+            if self._dispatch(item):
+                self._queue.remove(item)
+
+    def _schedule(self) -> None:
+        """ worker that run queued tasks when processes become free
+        """
+        with self._condition:
+            while self._stop_event.is_set() is False:
+                try:
+                    self._run_queued()
+                except Exception as e:
+                    logger.error(f'Error of ML tasks scheduling: {e}')
+                # memory can be freed by other programs, so check queue periodically
+                self._condition.wait(timeout=1 if len(self._queue) > 0 else None)
 
     def _clean(self) -> None:
         """ worker that stop unused processes
         """
         while self._stop_event.wait(timeout=10) is False:
-            with self._lock:
-                for handler_name in self.cache.keys():
-                    processes = self.cache[handler_name]['processes']
-                    processes.sort(key=lambda x: x.is_marked())
-
-                    expected_count = 0
-                    if handler_name in self._keep_alive:
-                        expected_count = self._keep_alive[handler_name]
-
-                    # stop processes which was used, it needs to free memory
-                    for i, process in enumerate(processes):
-                        if (
-                            process.ready()
-                            and process.is_marked()
-                            and (time.time() - process.last_usage_at) > self._ttl
-                        ):
-                            processes.pop(i)
-                            # del process
-                            process.shutdown()
-                            break
-
-                    while expected_count > len(processes):
-                        processes.append(
-                            WarmProcess(init_ml_handler, (self.cache[handler_name]['handler_module'],))
-                        )
+            self._clean_processes()
+
+    def _clean_processes(self) -> None:
+        """ stop broken processes and processes which are not used during ttl, start processes to keep alive
+        """
+        with self._lock:
+            is_memory_exhausted = self._is_memory_exhausted()
+            for handler_name in self.cache.keys():
+                processes = self.cache[handler_name]['processes']
+
+                expected_count = 0
+                if handler_name in self._keep_alive:
+                    expected_count = self._keep_alive[handler_name]
+
+                # broken process is never ready: it is removed regardless of its state
+                self._remove_broken(processes)
+
+                # stop processes which was used, it needs to free memory
+                idle_processes = sorted(
+                    (p for p in processes if p.ready() and p.is_marked()),
+                    key=lambda p: p.last_usage_at
+                )
+                for process in idle_processes:
+                    if (
+                        (time.time() - process.last_usage_at) > self.settings['ttl']
+                        or is_memory_exhausted
+                    ):
+                        processes.remove(process)
+                        self._stop_process(process)
+                        if is_memory_exhausted:
+                            # stop one process at once: memory usage will be checked on next iteration
+                            is_memory_exhausted = False
+
+                while expected_count > len(processes):
+                    processes.append(
+                        self._start_process(self.cache[handler_name]['handler_module'])
+                    )
+
+    def stats(self) -> dict:
+        """ metrics of pool
+
+            Returns:
+                dict
+        """
+        with self._lock:
+            stats = dict(self._statistic)
+            stats['queue_size'] = len(self._queue)
+            stats['running_models'] = len(self._running_models)
+            stats['handlers'] = {
+                handler_name: {
+                    'processes': len(record['processes']),
+                    'busy': sum(1 for p in record['processes'] if p.ready() is False),
+                    'models': sum(p.markers_count() for p in record['processes'])
+                }
+                for handler_name, record in self.cache.items()
+            }
+        return stats
 
 
 process_cache = ProcessCache()
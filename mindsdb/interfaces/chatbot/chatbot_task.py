@@ -12,6 +12,7 @@ from mindsdb.utilities import log
 from .polling import MessageCountPolling, RealtimePolling
 from .memory import DBMemory, HandlerMemory
 from .chatbot_executor import MultiModeBotExecutor, BotExecutor
+from .dispatcher import MessageDispatcher
 
 from .types import ChatBotMessage
 
@@ -37,7 +38,7 @@ class ChatBotTask(BaseTask):
 
         database_name = db.Integration.query.get(bot_record.database_id).name
 
-        self.chat_handler = self.session.integration_controller.get_handler(database_name)
+        self.chat_handler = self.session.integration_controller.get_handler(database_name, cached=False)
         if not isinstance(self.chat_handler, APIChatHandler):
             raise Exception(f"Can't use chat database: {database_name}")
 
@@ -63,7 +64,11 @@ class ChatBotTask(BaseTask):
         else:
             self.bot_executor_cls = MultiModeBotExecutor
 
-        self.chat_pooling.run(stop_event)
+        self.dispatcher = MessageDispatcher()
+        try:
+            self.chat_pooling.run(stop_event)
+        finally:
+            self.dispatcher.shutdown(wait=False)
 
     def on_message(self, chat_memory, message: ChatBotMessage):
 
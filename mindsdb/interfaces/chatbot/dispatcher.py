@@ -0,0 +1,122 @@
+"""
+Concurrent processing of chat messages.
+
+Messages of different chats are processed in parallel by a pool of threads. Messages of one chat
+are processed in order of arrival: the chat is handled by one worker at a time, new messages
+of the chat wait in its queue.
+
+Configuration in mindsdb config:
+    "chatbots": {
+        "max_workers": 8  # max count of chats which are processed at the same time
+    }
+
+Statistics:
+
+    dispatcher.stats()  # {'in_flight': ..., 'queued': ..., 'processed': ..., 'failed': ..., 'latency_avg': ...}
+"""
+
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Hashable
+
+from mindsdb.interfaces.storage import db
+from mindsdb.interfaces.database.integrations import integration_controller
+from mindsdb.utilities import log
+from mindsdb.utilities.config import Config
+from mindsdb.utilities.context import context as ctx
+
+
+class MessageDispatcher:
+    def __init__(self, max_workers: int = None):
+        if max_workers is None:
+            max_workers = Config().get('chatbots', {}).get('max_workers', 8)
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='chatbot')
+
+        # workers don't have context of the task
+        self._ctx_dump = ctx.dump()
+
+        # chat_id -> queue of (submitted_at, fnc, args), chat is in the dict while it is processed
+        self._queues = {}
+        self._lock = threading.Lock()
+        self._is_stopped = False
+        self.statistic = {
+            'in_flight': 0,
+            'queued': 0,
+            'processed': 0,
+            'failed': 0,
+            'latency_last': 0,
+            'latency_max': 0,
+            'latency_total': 0
+        }
+
+    def submit(self, chat_id: Hashable, fnc: Callable, *args):
+        """ Process message of the chat after previous messages of this chat
+
+        Args:
+            chat_id (Hashable): id of chat
+            fnc (Callable): function to call
+            args: arguments of the function
+        """
+        with self._lock:
+            if self._is_stopped:
+                return
+            self.statistic['queued'] += 1
+            queue = self._queues.get(chat_id)
+            if queue is not None:
+                # chat is processed by a worker
+                queue.append((time.time(), fnc, args))
+                return
+            self._queues[chat_id] = deque([(time.time(), fnc, args)])
+            self._pool.submit(self._run_chat, chat_id)
+
+    def _run_chat(self, chat_id: Hashable):
+        ctx.load(self._ctx_dump)
+        while True:
+            with self._lock:
+                queue = self._queues[chat_id]
+                if len(queue) == 0 or self._is_stopped:
+                    del self._queues[chat_id]
+                    return
+                submitted_at, fnc, args = queue.popleft()
+
+                latency = time.time() - submitted_at
+                self.statistic['queued'] -= 1
+                self.statistic['in_flight'] += 1
+                self.statistic['latency_last'] = latency
+                self.statistic['latency_max'] = max(self.statistic['latency_max'], latency)
+                self.statistic['latency_total'] += latency
+
+            is_failed = False
+            try:
+                fnc(*args)
+            except Exception as e:
+                is_failed = True
+                log.logger.error(f'Error processing of chat {chat_id}: {e}')
+                db.session.rollback()
+            finally:
+                # message is processed: return connections to integrations to the pool
+                integration_controller.handlers_cache.release()
+                db.session.remove()
+                with self._lock:
+                    self.statistic['in_flight'] -= 1
+                    self.statistic['failed' if is_failed else 'processed'] += 1
+
+    def shutdown(self, wait: bool = True):
+        """ Stop processing, messages which are not started yet are dropped """
+        with self._lock:
+            self._is_stopped = True
+            self.statistic['queued'] = 0
+        self._pool.shutdown(wait=wait)
+
+    def stats(self) -> dict:
+        """ Metrics of processing, latency is time in seconds which message waits in queue """
+        with self._lock:
+            stats = dict(self.statistic)
+            stats['chats'] = len(self._queues)
+        started = stats['processed'] + stats['failed'] + stats['in_flight']
+        latency_total = stats.pop('latency_total')
+        stats['latency_avg'] = latency_total / started if started > 0 else 0
+        return stats
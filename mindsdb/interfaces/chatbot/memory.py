@@ -1,3 +1,5 @@
+import threading
+from collections import OrderedDict, deque
 
 from mindsdb_sql.parser.ast import Identifier, Select, BinaryOperation, Constant, OrderBy
 
@@ -10,14 +12,21 @@ from .types import ChatBotMessage
 class BaseMemory:
     '''
     base class to work with chatbot memory
+
+    Last MAX_DEPTH messages of chat are kept in memory (for MAX_CACHED_CHATS recently used chats).
+    New messages are appended to the cached history, the whole history is loaded only for not cached chat
     '''
     MAX_DEPTH = 100
+    MAX_CACHED_CHATS = 1000
 
     def __init__(self, chat_task, chat_params):
         # in memory yet
         self._modes = {}
         self._hide_history_before = {}
-        self._cache = {}
+        # chat_id -> deque of last messages
+        self._cache = OrderedDict()
+        # chats are processed in parallel threads
+        self._lock = threading.Lock()
         self.chat_params = chat_params
         self.chat_task = chat_task
 
@@ -60,14 +69,35 @@ class BaseMemory:
 
         return self._add_to_history(chat_id, chat_message)
 
-    def get_chat_history(self, chat_id, cached=True):
-        if cached and chat_id in self._cache:
-            history = self._cache[chat_id]
-        else:
-            history = self._get_chat_history(chat_id)
+    def _get_cache(self, chat_id):
+        with self._lock:
+            history = self._cache.get(chat_id)
+            if history is not None:
+                self._cache.move_to_end(chat_id)
+            return history
+
+    def _set_cache(self, chat_id, history):
+        history = deque(history or [], maxlen=self.MAX_DEPTH)
+        with self._lock:
             self._cache[chat_id] = history
+            self._cache.move_to_end(chat_id)
+            while len(self._cache) > self.MAX_CACHED_CHATS:
+                self._cache.popitem(last=False)
+        return history
+
+    def _append_to_cache(self, chat_id, chat_message):
+        history = self._get_cache(chat_id)
+        if history is not None:
+            history.append(chat_message)
+
+    def get_chat_history(self, chat_id, cached=True):
+        history = self._get_cache(chat_id)
+        if history is None:
+            history = self._set_cache(chat_id, self._get_chat_history(chat_id))
+        elif not cached:
+            history.extend(self._get_new_messages(chat_id, list(history)))
 
-        history = self._apply_hiding(chat_id, history)
+        history = self._apply_hiding(chat_id, list(history))
         return history
 
     def _add_to_history(self, chat_id, chat_message):
@@ -76,6 +106,13 @@ class BaseMemory:
     def _get_chat_history(self, chat_id):
         raise NotImplementedError
 
+    def _get_new_messages(self, chat_id, history):
+        '''
+        messages which were sent after the last message of cached history
+        '''
+        # without source of new messages cached history is up-to-date
+        return []
+
 
 class HandlerMemory(BaseMemory):
     '''
@@ -83,52 +120,81 @@ class HandlerMemory(BaseMemory):
     '''
 
     def _add_to_history(self, chat_id, chat_message):
-        # do nothing. sent message will be stored by handler db
+        # do nothing. sent message will be stored by handler db and fetched with new messages
         pass
 
-    def _get_chat_history(self, chat_id):
+    def _query_messages(self, chat_id, after=None):
         t_params = self.chat_params['chat_table']
 
-        text_col = t_params['text_col']
-        username_col = t_params['username_col']
         time_col = t_params['time_col']
 
+        where = BinaryOperation(
+            op='=',
+            args=[
+                Identifier(t_params['chat_id_col']),
+                Constant(chat_id)
+            ]
+        )
+        if after is not None:
+            where = BinaryOperation(op='and', args=[
+                where,
+                BinaryOperation(op='>', args=[Identifier(time_col), Constant(after)])
+            ])
+
         ast_query = Select(
-            targets=[Identifier(text_col),
-                     Identifier(username_col),
+            targets=[Identifier(t_params['text_col']),
+                     Identifier(t_params['username_col']),
                      Identifier(time_col)],
             from_table=Identifier(t_params['name']),
-            where=BinaryOperation(
-                op='=',
-                args=[
-                    Identifier(t_params['chat_id_col']),
-                    Constant(chat_id)
-                ]
-            ),
+            where=where,
             order_by=[OrderBy(Identifier(time_col))],
             limit=Constant(self.MAX_DEPTH),
         )
 
         resp = self.chat_task.chat_handler.query(ast_query)
-        if resp.data_frame is None:
-            return
+        return resp.data_frame
+
+    def _df_to_messages(self, df, after=None):
+        t_params = self.chat_params['chat_table']
+        time_col = t_params['time_col']
 
-        df = resp.data_frame
+        if after is not None:
+            # in case if handler ignores the condition
+            df = df[df[time_col] > after]
 
         # get last messages
         df = df.iloc[-self.MAX_DEPTH:]
 
-        result = []
-        for _, rec in df.iterrows():
-            chatbot_message = ChatBotMessage(
+        return [
+            ChatBotMessage(
                 ChatBotMessage.Type.DIRECT,
-                rec[text_col],
-                user=rec[username_col],
-                sent_at=rec[time_col]
+                text,
+                user=user,
+                sent_at=sent_at
             )
-            result.append(chatbot_message)
+            for text, user, sent_at in zip(df[t_params['text_col']], df[t_params['username_col']], df[time_col])
+        ]
 
-        return result
+    def _get_chat_history(self, chat_id):
+        df = self._query_messages(chat_id)
+        if df is None:
+            return
+
+        return self._df_to_messages(df)
+
+    def _get_new_messages(self, chat_id, history):
+        if len(history) == 0:
+            return self._get_chat_history(chat_id) or []
+
+        after = history[-1].sent_at
+        try:
+            df = self._query_messages(chat_id, after=after)
+        except NotImplementedError:
+            # handler doesn't support filter by time
+            df = self._query_messages(chat_id)
+        if df is None:
+            return []
+        return self._df_to_messages(df, after=after)
 
 
 class DBMemory(BaseMemory):
@@ -139,16 +205,20 @@ class DBMemory(BaseMemory):
     def _add_to_history(self, chat_id, message):
 
         chat_bot_id = self.chat_task.bot_id
-        message = db.ChatBotsHistory(
+        record = db.ChatBotsHistory(
             chat_bot_id=chat_bot_id,
             type=message.type.name,
             text=message.text,
             user=message.user,
             destination=chat_id,
+            sent_at=message.sent_at,
         )
-        db.session.add(message)
+        db.session.add(record)
         db.session.commit()
 
+        # messages are stored only by this task: cached history is kept up-to-date
+        self._append_to_cache(chat_id, message)
+
     def _get_chat_history(self, chat_id):
         chat_bot_id = self.chat_task.bot_id
         query = db.ChatBotsHistory.query\
@@ -156,9 +226,10 @@ class DBMemory(BaseMemory):
                 db.ChatBotsHistory.chat_bot_id == chat_bot_id,
                 db.ChatBotsHistory.destination == chat_id
             )\
-            .order_by(db.ChatBotsHistory.sent_at)\
+            .order_by(db.ChatBotsHistory.sent_at.desc())\
             .limit(self.MAX_DEPTH)
 
+        # last messages in chronological order
         result = [
             ChatBotMessage(
                 rec.type,
@@ -166,7 +237,7 @@ class DBMemory(BaseMemory):
                 rec.user,
                 sent_at=rec.sent_at,
             )
-            for rec in query
+            for rec in reversed(query.all())
         ]
         return result
 
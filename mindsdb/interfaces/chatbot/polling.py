@@ -45,11 +45,8 @@ class MessageCountPolling(BasePolling):
             try:
                 chat_ids = self.check_message_count()
                 for chat_id in chat_ids:
-                    chat_memory = self.chat_task.memory.get_chat(chat_id)
-
-                    message = self.get_last_message(chat_memory)
-                    if message:
-                        self.chat_task.on_message(chat_memory, message)
+                    # chats are processed in parallel
+                    self.chat_task.dispatcher.submit(chat_id, self.process_chat, chat_id)
 
             except Exception as e:
                 log.logger.error(e)
@@ -59,9 +56,18 @@ class MessageCountPolling(BasePolling):
             log.logger.debug(f'running {self.chat_task.bot_id}')
             time.sleep(7)
 
+    def process_chat(self, chat_id):
+        chat_memory = self.chat_task.memory.get_chat(chat_id)
+
+        message = self.get_last_message(chat_memory)
+        if message:
+            self.chat_task.on_message(chat_memory, message)
+
     def get_last_message(self, chat_memory):
         # retrive from history
         history = chat_memory.get_history()
+        if len(history) == 0:
+            return
         last_message = history[-1]
         if last_message.user == self.chat_task.bot_params['bot_username']:
             # the last message is from bot
@@ -87,12 +93,8 @@ class MessageCountPolling(BasePolling):
         if resp.data_frame is None:
             raise BotException('Error to get count of messages')
 
-        chats = {}
-        for row in resp.data_frame.to_dict('records'):
-            chat_id = row[id_col]
-            msgs = row[msgs_col]
-
-            chats[chat_id] = msgs
+        df = resp.data_frame
+        chats = dict(zip(df[id_col], df[msgs_col]))
 
         if self.chats_prev is None:
             # first run
@@ -136,7 +138,7 @@ class RealtimePolling(BasePolling):
         chat_id = row[t_params['chat_id_col']]
 
         chat_memory = self.chat_task.memory.get_chat(chat_id)
-        self.chat_task.on_message(chat_memory, message)
+        self.chat_task.dispatcher.submit(chat_id, self.chat_task.on_message, chat_memory, message)
 
     def run(self, stop_event):
         t_params = self.params['chat_table']
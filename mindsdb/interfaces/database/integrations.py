@@ -1,5 +1,7 @@
 import os
 import sys
+import site
+import json
 import base64
 import shutil
 import tempfile
@@ -10,12 +12,14 @@ import multiprocessing
 from time import time
 from pathlib import Path
 from copy import deepcopy
+from contextlib import contextmanager
 from typing import Optional
 from textwrap import dedent
 from collections import OrderedDict
 
 from sqlalchemy import func
 
+from mindsdb.__about__ import __version__ as mindsdb_version
 from mindsdb.interfaces.storage import db
 from mindsdb.utilities.config import Config
 from mindsdb.interfaces.storage.fs import FsStore, FileStorage, RESOURCE_GROUP
@@ -35,18 +39,203 @@ import mindsdb.utilities.profiler as profiler
 logger = get_log()
 
 
+class HandlersPool:
+    """ Pool of handlers (and their connections) of one integration
+
+        Handler is leased by thread on first use and stays leased by this thread until it is released
+        (HandlersCache.release is called after every query is processed).
+        Count of handlers is limited by max_size: when all handlers are leased, thread waits for released one
+    """
+
+    def __init__(self, min_size: int, max_size: int, wait_timeout: float, health_check_interval: float):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.wait_timeout = wait_timeout
+        self.health_check_interval = health_check_interval
+
+        # list of dicts {'handler', 'released_at', 'checked_at'}
+        self.idle = []
+        # thread_id -> {'handler', 'leased_at', 'checked_at'}
+        self.leased = {}
+        # thread_id -> time: slots reserved for handlers which are being created
+        self.reserved = {}
+        self.closed = False
+        self.condition = threading.Condition()
+
+        self.wait_count = 0
+        self.wait_time = 0
+        self.timeouts = 0
+        self.created = 0
+
+    @property
+    def size(self) -> int:
+        return len(self.idle) + len(self.leased) + len(self.reserved)
+
+    def checkout(self, thread_id: int) -> Optional[DatabaseHandler]:
+        """ get handler for the thread
+
+            Returns:
+                DatabaseHandler: handler for the thread, or None if a new handler have to be created and added
+                    to pool using checkin_new
+        """
+        with self.condition:
+            record = self.leased.get(thread_id)
+            if record is not None:
+                return record['handler']
+
+            start_time = time()
+            deadline = start_time + self.wait_timeout
+            waited = False
+            while True:
+                while len(self.idle) > 0:
+                    record = self.idle.pop()
+                    handler = record['handler']
+                    if not self._is_healthy(record):
+                        self._disconnect(handler)
+                        continue
+                    self.leased[thread_id] = {
+                        'handler': handler, 'leased_at': time(), 'checked_at': record['checked_at']
+                    }
+                    return handler
+
+                if self.size < self.max_size:
+                    self.reserved[thread_id] = time()
+                    return None
+
+                # pool is full: wait for released handler
+                if not waited:
+                    waited = True
+                    self.wait_count += 1
+                remaining = deadline - time()
+                if remaining <= 0:
+                    self.timeouts += 1
+                    raise Exception(
+                        f'Timeout ({self.wait_timeout}s) of waiting for connection from pool '
+                        f'(max size: {self.max_size})'
+                    )
+                self.condition.wait(timeout=remaining)
+                self.wait_time += time() - start_time
+                start_time = time()
+
+    def checkin_new(self, thread_id: int, handler: DatabaseHandler):
+        """ add new handler to pool and lease it by the thread """
+        with self.condition:
+            self.reserved.pop(thread_id, None)
+            old_record = self.leased.get(thread_id)
+            if old_record is not None and old_record['handler'] is not handler:
+                self._put_idle(old_record)
+            self.leased[thread_id] = {'handler': handler, 'leased_at': time(), 'checked_at': time()}
+            self.created += 1
+
+    def release(self, thread_id: int):
+        """ return handler leased by the thread to the pool """
+        with self.condition:
+            self.reserved.pop(thread_id, None)
+            record = self.leased.pop(thread_id, None)
+            if record is not None:
+                self._put_idle(record)
+            self.condition.notify()
+
+    def is_leased(self, thread_id: int) -> bool:
+        with self.condition:
+            return thread_id in self.leased
+
+    def _put_idle(self, record):
+        handler = record['handler']
+        if self.closed:
+            self._disconnect(handler)
+            return
+        # time of the last health check is kept: usage of handler doesn't mean that connection is alive
+        self.idle.append({'handler': handler, 'released_at': time(), 'checked_at': record['checked_at']})
+
+    def _is_healthy(self, record) -> bool:
+        if time() - record['checked_at'] < self.health_check_interval:
+            return True
+        handler = record['handler']
+        if getattr(handler, 'is_connected', True) is False:
+            # connection is not opened, it will be opened on first use
+            return True
+        try:
+            is_healthy = handler.check_connection().success is True
+        except Exception:
+            return False
+        record['checked_at'] = time()
+        return is_healthy
+
+    @staticmethod
+    def _disconnect(handler):
+        try:
+            handler.disconnect()
+        except Exception:
+            pass
+
+    def clean(self, ttl: float, alive_threads: set) -> None:
+        """ close handlers that were not in use for ttl, take back handlers from finished threads """
+        with self.condition:
+            for thread_id in list(self.leased.keys()):
+                if thread_id not in alive_threads:
+                    self._put_idle(self.leased.pop(thread_id))
+                    self.condition.notify()
+            for thread_id in list(self.reserved.keys()):
+                if thread_id not in alive_threads or self.reserved[thread_id] + ttl < time():
+                    del self.reserved[thread_id]
+                    self.condition.notify()
+
+            expired = [
+                record for record in self.idle
+                if record['released_at'] + ttl < time()
+            ]
+            # oldest first
+            expired.sort(key=lambda x: x['released_at'])
+            for record in expired:
+                if len(self.idle) + len(self.leased) <= self.min_size:
+                    break
+                self.idle.remove(record)
+                self._disconnect(record['handler'])
+
+    def close(self) -> None:
+        with self.condition:
+            self.closed = True
+            for record in self.idle:
+                self._disconnect(record['handler'])
+            self.idle = []
+            self.condition.notify_all()
+
+    def is_empty(self) -> bool:
+        return self.size == 0
+
+    def stats(self) -> dict:
+        with self.condition:
+            return {
+                'active': len(self.leased),
+                'idle': len(self.idle),
+                'max_size': self.max_size,
+                'created': self.created,
+                'wait_count': self.wait_count,
+                'wait_time': self.wait_time,
+                'timeouts': self.timeouts,
+            }
+
+
 class HandlersCache:
-    """ Cache for data handlers that keep connections opened during ttl time from handler last use
+    """ Cache for data handlers: pools of handlers with opened connections, one pool per integration.
+        Handlers that are not in use are kept opened during ttl time from last use
     """
 
-    def __init__(self, ttl: int = 60):
+    def __init__(self, ttl: int = None):
         """ init cache
 
             Args:
-                ttl (int): time to live (in seconds) for record in cache
+                ttl (int): time to live (in seconds) of idle handler in cache
         """
-        self.ttl = ttl
-        self.handlers = {}
+        config = Config().get('connection_pool', {})
+        self.ttl = ttl if ttl is not None else config.get('ttl', 60)
+        self.min_size = config.get('min_size', 0)
+        self.max_size = config.get('max_size', 20)
+        self.wait_timeout = config.get('wait_timeout', 30)
+        self.health_check_interval = config.get('health_check_interval', 30)
+
+        self.pools = {}
         self._lock = threading.RLock()
         self._stop_event = threading.Event()
         self.cleaner_thread = None
@@ -72,8 +261,12 @@ class HandlersCache:
         """
         self._stop_event.set()
 
+    @staticmethod
+    def _pool_key(name: str) -> tuple:
+        return (name.lower(), ctx.company_id)
+
     def set(self, handler: DatabaseHandler):
-        """ add (or replace) handler in cache
+        """ add handler to cache, it is leased by current thread
 
             Args:
                 handler (DatabaseHandler)
@@ -81,73 +274,178 @@ class HandlersCache:
         # do not cache connections in handlers processes
         if multiprocessing.current_process().name.startswith('HandlerProcess'):
             return
+        pool = self._get_pool(handler.name)
+        try:
+            handler.connect()
+        except Exception:
+            pass
+        pool.checkin_new(threading.get_native_id(), handler)
+
+    def get(self, name: str) -> Optional[DatabaseHandler]:
+        """ get handler from cache by name. Waits for free handler if pool is exhausted
+
+            Args:
+                name (str): handler name
+
+            Returns:
+                DatabaseHandler: handler or None if new handler have to be created and added to cache
+        """
+        if multiprocessing.current_process().name.startswith('HandlerProcess'):
+            return None
+        # pool is created before the first handler: slot for the handler is reserved in the pool
+        return self._get_pool(name).checkout(threading.get_native_id())
+
+    def _get_pool(self, name: str) -> HandlersPool:
+        """ get pool of handlers of integration, create it if it doesn't exist
+
+            Args:
+                name (str): handler name
+
+            Returns:
+                HandlersPool
+        """
         with self._lock:
-            try:
-                key = (handler.name, ctx.company_id, threading.get_native_id())
-                handler.connect()
-                self.handlers[key] = {
-                    'handler': handler,
-                    'expired_at': time() + self.ttl
-                }
-            except Exception:
-                pass
+            key = self._pool_key(name)
+            pool = self.pools.get(key)
+            if pool is None:
+                pool = HandlersPool(
+                    min_size=self.min_size,
+                    max_size=self.max_size,
+                    wait_timeout=self.wait_timeout,
+                    health_check_interval=self.health_check_interval
+                )
+                self.pools[key] = pool
             self._start_clean()
+        return pool
 
-    def get(self, name: str) -> Optional[DatabaseHandler]:
-        """ get handler from cache by name
+    def release(self, name: str = None) -> None:
+        """ return to pools handlers leased by current thread
+
+            Args:
+                name (str): name of handler to release, all handlers are released if it is not set
+        """
+        thread_id = threading.get_native_id()
+        with self._lock:
+            if name is None:
+                pools = list(self.pools.values())
+            else:
+                pools = [self.pools[key] for key in [self._pool_key(name)] if key in self.pools]
+        for pool in pools:
+            pool.release(thread_id)
+
+    def is_leased(self, name: str) -> bool:
+        """ check if handler is leased by current thread
 
             Args:
                 name (str): handler name
 
             Returns:
-                DatabaseHandler
+                bool
         """
         with self._lock:
-            key = (name, ctx.company_id, threading.get_native_id())
-            if (
-                key not in self.handlers
-                or self.handlers[key]['expired_at'] < time()
-            ):
-                return None
-            self.handlers[key]['expired_at'] = time() + self.ttl
-            return self.handlers[key]['handler']
+            pool = self.pools.get(self._pool_key(name))
+        if pool is None:
+            return False
+        return pool.is_leased(threading.get_native_id())
 
     def delete(self, name: str) -> None:
-        """ delete handler from cache
+        """ delete handlers of integration from cache
 
             Args:
                 name (str): handler name
         """
         with self._lock:
-            key = (name, ctx.company_id, threading.get_native_id())
-            if key in self.handlers:
-                try:
-                    self.handlers[key].disconnect()
-                except Exception:
-                    pass
-                del self.handlers[key]
-            if len(self.handlers) == 0:
+            pool = self.pools.pop(self._pool_key(name), None)
+            if pool is not None:
+                pool.close()
+            if len(self.pools) == 0:
                 self._stop_clean()
 
+    def stats(self) -> dict:
+        """ metrics of pools
+
+            Returns:
+                dict: integration name -> metrics of pool
+        """
+        with self._lock:
+            return {
+                name: pool.stats()
+                for (name, company_id), pool in self.pools.items()
+                if company_id == ctx.company_id
+            }
+
     def _clean(self) -> None:
         """ worker that delete from cache handlers that was not in use for ttl
         """
         while self._stop_event.wait(timeout=3) is False:
+            alive_threads = {thread.native_id for thread in threading.enumerate()}
             with self._lock:
-                for key in list(self.handlers.keys()):
-                    if (
-                        self.handlers[key]['expired_at'] < time()
-                        and sys.getrefcount(self.handlers[key]) == 2    # returned ref count is always 1 higher
-                    ):
-                        try:
-                            self.handlers[key].disconnect()
-                        except Exception:
-                            pass
-                        del self.handlers[key]
-                if len(self.handlers) == 0:
+                for key in list(self.pools.keys()):
+                    pool = self.pools[key]
+                    pool.clean(self.ttl, alive_threads)
+                    if pool.is_empty():
+                        del self.pools[key]
+                if len(self.pools) == 0:
                     self._stop_event.set()
 
 
+class HandlerModules:
+    """ Modules of handlers. Module is imported on first access to it
+    """
+
+    def __init__(self, controller):
+        self.controller = controller
+        self.modules = {}
+        # handler name -> import path of module that is not imported yet
+        self.import_paths = {}
+        self._lock = threading.RLock()
+
+    def register(self, name: str, import_path: str) -> None:
+        """ add module which will be imported on first access
+
+            Args:
+                name (str): handler name
+                import_path (str): import path of module
+        """
+        self.import_paths[name] = import_path
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.modules or name in self.import_paths
+
+    def __setitem__(self, name: str, module) -> None:
+        self.import_paths.pop(name, None)
+        self.modules[name] = module
+
+    def __getitem__(self, name: str):
+        module = self.modules.get(name)
+        if module is not None:
+            return module
+        with self._lock:
+            if name in self.modules:
+                return self.modules[name]
+            if name not in self.import_paths:
+                raise KeyError(name)
+            import_path = self.import_paths.pop(name)
+            try:
+                module = importlib.import_module(import_path)
+                handler_meta = self.controller._get_handler_meta(module)
+            except Exception as e:
+                # state of environment was changed after metadata of handler was saved to index
+                logger.error(f"Can't import handler '{name}': {e}")
+                handler_meta = self.controller.handlers_import_status.get(name, {'name': name})
+                handler_meta['import'] = dict(handler_meta.get('import', {}), success=False, error_message=str(e))
+                self.controller.handlers_import_status[name] = handler_meta
+                raise KeyError(name)
+            self.controller.handlers_import_status[handler_meta['name']] = handler_meta
+            return module
+
+    def get(self, name: str, default=None):
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+
 class IntegrationController:
     @staticmethod
     def _is_not_empty_str(s):
@@ -225,10 +523,9 @@ class IntegrationController:
 
         self.handlers_cache.delete(name)
 
-        # check permanent integration
-        if name in self.handler_modules:
-            handler = self.handler_modules[name]
-
+        # check permanent integration. Module can fail to import: get() doesn't raise KeyError in that case
+        handler = self.handler_modules.get(name)
+        if handler is not None:
             if getattr(handler, 'permanent', False) is True:
                 raise Exception('Unable to drop: is permanent integration')
 
@@ -302,19 +599,10 @@ class IntegrationController:
             ):
                 data['connection'] = None
 
-        integration_type = None
-        integration_module = self.handler_modules.get(integration_record.engine)
-        if hasattr(integration_module, 'type'):
-            integration_type = integration_module.type
-
-        class_type = None
-        if integration_module is not None and inspect.isclass(integration_module.Handler):
-            if issubclass(integration_module.Handler, DatabaseHandler):
-                class_type = 'sql'
-            if issubclass(integration_module.Handler, APIHandler):
-                class_type = 'api'
-            if issubclass(integration_module.Handler, BaseMLEngine):
-                class_type = 'ml'
+        # it is taken from metadata: to not import module of handler
+        handler_meta = self.handlers_import_status.get(integration_record.engine, {})
+        integration_type = handler_meta.get('type')
+        class_type = handler_meta.get('class_type')
 
         return {
             'id': integration_record.id,
@@ -429,11 +717,42 @@ class IntegrationController:
         shutil.copytree(folder_from, folder_to, dirs_exist_ok=True)
         storage_to.folder_sync(root_path)
 
+    @contextmanager
+    def use_handler(self, name):
+        """ lease handler from pool for the block of code. If the handler was already leased by
+            the thread before, it is not released at the exit
+
+            Args:
+                name (str): handler name
+
+            Yields:
+                handler
+        """
+        is_leased = self.handlers_cache.is_leased(name)
+        try:
+            yield self.get_handler(name)
+        finally:
+            if not is_leased:
+                self.handlers_cache.release(name)
+
     @profiler.profile()
-    def get_handler(self, name, case_sensitive=False):
-        handler = self.handlers_cache.get(name)
-        if handler is not None:
-            return handler
+    def get_handler(self, name, case_sensitive=False, cached=True):
+        """ get handler of integration. Data handler is leased from pool by the thread
+            until it is released (HandlersCache.release)
+
+            Args:
+                name (str): handler name
+                case_sensitive (bool): search integration by name using case sensitive comparison
+                cached (bool): if False, new handler is created and it is not added to the pool.
+                    It is for long-living consumers (subscriptions of triggers and chatbots)
+
+            Returns:
+                handler
+        """
+        if cached:
+            handler = self.handlers_cache.get(name)
+            if handler is not None:
+                return handler
 
         if case_sensitive:
             integration_record = db.session.query(db.Integration).filter_by(company_id=ctx.company_id, name=name).first()
@@ -451,14 +770,16 @@ class IntegrationController:
         integration_name = integration_data['name']
         logger.debug("%s.get_handler: connection_data=%s, engine=%s", self.__class__.__name__, connection_data, integration_engine)
 
-        if integration_engine not in self.handler_modules:
+        # handler is imported on first use: import status is updated if it fails
+        handler_module = self.handler_modules.get(integration_engine)
+        integration_meta = self.handlers_import_status.get(integration_engine)
+        if integration_meta is None:
             raise Exception(f"Can't find handler for '{integration_name}' ({integration_engine})")
 
-        integration_meta = self.handlers_import_status[integration_engine]
-        if integration_meta["import"]["success"] is False:
+        if handler_module is None or integration_meta["import"]["success"] is False:
             msg = dedent(f'''\
                 Handler '{integration_engine}' cannot be used. Reason is:
-                    {integration_meta['import']['error_message']}
+                    {integration_meta['import'].get('error_message')}
             ''')
             is_cloud = Config().get('cloud', False)
             if is_cloud is False:
@@ -499,7 +820,7 @@ class IntegrationController:
             handler_storage=handler_storage
         )
 
-        HandlerClass = self.handler_modules[integration_engine].Handler
+        HandlerClass = handler_module.Handler
 
         if integration_meta.get('type') == HANDLER_TYPE.ML:
             ml_handler_args = {
@@ -514,7 +835,8 @@ class IntegrationController:
             logger.info("%s.get_handler: create a client to db service of %s type, args - %s", self.__class__.__name__, integration_engine, handler_ars)
             handler = HandlerClass(**handler_ars)
             # handler = DBClient(integration_engine, HandlerClass, **handler_ars)
-            self.handlers_cache.set(handler)
+            if cached:
+                self.handlers_cache.set(handler)
 
         return handler
 
@@ -588,6 +910,16 @@ class IntegrationController:
         for attr in module_attrs:
             handler_meta[attr] = getattr(module, attr)
 
+        handler_meta['class_type'] = None
+        handler_class = getattr(module, 'Handler', None)
+        if inspect.isclass(handler_class):
+            if issubclass(handler_class, DatabaseHandler):
+                handler_meta['class_type'] = 'sql'
+            if issubclass(handler_class, APIHandler):
+                handler_meta['class_type'] = 'api'
+            if issubclass(handler_class, BaseMLEngine):
+                handler_meta['class_type'] = 'ml'
+
         # region icon
         if hasattr(module, 'icon_path'):
             icon_path = handler_dir.joinpath(module.icon_path)
@@ -612,7 +944,65 @@ class IntegrationController:
 
         return handler_meta
 
+    @staticmethod
+    def _get_handlers_index_path() -> Path:
+        return Path(Config()['paths']['cache']).joinpath('handlers_index.json')
+
+    @staticmethod
+    def _get_environment_fingerprint() -> dict:
+        """ import status of handlers depends on version of mindsdb and installed packages.
+            Installation of package changes mtime of its site-packages folder
+        """
+        return {
+            'mindsdb': mindsdb_version,
+            'python': sys.version,
+            'paths': [
+                [path, os.stat(path).st_mtime]
+                for path in site.getsitepackages() + [site.getusersitepackages()]
+                if os.path.isdir(path)
+            ]
+        }
+
+    @staticmethod
+    def _get_handler_dir_fingerprint(handler_dir: Path) -> list:
+        """ count of files in handler folder and the last time one of them was changed
+        """
+        files_count = 0
+        mtime = 0
+        for root, dirs, files in os.walk(handler_dir):
+            dirs[:] = [x for x in dirs if x != '__pycache__']
+            for file_name in files:
+                files_count += 1
+                mtime = max(mtime, os.stat(os.path.join(root, file_name)).st_mtime)
+        return [files_count, mtime]
+
+    def _read_handlers_index(self) -> dict:
+        environment = self._get_environment_fingerprint()
+        try:
+            with open(self._get_handlers_index_path(), 'rt') as f:
+                index = json.load(f)
+            if index.get('environment') == json.loads(json.dumps(environment)):
+                return index
+        except Exception:
+            pass
+        return {'environment': environment, 'handlers': {}}
+
+    def _write_handlers_index(self, index: dict) -> None:
+        index_path = self._get_handlers_index_path()
+        try:
+            # several processes can write the index at the same time: file is replaced atomically
+            fd, tmp_path = tempfile.mkstemp(dir=index_path.parent, prefix='handlers_index_')
+            with os.fdopen(fd, 'wt') as f:
+                json.dump(index, f)
+            os.replace(tmp_path, index_path)
+        except Exception as e:
+            logger.warning(f"Can't save handlers index: {e}")
+
     def _load_handler_modules(self):
+        """ Collect metadata of handlers.
+            Metadata is kept in index (in cache folder), modules of handlers are not imported until they are used.
+            Handler is imported at start only if it is absent in index or its files were changed.
+        """
         mindsdb_path = Path(importlib.util.find_spec('mindsdb').origin).parent
         handlers_path = mindsdb_path.joinpath('integrations/handlers')
 
@@ -621,12 +1011,45 @@ class IntegrationController:
             mindsdb_path = Path(importlib.util.find_spec('mindsdb').origin).parent.joinpath('mindsdb')
             handlers_path = mindsdb_path.joinpath('integrations/handlers')
 
-        self.handler_modules = {}
+        self.handler_modules = HandlerModules(self)
         self.handlers_import_status = {}
+
+        base_import = 'mindsdb.integrations.handlers.'
+        index = self._read_handlers_index()
+        indexed_handlers = {}
+        is_index_changed = False
         for handler_dir in handlers_path.iterdir():
             if handler_dir.is_dir() is False or handler_dir.name.startswith('__'):
                 continue
-            self.import_handler('mindsdb.integrations.handlers.', handler_dir)
+            handler_folder_name = handler_dir.name
+            fingerprint = self._get_handler_dir_fingerprint(handler_dir)
+
+            record = index['handlers'].get(handler_folder_name)
+            if record is not None and record['fingerprint'] == fingerprint:
+                handler_meta = record['meta']
+                self.handlers_import_status[handler_meta['name']] = handler_meta
+                if record['is_module'] is True:
+                    self.handler_modules.register(handler_meta['name'], f'{base_import}{handler_folder_name}')
+                indexed_handlers[handler_folder_name] = record
+                continue
+
+            is_index_changed = True
+            handler_meta = self.import_handler(base_import, handler_dir)
+            record = {
+                'fingerprint': fingerprint,
+                'meta': handler_meta,
+                'is_module': handler_meta['name'] in self.handler_modules
+            }
+            try:
+                json.dumps(record)
+            except (TypeError, ValueError):
+                # metadata can't be saved: handler will be imported at every start
+                continue
+            indexed_handlers[handler_folder_name] = record
+
+        if is_index_changed or len(indexed_handlers) != len(index['handlers']):
+            index['handlers'] = indexed_handlers
+            self._write_handlers_index(index)
 
     def import_handler(self, base_import: str, handler_dir: Path):
         handler_folder_name = str(handler_dir.name)
@@ -650,6 +1073,7 @@ class IntegrationController:
             }
 
         self.handlers_import_status[handler_meta['name']] = handler_meta
+        return handler_meta
 
     def get_handlers_import_status(self):
         return self.handlers_import_status
@@ -2,9 +2,11 @@ import os
 import json
 from pathlib import Path
 import shutil
+import tempfile
 
 from mindsdb.interfaces.storage import db
 from mindsdb.integrations.handlers.file_handler import Handler as FileHandler
+from mindsdb.integrations.handlers.file_handler.file_handler import PARSED_FILE_NAME
 from mindsdb.utilities import log
 from mindsdb.utilities.config import Config
 from mindsdb.interfaces.storage.fs import FsStore
@@ -71,13 +73,19 @@ class FileController():
             file_name = Path(file_path).name
 
         file_dir = None
+        parsed_dir = tempfile.mkdtemp(prefix='mindsdb_file_parsed_')
         try:
-            df, _col_map = FileHandler._handle_source(file_path)
-
-            ds_meta = {
-                'row_count': len(df),
-                'column_names': list(df.columns)
-            }
+            # parsed copy of the file is used in queries instead of parsing of source file.
+            # Csv, json lines and parquet files are converted by chunks, without loading of whole file
+            ds_meta = FileHandler.ingest_source(file_path, parsed_dir)
+            if ds_meta is None:
+                df, _col_map = FileHandler._handle_source(file_path)
+                ds_meta = {
+                    'row_count': len(df),
+                    'column_names': list(df.columns)
+                }
+                FileHandler.save_parsed_source(df, parsed_dir)
+                del df
 
             file_record = db.File(
                 name=name,
@@ -98,6 +106,9 @@ class FileController():
             source = file_dir.joinpath(file_name)
             # NOTE may be delay between db record exists and file is really in folder
             shutil.move(file_path, str(source))
+            parsed_file_path = Path(parsed_dir).joinpath(PARSED_FILE_NAME)
+            if parsed_file_path.exists():
+                shutil.move(str(parsed_file_path), str(file_dir.joinpath(PARSED_FILE_NAME)))
 
             self.fs_store.put(store_file_path, base_dir=self.dir)
         except Exception as e:
@@ -106,6 +117,7 @@ class FileController():
         finally:
             if file_dir is not None:
                 shutil.rmtree(file_dir)
+            shutil.rmtree(parsed_dir)
 
         return file_record.id
 
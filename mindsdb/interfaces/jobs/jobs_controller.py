@@ -246,6 +246,23 @@ class JobsExecutor:
 
         return query.all()
 
+    def get_next_run_at(self, exclude_ids: list = None):
+        """ time of the next run of active jobs
+
+            Args:
+                exclude_ids (list): ids of jobs to skip, e.g. running jobs
+
+            Returns:
+                datetime or None if there are no jobs
+        """
+        query = db.session.query(sa.func.min(db.Jobs.next_run_at)).filter(
+            db.Jobs.deleted_at == sa.null(),
+            db.Jobs.active == True,  # noqa
+        )
+        if exclude_ids:
+            query = query.filter(db.Jobs.id.notin_(exclude_ids))
+        return query.scalar()
+
     def update_task_schedule(self, record):
         # calculate next run
 
@@ -1,9 +1,26 @@
+"""
+Scheduler of jobs.
+
+Due jobs are executed concurrently in a pool of worker threads. A job is not started again while it is running,
+concurrent schedulers (several instances) are synchronised by 'lock_record'. While job is running its history
+record is updated every few seconds, it shows that the job is not stuck.
+
+The scheduler wakes up when the next job is due, when a job is finished or at least once in 'check_interval'
+seconds to find jobs created by other instances.
+
+Configuration in mindsdb config:
+    "jobs": {
+        "check_interval": 30,
+        "max_workers": 4,
+        "executor": "local"
+    }
+"""
+
 import random
-import time
 import datetime as dt
 
 import threading
-import queue
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
 
 from mindsdb.utilities.config import Config
 from mindsdb.utilities.log import initialize_log
@@ -11,51 +28,44 @@ from mindsdb.utilities import log
 from mindsdb.interfaces.storage import db
 
 from mindsdb.interfaces.jobs.jobs_controller import JobsExecutor
+from mindsdb.interfaces.database.integrations import integration_controller
 
 
 logger = log.get_log('jobs')
 
-
-def execute_async(q_in, q_out):
-
-    while True:
-        task = q_in.get()
-
-        if task['type'] != 'task':
-            return
-
-        record_id = task['record_id']
-        history_id = task['history_id']
-
-        executor = JobsExecutor()
-        try:
-            executor.execute_task_local(record_id, history_id)
-        except (KeyboardInterrupt, SystemExit):
-            q_out.put(True)
-            raise
-
-        except Exception:
-            db.session.rollback()
-
-        q_out.put(True)
+# interval of updating of history records of running jobs
+HEARTBEAT_INTERVAL = 3
 
 
 class Scheduler:
     def __init__(self, config=None):
         self.config = config
 
-        self.q_in = queue.Queue()
-        self.q_out = queue.Queue()
-        self.work_thread = threading.Thread(target=execute_async, args=(self.q_in, self.q_out))
-        self.work_thread.start()
+        jobs_config = (config or {}).get('jobs', {})
+        self.max_workers = jobs_config.get('max_workers', 4)
+        self.pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='job')
+
+        # record_id -> history_id of running jobs
+        self._running = {}
+        # record_id -> next_run_at of due jobs which are locked by other instances
+        self._locked_elsewhere = {}
+        self._lock = threading.Lock()
+        self._wakeup_event = threading.Event()
+        self._last_heartbeat_at = dt.datetime.now()
+        self.statistic = {
+            'dispatched': 0,
+            'failed': 0,
+            'completed': 0,
+            'lag_last': 0,
+            'lag_max': 0,
+            'lag_total': 0
+        }
 
     def __del__(self):
         self.stop_thread()
 
     def stop_thread(self):
-        self.q_in.put({
-            'type': 'exit'
-        })
+        self.pool.shutdown(wait=False)
 
     def scheduler_monitor(self):
         check_interval = self.config.get('jobs', {}).get('check_interval', 30)
@@ -64,28 +74,84 @@ class Scheduler:
 
             logger.debug('Scheduler check timetable')
             try:
-                self.check_timetable()
+                self.check_timetable(wait=False)
+                timeout = self._get_sleep_time(check_interval)
             except (SystemExit, KeyboardInterrupt):
                 raise
             except Exception as e:
                 logger.error(e)
+                timeout = check_interval
+
+            self._wakeup_event.wait(timeout)
+            self._wakeup_event.clear()
+
+    def _get_sleep_time(self, check_interval: int) -> float:
+        """ time until next due job, finished job wakes scheduler up earlier
+        """
+        with self._lock:
+            running_ids = list(self._running.keys())
+            is_full = len(running_ids) >= self.max_workers
+            # job which is run by other instance is checked again only after check_interval
+            skip_ids = running_ids + list(self._locked_elsewhere.keys())
+
+        # different instances should start in not the same time
+        timeout = check_interval + random.randint(1, 10)
+        if not is_full:
+            next_run_at = JobsExecutor().get_next_run_at(exclude_ids=skip_ids)
+            db.session.remove()
+            if next_run_at is not None:
+                timeout = min(timeout, max((next_run_at - dt.datetime.now()).total_seconds(), 0))
+        if len(running_ids) > 0:
+            timeout = min(timeout, HEARTBEAT_INTERVAL)
+        return timeout
+
+    def check_timetable(self, wait=True):
+        """ start due jobs
+
+            Args:
+                wait (bool): wait until started jobs are finished
+        """
+        self._heartbeat()
 
-            # different instances should start in not the same time
-
-            time.sleep(check_interval + random.randint(1, 10))
-
-    def check_timetable(self):
         executor = JobsExecutor()
 
         exec_method = self.config.get('jobs', {}).get('executor', 'local')
 
-        for record in executor.get_next_tasks():
+        records = executor.get_next_tasks()
+        with self._lock:
+            # lock is tried again on every check, it is forgotten when the job is rescheduled
+            self._locked_elsewhere = {
+                record.id: record.next_run_at
+                for record in records
+                if self._locked_elsewhere.get(record.id) == record.next_run_at
+            }
+
+        futures = []
+        for record in records:
+            with self._lock:
+                if record.id in self._running:
+                    continue
+                if len(self._running) >= self.max_workers:
+                    break
             logger.info(f'Job execute: {record.name}({record.id})')
-            self.execute_task(record.id, exec_method)
+            future = self.execute_task(record.id, exec_method, next_run_at=record.next_run_at)
+            if future is not None:
+                futures.append(future)
 
         db.session.remove()
 
-    def execute_task(self, record_id, exec_method):
+        if wait:
+            while len(futures) > 0:
+                _, futures = wait_futures(futures, timeout=HEARTBEAT_INTERVAL)
+                self._heartbeat()
+            db.session.remove()
+
+    def execute_task(self, record_id, exec_method, next_run_at=None):
+        """ start job in worker thread
+
+            Returns:
+                Future: future of job execution, None if the job is locked by other scheduler
+        """
 
         executor = JobsExecutor()
         if exec_method == 'local':
@@ -93,36 +159,86 @@ class Scheduler:
             if history_id is None:
                 # db.session.remove()
                 logger.info(f'Unable create history record for {record_id}, is locked?')
+                with self._lock:
+                    self._locked_elsewhere[record_id] = next_run_at
                 return
 
-            # run in thread
+            # delay of job start
+            lag = 0
+            if next_run_at is not None:
+                lag = max((dt.datetime.now() - next_run_at).total_seconds(), 0)
+            logger.debug(f'Job {record_id} started with lag {lag:.1f}s')
 
-            self.q_in.put({
-                'type': 'task',
-                'record_id': record_id,
-                'history_id': history_id,
-            })
+            with self._lock:
+                self._running[record_id] = history_id
+                self.statistic['dispatched'] += 1
+                self.statistic['lag_last'] = lag
+                self.statistic['lag_max'] = max(self.statistic['lag_max'], lag)
+                self.statistic['lag_total'] += lag
 
-            while True:
-                try:
-                    self.q_out.get(timeout=3)
-                    break
-                except queue.Empty:
-                    # update last date:
-                    history_record = db.JobsHistory.query.get(history_id)
-                    history_record.updated_at = dt.datetime.now()
-                    db.session.commit()
+            # run in thread
+            return self.pool.submit(self._execute_async, record_id, history_id)
 
         else:
             # TODO add microservice mode
             raise NotImplementedError()
 
+    def _execute_async(self, record_id, history_id):
+        executor = JobsExecutor()
+        is_failed = False
+        try:
+            executor.execute_task_local(record_id, history_id)
+        except Exception as e:
+            is_failed = True
+            logger.error(f'Job {record_id} failed: {e}')
+            db.session.rollback()
+        finally:
+            # worker thread is reused by the pool: return leased connections
+            integration_controller.handlers_cache.release()
+            db.session.remove()
+            with self._lock:
+                self._running.pop(record_id, None)
+                self.statistic['failed' if is_failed else 'completed'] += 1
+            self._wakeup_event.set()
+
+    def _heartbeat(self):
+        """ update last date of history records of running jobs
+        """
+        with self._lock:
+            history_ids = list(self._running.values())
+        if len(history_ids) == 0:
+            return
+        now = dt.datetime.now()
+        if (now - self._last_heartbeat_at).total_seconds() < HEARTBEAT_INTERVAL:
+            return
+        self._last_heartbeat_at = now
+        db.session.query(db.JobsHistory).filter(
+            db.JobsHistory.id.in_(history_ids)
+        ).update({'updated_at': now}, synchronize_session=False)
+        db.session.commit()
+
+    def stats(self) -> dict:
+        """ metrics of scheduler, lag is delay between planned and actual start of job in seconds
+        """
+        with self._lock:
+            stats = dict(self.statistic)
+            stats['running'] = len(self._running)
+            stats['max_workers'] = self.max_workers
+        lag_total = stats.pop('lag_total')
+        stats['lag_avg'] = lag_total / stats['dispatched'] if stats['dispatched'] > 0 else 0
+        return stats
+
     def start(self):
 
         config = Config()
         db.init()
         initialize_log(config, 'jobs', wrap_print=True)
         self.config = config
+        max_workers = config.get('jobs', {}).get('max_workers', self.max_workers)
+        if max_workers != self.max_workers:
+            self.pool.shutdown(wait=False)
+            self.max_workers = max_workers
+            self.pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='job')
 
         logger.info('Scheduler starts')
 
@@ -1,14 +1,19 @@
 import os
 import io
+import gzip
+import json
+import ctypes
 import shutil
 import tarfile
 import hashlib
+from uuid import uuid4
 from pathlib import Path
 from abc import ABC, abstractmethod
 from typing import Union, Optional
 from dataclasses import dataclass
 from datetime import datetime
 import threading
+from multiprocessing.pool import ThreadPool
 
 if os.name == 'posix':
     import fcntl
@@ -17,11 +22,17 @@ import psutil
 from checksumdir import dirhash
 try:
     import boto3
+    from boto3.s3.transfer import TransferConfig
     from botocore.exceptions import ClientError as S3ClientError
 except Exception:
     # Only required for remote storage on s3
     S3ClientError = FileNotFoundError
     pass
+try:
+    import zstandard
+except ImportError:
+    # Only required for compression of incremental storage on s3, gzip is used if it is absent
+    zstandard = None
 
 
 from mindsdb.utilities.config import Config
@@ -41,7 +52,23 @@ RESOURCE_GROUP = RESOURCE_GROUP()
 
 DIR_LOCK_FILE_NAME = 'dir.lock'
 DIR_LAST_MODIFIED_FILE_NAME = 'last_modified.txt'
-SERVICE_FILES_NAMES = (DIR_LOCK_FILE_NAME, DIR_LAST_MODIFIED_FILE_NAME)
+DIR_MANIFEST_FILE_NAME = 'storage_manifest.json'
+DIR_GENERATION_FILE_NAME = 'storage_generation.txt'
+SERVICE_FILES_NAMES = (
+    DIR_LOCK_FILE_NAME, DIR_LAST_MODIFIED_FILE_NAME, DIR_MANIFEST_FILE_NAME, DIR_GENERATION_FILE_NAME
+)
+
+# ioctl request to make copy-on-write clone of file (linux: btrfs, xfs, ...)
+FICLONE = 0x40049409
+
+# atomic swap of two paths (linux >= 3.15, glibc >= 2.28)
+AT_FDCWD = -100
+RENAME_EXCHANGE = 2
+try:
+    renameat2 = ctypes.CDLL(None, use_errno=True).renameat2
+    renameat2.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_char_p, ctypes.c_uint]
+except (OSError, AttributeError, TypeError):
+    renameat2 = None
 
 
 def copy(src, dst):
@@ -111,26 +138,118 @@ def get_dir_size(path: str):
     return total
 
 
+def clone_file(src, dst, *, follow_symlinks=True):
+    """ copy file as copy-on-write clone if filesystem supports it, otherwise make usual copy.
+        Has the same signature as shutil.copy2
+    """
+    if os.name == 'posix':
+        try:
+            with open(src, 'rb') as src_fd, open(dst, 'wb') as dst_fd:
+                fcntl.ioctl(dst_fd.fileno(), FICLONE, src_fd.fileno())
+            shutil.copystat(src, dst, follow_symlinks=follow_symlinks)
+            return dst
+        except OSError:
+            pass
+    return shutil.copy2(src, dst, follow_symlinks=follow_symlinks)
+
+
+def exchange_dirs(src: str, dst: str) -> bool:
+    """ atomically swap two folders (linux renameat2 with RENAME_EXCHANGE)
+
+        Returns:
+            bool: False if swap is not supported by OS or filesystem
+    """
+    if renameat2 is None:
+        return False
+    result = renameat2(AT_FDCWD, os.fsencode(src), AT_FDCWD, os.fsencode(dst), RENAME_EXCHANGE)
+    return result == 0
+
+
+def replace_dir(src: str, dst: str):
+    """ copy folder to temporary folder near the destination and swap it with the destination.
+        The destination is never missing, readers which opened files in old folder keep reading consistent data
+    """
+    dst_path = Path(dst)
+    dst_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = dst_path.parent / f'.{dst_path.name}.{uuid4().hex}.tmp'
+    old_path = dst_path.parent / f'.{dst_path.name}.{uuid4().hex}.old'
+    try:
+        shutil.copytree(src, tmp_path, copy_function=clone_file)
+        if not dst_path.exists():
+            os.replace(tmp_path, dst_path)
+        elif not exchange_dirs(tmp_path, dst_path):
+            # non-empty folder can't be replaced by one rename
+            os.replace(dst_path, old_path)
+            os.replace(tmp_path, dst_path)
+    finally:
+        # after the swap the old content is in tmp_path
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        shutil.rmtree(old_path, ignore_errors=True)
+
+
 class LocalFSStore(BaseFSStore):
     """Storage that stores files locally
+
+    Every 'put' of folder writes new generation id into the folder in storage and in the local copy.
+    On 'get' local copy is fresh if its generation is the same as in the storage, so files are not
+    walked on every access. Folders are replaced by renames of full copy, files are cloned
+    (copy-on-write) when filesystem allows it.
     """
 
     def __init__(self):
         super().__init__()
 
+    @staticmethod
+    def _read_generation(path: str) -> Optional[str]:
+        try:
+            with open(os.path.join(path, DIR_GENERATION_FILE_NAME), 'r') as fd:
+                return fd.read()
+        except OSError:
+            return None
+
+    @staticmethod
+    def _is_same_file(src: str, dest: str) -> bool:
+        try:
+            src_stat, dest_stat = os.stat(src), os.stat(dest)
+        except OSError:
+            return False
+        return src_stat.st_size == dest_stat.st_size and src_stat.st_mtime_ns == dest_stat.st_mtime_ns
+
+    @profiler.profile()
     def get(self, local_name, base_dir):
         remote_name = local_name
         src = os.path.join(self.storage, remote_name)
         dest = os.path.join(base_dir, local_name)
-        if not os.path.exists(dest) or get_dir_size(src) != get_dir_size(dest):
-            copy(src, dest)
+        if not os.path.isdir(src):
+            if not self._is_same_file(src, dest):
+                copy(src, dest)
+            return
+
+        folder_path = Path(dest)
+        with FileLock(folder_path, mode='r'):
+            generation = self._read_generation(src)
+            if generation is not None and generation == self._read_generation(dest):
+                return
 
+        with FileLock(folder_path, mode='w'):
+            if generation is None:
+                # folder was saved by previous version
+                if not os.path.exists(dest) or get_dir_size(src) != get_dir_size(dest):
+                    copy(src, dest)
+            else:
+                replace_dir(src, dest)
+
+    @profiler.profile()
     def put(self, local_name, base_dir, compression_level=9):
         remote_name = local_name
-        copy(
-            os.path.join(base_dir, local_name),
-            os.path.join(self.storage, remote_name)
-        )
+        src = os.path.join(base_dir, local_name)
+        dest = os.path.join(self.storage, remote_name)
+        if os.path.isdir(src):
+            with open(os.path.join(src, DIR_GENERATION_FILE_NAME), 'w') as fd:
+                fd.write(uuid4().hex)
+            replace_dir(src, dest)
+        else:
+            copy(src, dest)
 
     def delete(self, remote_name):
         path = Path(self.storage).joinpath(remote_name)
@@ -387,11 +506,377 @@ class S3FSStore(BaseFSStore):
         self.s3.delete_object(Bucket=self.bucket, Key=remote_name)
 
 
+class S3IncrementalFSStore(S3FSStore):
+    """Storage that stores files in amazon s3 as content-addressed chunks
+
+    Every file of resource is split to chunks of fixed size. Chunk is saved as object which name is hash of
+    its content, so the same chunk is stored once. Resource is described by manifest: list of files and
+    chunks of every file. Copy of the manifest is kept in the local folder, therefore:
+     - on 'put' only files changed since last sync are read and only absent chunks are uploaded
+     - on 'get' only changed files are written and only chunks which are absent locally are downloaded
+
+    Resources saved by S3FSStore are still read from tar.gz archives until they are saved again.
+    Chunks can be used by several resources: when resource is replaced or deleted, chunks of its old
+    manifest are deleted only if no other manifest refers to them. If a chunk is deleted while other
+    resource is being saved with it, that chunk is uploaded again after the manifest of the resource is saved.
+
+    Settings of 'permanent_storage' in config:
+        "incremental": true,
+        "chunk_size": 16777216,
+        "max_workers": 8,
+        "compression": {"codec": "zstd", "level": 3}  # codecs: zstd, gzip, none
+    """
+
+    manifest_version = 1
+    codec_extensions = {
+        'zstd': 'zst',
+        'gzip': 'gz',
+        'none': 'raw'
+    }
+
+    def __init__(self):
+        super().__init__()
+        storage_config = self.config['permanent_storage']
+        self.chunk_size = storage_config.get('chunk_size', 16 * 1024 * 1024)
+        self.max_workers = storage_config.get('max_workers', 8)
+        compression = storage_config.get('compression', {})
+        self.codec = compression.get('codec', 'zstd')
+        self.compression_level = compression.get('level')
+        if self.codec == 'zstd' and zstandard is None:
+            print("Package 'zstandard' is not installed, gzip is used for compression of storage files")
+            self.codec = 'gzip'
+            self.compression_level = 1
+        if self.codec not in self.codec_extensions:
+            raise Exception(f"Compression codec is not supported: {self.codec}")
+        # big chunks are transferred by parts in parallel
+        self.transfer_config = TransferConfig(
+            multipart_threshold=8 * 1024 * 1024,
+            multipart_chunksize=8 * 1024 * 1024,
+            max_concurrency=4
+        )
+
+    @staticmethod
+    def _get_manifest_key(remote_name: str) -> str:
+        return f'{remote_name}.manifest.json'
+
+    def _get_chunk_key(self, chunk_hash: str) -> str:
+        return f'chunks/{chunk_hash}.{self.codec_extensions[self.codec]}'
+
+    @staticmethod
+    def _get_chunk_hash(chunk_key: str) -> str:
+        return chunk_key[len('chunks/'):].split('.')[0]
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.codec == 'zstd':
+            return zstandard.ZstdCompressor(level=self.compression_level or 3).compress(data)
+        if self.codec == 'gzip':
+            return gzip.compress(data, compresslevel=self.compression_level or 1)
+        return data
+
+    @staticmethod
+    def _decompress(data: bytes, chunk_key: str) -> bytes:
+        if chunk_key.endswith('.zst'):
+            if zstandard is None:
+                raise Exception("Package 'zstandard' is required to read storage files")
+            return zstandard.ZstdDecompressor().decompress(data)
+        if chunk_key.endswith('.gz'):
+            return gzip.decompress(data)
+        return data
+
+    @staticmethod
+    def _read_local_manifest(folder_path: Path) -> dict:
+        """ manifest of the last synchronisation of the folder
+        """
+        try:
+            manifest = json.loads((folder_path / DIR_MANIFEST_FILE_NAME).read_text())
+            if manifest.get('version') == S3IncrementalFSStore.manifest_version:
+                return manifest
+        except Exception:
+            pass
+        return {'files': {}}
+
+    @staticmethod
+    def _save_local_manifest(folder_path: Path, manifest: dict, etag: str):
+        """ save manifest with size and mtime of local files: to detect changed files
+        """
+        manifest = dict(manifest, etag=etag)
+        manifest['files'] = {
+            rel_path: dict(file_meta, **S3IncrementalFSStore._get_file_state(folder_path / rel_path))
+            for rel_path, file_meta in manifest['files'].items()
+        }
+        (folder_path / DIR_MANIFEST_FILE_NAME).write_text(json.dumps(manifest))
+
+    @staticmethod
+    def _get_file_state(path: Path) -> dict:
+        stat = path.stat()
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    @staticmethod
+    def _is_file_unchanged(path: Path, file_meta: dict) -> bool:
+        try:
+            state = S3IncrementalFSStore._get_file_state(path)
+        except OSError:
+            return False
+        return file_meta.get('size') == state['size'] and file_meta.get('mtime_ns') == state['mtime_ns']
+
+    def _is_chunk_exists(self, chunk_key: str) -> bool:
+        try:
+            self.s3.head_object(Bucket=self.bucket, Key=chunk_key)
+        except S3ClientError:
+            return False
+        return True
+
+    def _run_parallel(self, fnc, tasks: list) -> list:
+        if len(tasks) == 0:
+            return []
+        if len(tasks) == 1 or self.max_workers <= 1:
+            return [fnc(task) for task in tasks]
+        with ThreadPool(min(len(tasks), self.max_workers)) as pool:
+            return pool.map(fnc, tasks)
+
+    @profiler.profile()
+    def put(self, local_name, base_dir, compression_level=None):
+        """ upload changed files of the folder. Compression is defined by config,
+            'compression_level' argument is ignored
+        """
+        remote_name = local_name
+        folder_path = Path(base_dir) / local_name
+        local_manifest = self._read_local_manifest(folder_path)
+        local_files = local_manifest['files']
+        is_same_chunk_size = local_manifest.get('chunk_size') == self.chunk_size
+
+        # chunks of synced files exist in bucket
+        known_chunks = set()
+        files = {}
+        tasks = []
+        for path in sorted(folder_path.rglob('*')):
+            if path.is_file() is False:
+                continue
+            rel_path = path.relative_to(folder_path).as_posix()
+            if rel_path in SERVICE_FILES_NAMES:
+                continue
+            file_meta = local_files.get(rel_path)
+            if is_same_chunk_size and file_meta is not None and self._is_file_unchanged(path, file_meta):
+                files[rel_path] = {'size': file_meta['size'], 'chunks': file_meta['chunks']}
+                known_chunks.update(file_meta['chunks'])
+                continue
+            size = path.stat().st_size
+            chunks_count = (size + self.chunk_size - 1) // self.chunk_size
+            files[rel_path] = {'size': size, 'chunks': [None] * chunks_count}
+            tasks += [(rel_path, i) for i in range(chunks_count)]
+
+        def upload_chunk(task):
+            rel_path, chunk_index = task
+            with open(folder_path / rel_path, 'rb') as fd:
+                fd.seek(chunk_index * self.chunk_size)
+                data = fd.read(self.chunk_size)
+            chunk_key = self._get_chunk_key(hashlib.sha256(data).hexdigest())
+            is_uploaded = False
+            if chunk_key not in known_chunks and self._is_chunk_exists(chunk_key) is False:
+                self.s3.upload_fileobj(
+                    io.BytesIO(self._compress(data)), self.bucket, chunk_key, Config=self.transfer_config
+                )
+                is_uploaded = True
+            return chunk_key, is_uploaded
+
+        uploaded_chunks = set()
+        for (rel_path, chunk_index), (chunk_key, is_uploaded) in zip(tasks, self._run_parallel(upload_chunk, tasks)):
+            files[rel_path]['chunks'][chunk_index] = chunk_key
+            if is_uploaded:
+                uploaded_chunks.add(chunk_key)
+
+        manifest_key = self._get_manifest_key(remote_name)
+        old_chunks = self._read_manifest_chunks(manifest_key)
+        manifest = {
+            'version': self.manifest_version,
+            'chunk_size': self.chunk_size,
+            'files': files
+        }
+        response = self.s3.put_object(
+            Bucket=self.bucket,
+            Key=manifest_key,
+            Body=json.dumps(manifest).encode()
+        )
+
+        # existing chunks could be deleted by other process before the manifest was saved
+        reused_chunks = {}
+        for rel_path, file_meta in files.items():
+            for i, chunk_key in enumerate(file_meta['chunks']):
+                if chunk_key not in uploaded_chunks:
+                    reused_chunks.setdefault(chunk_key, (rel_path, i))
+        missed_chunks = [
+            task for task, is_exists
+            in zip(reused_chunks.values(), self._run_parallel(self._is_chunk_exists, list(reused_chunks)))
+            if is_exists is False
+        ]
+        # missed chunks are uploaded again
+        known_chunks.clear()
+        self._run_parallel(upload_chunk, missed_chunks)
+
+        self._save_local_manifest(folder_path, manifest, response['ETag'])
+        self._delete_unreferenced_chunks(old_chunks - set(reused_chunks) - uploaded_chunks)
+
+    def _read_manifest_chunks(self, manifest_key: str) -> set:
+        """ keys of chunks which are used by the manifest, empty set if there is no such manifest
+        """
+        try:
+            response = self.s3.get_object(Bucket=self.bucket, Key=manifest_key)
+        except S3ClientError:
+            return set()
+        manifest = json.loads(response['Body'].read())
+        return {chunk_key for file_meta in manifest['files'].values() for chunk_key in file_meta['chunks']}
+
+    def _list_manifests(self, prefix: str = '') -> list:
+        """ keys of all manifests in bucket, 'chunks/' folder is skipped
+        """
+        manifest_keys = []
+        paginator = self.s3.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix, Delimiter='/'):
+            manifest_keys += [
+                item['Key'] for item in page.get('Contents', [])
+                if item['Key'].endswith('.manifest.json')
+            ]
+            for item in page.get('CommonPrefixes', []):
+                if item['Prefix'] != 'chunks/':
+                    manifest_keys += self._list_manifests(item['Prefix'])
+        return manifest_keys
+
+    def _delete_unreferenced_chunks(self, chunk_keys: set) -> None:
+        """ delete chunks which are not used by any manifest
+
+            Args:
+                chunk_keys (set): keys of chunks which are not used by a resource anymore
+        """
+        if len(chunk_keys) == 0:
+            return
+        for manifest_key in self._list_manifests():
+            chunk_keys = chunk_keys - self._read_manifest_chunks(manifest_key)
+            if len(chunk_keys) == 0:
+                return
+        chunk_keys = sorted(chunk_keys)
+        # up to 1000 objects can be deleted by one request
+        for start in range(0, len(chunk_keys), 1000):
+            self.s3.delete_objects(
+                Bucket=self.bucket,
+                Delete={
+                    'Objects': [{'Key': key} for key in chunk_keys[start:start + 1000]],
+                    'Quiet': True
+                }
+            )
+
+    @profiler.profile()
+    def _download_manifest(self, folder_path: Path, manifest_key: str):
+        """ download changed files of resource
+        """
+        response = self.s3.get_object(Bucket=self.bucket, Key=manifest_key)
+        manifest = json.loads(response['Body'].read())
+        etag = response['ETag']
+
+        folder_path.mkdir(parents=True, exist_ok=True)
+        local_manifest = self._read_local_manifest(folder_path)
+        local_chunk_size = local_manifest.get('chunk_size')
+
+        # chunks which can be copied from local files
+        local_chunks = {}
+        unchanged_files = set()
+        for rel_path, file_meta in local_manifest['files'].items():
+            if self._is_file_unchanged(folder_path / rel_path, file_meta) is False:
+                continue
+            unchanged_files.add(rel_path)
+            for i, chunk_key in enumerate(file_meta['chunks']):
+                offset = i * local_chunk_size
+                length = min(local_chunk_size, file_meta['size'] - offset)
+                local_chunks.setdefault(chunk_key, (rel_path, offset, length))
+
+        tasks = []
+        tmp_files = {}
+        for rel_path, file_meta in manifest['files'].items():
+            if (
+                rel_path in unchanged_files
+                and local_manifest['files'][rel_path]['chunks'] == file_meta['chunks']
+            ):
+                continue
+            path = folder_path / rel_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.parent / f'{path.name}.download'
+            with open(tmp_path, 'wb') as fd:
+                fd.truncate(file_meta['size'])
+            tmp_files[rel_path] = tmp_path
+            for i, chunk_key in enumerate(file_meta['chunks']):
+                tasks.append((tmp_path, i * manifest['chunk_size'], chunk_key))
+
+        def download_chunk(task):
+            tmp_path, offset, chunk_key = task
+            data = None
+            if chunk_key in local_chunks:
+                local_rel_path, local_offset, length = local_chunks[chunk_key]
+                with open(folder_path / local_rel_path, 'rb') as fd:
+                    fd.seek(local_offset)
+                    data = fd.read(length)
+                # local file can be changed without change of size and mtime
+                if self._get_chunk_hash(chunk_key) != hashlib.sha256(data).hexdigest():
+                    data = None
+            if data is None:
+                fh = io.BytesIO()
+                self.s3.download_fileobj(self.bucket, chunk_key, fh, Config=self.transfer_config)
+                data = self._decompress(fh.getvalue(), chunk_key)
+            with open(tmp_path, 'r+b') as fd:
+                fd.seek(offset)
+                fd.write(data)
+
+        try:
+            self._run_parallel(download_chunk, tasks)
+        except Exception:
+            for tmp_path in tmp_files.values():
+                tmp_path.unlink(missing_ok=True)
+            raise
+
+        # local files are replaced only when all chunks are received: they can be source of chunks
+        for rel_path, tmp_path in tmp_files.items():
+            os.replace(tmp_path, folder_path / rel_path)
+
+        for rel_path in set(local_manifest['files']) - set(manifest['files']):
+            (folder_path / rel_path).unlink(missing_ok=True)
+
+        self._save_local_manifest(folder_path, manifest, etag)
+
+    @profiler.profile()
+    def get(self, local_name, base_dir):
+        remote_name = local_name
+        manifest_key = self._get_manifest_key(remote_name)
+        folder_path = Path(base_dir) / local_name
+
+        with FileLock(folder_path, mode='r'):
+            try:
+                remote_etag = self.s3.head_object(Bucket=self.bucket, Key=manifest_key)['ETag']
+            except S3ClientError:
+                remote_etag = None
+            if remote_etag is not None and self._read_local_manifest(folder_path).get('etag') == remote_etag:
+                return
+
+        if remote_etag is None:
+            # resource was saved as archive
+            return super().get(local_name, base_dir)
+
+        with FileLock(folder_path, mode='w'):
+            self._download_manifest(folder_path, manifest_key)
+
+    @profiler.profile()
+    def delete(self, remote_name):
+        manifest_key = self._get_manifest_key(remote_name)
+        chunk_keys = self._read_manifest_chunks(manifest_key)
+        self.s3.delete_object(Bucket=self.bucket, Key=manifest_key)
+        self.s3.delete_object(Bucket=self.bucket, Key=f'{remote_name}.tar.gz')
+        self._delete_unreferenced_chunks(chunk_keys)
+
+
 def FsStore():
     storage_location = Config()['permanent_storage']['location']
     if storage_location == 'local':
         return LocalFSStore()
     elif storage_location == 's3':
+        if Config()['permanent_storage'].get('incremental', False) is True:
+            return S3IncrementalFSStore()
         return S3FSStore()
     else:
         raise Exception(f"Location: '{storage_location}' not supported")
@@ -425,7 +910,8 @@ class FileStorage:
 
     @profiler.profile()
     def push(self, compression_level: int = 9):
-        with FileLock(self.folder_path, mode='r'):
+        # storage writes service files (generation, manifest) into the local folder
+        with FileLock(self.folder_path, mode='w'):
             self._push_no_lock(compression_level=compression_level)
 
     @profiler.profile()
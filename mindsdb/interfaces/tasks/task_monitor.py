@@ -1,3 +1,16 @@
+"""
+Monitor of tasks (triggers, chatbots).
+
+Tasks are executed in threads of the process which locked them. Tasks which are run by the process
+are marked as alive by one batched update per tick. If task is not marked alive for LOCK_EXPIRED_SECONDS
+it is taken by other process.
+
+The list of tasks is re-read only when it was changed: generation of tasks (count and last update time
+of records) is checked every tick. A change of 'active' or 'reload' flag of a task changes its
+update time. Heartbeats don't change it. Anyway all tasks are re-read every FULL_CHECK_INTERVAL_SECONDS
+to take tasks with expired locks.
+"""
+
 import time
 import socket
 import os
@@ -18,9 +31,13 @@ class TaskMonitor:
 
     MONITOR_INTERVAL_SECONDS = 2
     LOCK_EXPIRED_SECONDS = MONITOR_INTERVAL_SECONDS * 30
+    FULL_CHECK_INTERVAL_SECONDS = LOCK_EXPIRED_SECONDS / 2
 
     def __init__(self):
         self._active_tasks = {}
+        self._generation = None
+        self._last_full_check_at = 0
+        self.run_by = f'{socket.gethostname()} {os.getpid()}'
 
     def start(self):
         config = Config()
@@ -49,41 +66,65 @@ class TaskMonitor:
         for task_id in active_tasks:
             self.stop_task(task_id)
 
-    def check_tasks(self):
-        allowed_tasks = set()
-
-        for task in db.session.query(db.Tasks).filter(db.Tasks.active == True): # noqa
-            allowed_tasks.add(task.id)
-
-            # start new tasks
-            if task.id not in self._active_tasks:
-                self.start_task(task)
+    def _get_generation(self):
+        """ Fingerprint of tasks records, it is changed when a task is added, deleted or changed """
+        return tuple(db.session.query(
+            sa.func.count(db.Tasks.id),
+            sa.func.max(db.Tasks.updated_at)
+        ).first())
 
-        # Check active tasks
-        active_tasks = list(self._active_tasks.items())
-        for task_id, task in active_tasks:
+    def check_tasks(self):
+        # dead tasks
+        for task_id, task in list(self._active_tasks.items()):
+            if not task.is_alive():
+                self.stop_task(task_id)
 
+        generation = self._get_generation()
+        if (
+            generation != self._generation
+            or time.time() - self._last_full_check_at > self.FULL_CHECK_INTERVAL_SECONDS
+        ):
+            # changes made by the check (lock, unlock of tasks) will cause one more check,
+            # it restarts reloaded tasks
+            self._generation = generation
+            self._check_records()
+            self._last_full_check_at = time.time()
+
+        # set alive time of running tasks
+        self._set_alive(list(self._active_tasks.keys()))
+
+    def _check_records(self):
+        records = db.session.query(db.Tasks).filter(db.Tasks.active == True).all()  # noqa
+
+        # read flags before changes: commit expires all loaded records
+        allowed_tasks = set(record.id for record in records)
+        new_tasks = [record for record in records if record.id not in self._active_tasks]
+        reload_tasks = [record.id for record in records if record.id in self._active_tasks and record.reload]
+
+        for task_id in list(self._active_tasks.keys()):
             if task_id not in allowed_tasks:
                 # old task
                 self.stop_task(task_id)
 
-            elif not task.is_alive():
-                # dead task
+        # need to be reloaded
+        if len(reload_tasks) > 0:
+            db.session.query(db.Tasks).filter(
+                db.Tasks.id.in_(reload_tasks)
+            ).update({'reload': False}, synchronize_session=False)
+            db.session.commit()
+            for task_id in reload_tasks:
                 self.stop_task(task_id)
 
-            else:
-                # need to be reloaded ?
-                record = db.Tasks.query.get(task_id)
-                if record.reload:
-                    record.reload = False
-                    self.stop_task(task_id)
-                else:
-                    # set alive time of running tasks
-                    self._set_alive(task_id)
-
-    def _lock_task(self, task):
-        run_by = f'{socket.gethostname()} {os.getpid()}'
-        db_date = db.session.query(sa.func.current_timestamp()).first()[0]
+        # start new tasks
+        if len(new_tasks) > 0:
+            db_date = db.session.query(sa.func.current_timestamp()).first()[0]
+            for task in new_tasks:
+                self.start_task(task, db_date=db_date)
+
+    def _lock_task(self, task, db_date=None):
+        run_by = self.run_by
+        if db_date is None:
+            db_date = db.session.query(sa.func.current_timestamp()).first()[0]
         if task.run_by == run_by:
             # already locked
             task.alive_time = db_date
@@ -104,10 +145,19 @@ class TaskMonitor:
         db.session.commit()
         return True
 
-    def _set_alive(self, task_id):
-        db_date = db.session.query(sa.func.current_timestamp()).first()[0]
-        task = db.Tasks.query.get(task_id)
-        task.alive_time = db_date
+    def _set_alive(self, task_ids: list):
+        """ Update alive time of tasks by one query. Update time of records is not changed,
+            it is used to detect changes of tasks
+        """
+        if len(task_ids) == 0:
+            return
+        db.session.query(db.Tasks).filter(
+            db.Tasks.id.in_(task_ids),
+            db.Tasks.run_by == self.run_by
+        ).update({
+            'alive_time': sa.func.current_timestamp(),
+            'updated_at': db.Tasks.updated_at
+        }, synchronize_session=False)
         db.session.commit()
 
     def _unlock_task(self, task_id):
@@ -116,8 +166,8 @@ class TaskMonitor:
             task.alive_time = None
             db.session.commit()
 
-    def start_task(self, task):
-        if not self._lock_task(task):
+    def start_task(self, task, db_date=None):
+        if not self._lock_task(task, db_date=db_date):
             # can't lock, skip
             return
 
@@ -1,4 +1,6 @@
 import copy
+import time
+import threading
 import traceback
 from mindsdb_sql import parse_sql
 from mindsdb_sql.parser.ast import Data, Identifier
@@ -10,17 +12,44 @@ from mindsdb.api.mysql.mysql_proxy.controllers.session_controller import Session
 from mindsdb.api.mysql.mysql_proxy.executor.executor_commands import ExecuteCommands
 
 from mindsdb.interfaces.database.projects import ProjectController
+from mindsdb.interfaces.database.integrations import integration_controller
 from mindsdb.utilities import log
+from mindsdb.utilities.config import Config
 from mindsdb.interfaces.tasks.task import BaseTask
 from mindsdb.utilities.context import context as ctx
 
 
 class TriggerTask(BaseTask):
+    """ Changed rows from subscription are collected and the trigger query is executed for a batch of rows:
+        when 'batch_max_rows' are collected or the first row waits for 'batch_max_latency' seconds.
+        If the query is slower than the changes, the subscription waits while 'max_buffered_rows' rows are in buffer.
+
+        Configuration in mindsdb config:
+            "triggers": {
+                "batch_max_rows": 1000,
+                "batch_max_latency": 1,
+                "max_buffered_rows": 10000
+            }
+    """
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.command_executor = None
         self.query = None
 
+        config = Config().get('triggers', {})
+        self.batch_max_rows = config.get('batch_max_rows', 1000)
+        self.batch_max_latency = config.get('batch_max_latency', 1)
+        self.max_buffered_rows = max(config.get('max_buffered_rows', 10000), self.batch_max_rows)
+
+        self._buffer = []
+        self._first_row_at = None
+        self._condition = threading.Condition()
+        self._stop_event = None
+        self._is_finished = False
+        # list which is used as data of TABLE_DELTA in prepared query
+        self._delta_rows = []
+
         # callback might be without context
         self._ctx_dump = ctx.dump()
 
@@ -28,7 +57,7 @@ class TriggerTask(BaseTask):
         trigger = db.Triggers.query.get(self.object_id)
 
         # parse query
-        self.query = parse_sql(trigger.query_str, dialect='mindsdb')
+        self.query = self._prepare_query(parse_sql(trigger.query_str, dialect='mindsdb'))
 
         session = SessionController()
 
@@ -42,7 +71,8 @@ class TriggerTask(BaseTask):
 
         # subscribe
         database = session.integration_controller.get_by_id(trigger.database_id)
-        data_handler = session.integration_controller.get_handler(database['name'])
+        # handler is used by subscription for the whole life of the task: it is not taken from pool
+        data_handler = session.integration_controller.get_handler(database['name'], cached=False)
 
         columns = trigger.columns
         if columns is not None:
@@ -51,36 +81,98 @@ class TriggerTask(BaseTask):
             else:
                 columns = columns.split('|')
 
-        data_handler.subscribe(stop_event, self._callback, trigger.table_name, columns)
+        self._stop_event = stop_event
+        flush_thread = threading.Thread(target=self._flush_worker, name=f'trigger_flush_{self.object_id}')
+        flush_thread.start()
+        try:
+            data_handler.subscribe(stop_event, self._callback, trigger.table_name, columns)
+        finally:
+            # rows which are already received are processed
+            with self._condition:
+                self._is_finished = True
+                self._condition.notify_all()
+            flush_thread.join()
+
+    def _prepare_query(self, query):
+        """ replace TABLE_DELTA in query by data node. Data of the node is substituted on every execution
+        """
+        def find_table(node, is_table, **kwargs):
+
+            if is_table:
+                if (
+                        isinstance(node, Identifier)
+                        and len(node.parts) == 1
+                        and node.parts[0] == 'TABLE_DELTA'
+                ):
+                    # replace with data
+                    return Data(self._delta_rows, alias=node.alias)
+
+        query_traversal(query, find_table)
+        return query
 
     def _callback(self, row, key=None):
         log.logger.debug(f'trigger call: {row}, {key}')
 
+        if key is not None:
+            row.update(key)
+
+        with self._condition:
+            # backpressure: wait while buffer is full
+            while len(self._buffer) >= self.max_buffered_rows and not self._is_stopped():
+                self._condition.wait(timeout=1)
+            self._buffer.append(row)
+            if self._first_row_at is None:
+                self._first_row_at = time.time()
+            if len(self._buffer) >= self.batch_max_rows:
+                self._condition.notify_all()
+
+    def _is_stopped(self) -> bool:
+        return self._is_finished or (self._stop_event is not None and self._stop_event.is_set())
+
+    def _get_batch(self) -> list:
+        """ wait until batch is ready and take it from buffer
+
+            Returns:
+                list: rows of the batch, can be empty
+        """
+        with self._condition:
+            while True:
+                if len(self._buffer) >= self.batch_max_rows or self._is_finished:
+                    break
+                if len(self._buffer) > 0 and self._is_stopped():
+                    break
+                if self._first_row_at is None:
+                    timeout = self.batch_max_latency
+                else:
+                    timeout = self._first_row_at + self.batch_max_latency - time.time()
+                    if timeout <= 0:
+                        break
+                self._condition.wait(timeout=timeout)
+
+            rows = self._buffer[:self.batch_max_rows]
+            del self._buffer[:self.batch_max_rows]
+            self._first_row_at = time.time() if len(self._buffer) > 0 else None
+            self._condition.notify_all()
+            return rows
+
+    def _flush_worker(self):
         # set up environment
         ctx.load(self._ctx_dump)
-
         try:
-            if key is not None:
-                row.update(key)
-            table = [
-                row
-            ]
-
-            # inject data to query
-            query = copy.deepcopy(self.query)
-
-            def find_table(node, is_table, **kwargs):
-
-                if is_table:
-                    if (
-                            isinstance(node, Identifier)
-                            and len(node.parts) == 1
-                            and node.parts[0] == 'TABLE_DELTA'
-                    ):
-                        # replace with data
-                        return Data(table, alias=node.alias)
-
-            query_traversal(query, find_table)
+            while True:
+                rows = self._get_batch()
+                if len(rows) == 0:
+                    if self._is_finished:
+                        return
+                    continue
+                self._execute(rows)
+        finally:
+            db.session.remove()
+
+    def _execute(self, rows: list):
+        try:
+            # prepared query is copied with rows as data of TABLE_DELTA
+            query = copy.deepcopy(self.query, memo={id(self._delta_rows): rows})
 
             # exec query
             ret = self.command_executor.execute_command(query)
@@ -89,5 +181,8 @@ class TriggerTask(BaseTask):
 
         except Exception:
             self.set_error(str(traceback.format_exc()))
+        finally:
+            # batch is processed: return connections to integrations to the pool
+            integration_controller.handlers_cache.release()
 
         db.session.commit()
@@ -19,17 +19,24 @@ How to use it:
 Configuration:
 
 - max_size size of cache in count of records, default is 50
+- max_bytes size of cache in bytes, default is 1Gb
+- memory_max_bytes size of in-process cache in bytes, default is 64Mb.
+    In-process cache is used in front of file/redis cache, 0 disables it
 - serializer, module for serialization, default is dill
+- rows_max_size size of in-process store of single rows (get_rows_cache), default is 100000
+
+Old records are evicted when any of limits is exceeded: the least recently used records are deleted first.
 
 It can be set via:
 - get_cache function:
-    cache = get_cache('predict', max_size=2)
+    cache = get_cache('predict', max_size=2, max_bytes=10 * 1024 ** 2)
 - using specific cache class:
     cache = FileCache('predict', max_size=2)
 - using mindsdb config file:
     "cache": {
         "type": "redis",
-        "max_size": 2
+        "max_size": 2,
+        "max_bytes": 10485760
     }
 
 Cache engines:
@@ -46,6 +53,10 @@ By default is used local redis server. You can specify
         }
     }
 
+Statistics:
+
+    cache.stats()  # {'hits': ..., 'memory_hits': ..., 'misses': ..., 'evictions': ...}
+
 How to test:
 
     env PYTHONPATH=./ pytest tests/unit/test_cache.py
@@ -54,7 +65,9 @@ How to test:
 
 import os
 import time
+import threading
 from abc import ABC
+from collections import OrderedDict
 from pathlib import Path
 import hashlib
 import typing as t
@@ -69,8 +82,16 @@ from mindsdb.utilities.context import context as ctx
 
 
 def dataframe_checksum(df: pd.DataFrame):
-    checksum = str_checksum(df.to_json())
-    return checksum
+    # values are hashed column-wise, without serialization of the dataframe
+    hasher = hashlib.sha256()
+    hasher.update(str([(str(name), str(dtype)) for name, dtype in df.dtypes.items()]).encode())
+    try:
+        hashes = pd.util.hash_pandas_object(df, index=False)
+    except TypeError:
+        # unhashable values
+        return str_checksum(df.to_json())
+    hasher.update(hashes.to_numpy().tobytes())
+    return hasher.hexdigest()
 
 
 def json_checksum(obj: t.Union[dict, list]):
@@ -83,19 +104,167 @@ def str_checksum(obj: str):
     return checksum
 
 
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.memory_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def to_dict(self):
+        return {
+            'hits': self.hits,
+            'memory_hits': self.memory_hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+
+
+class MemoryCache:
+    """
+        In-process LRU cache of serialized values, limited by size in bytes
+    """
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, name):
+        with self.lock:
+            value = self.items.get(name)
+            if value is not None:
+                self.items.move_to_end(name)
+            return value
+
+    def set(self, name, value):
+        if len(value) > self.max_bytes:
+            # don't push out all the cache because of one big value
+            self.delete(name)
+            return
+        with self.lock:
+            if name in self.items:
+                self.size -= len(self.items.pop(name))
+            self.items[name] = value
+            self.size += len(value)
+
+            while self.size > self.max_bytes:
+                _, old_value = self.items.popitem(last=False)
+                self.size -= len(old_value)
+
+    def delete(self, name):
+        with self.lock:
+            if name in self.items:
+                self.size -= len(self.items.pop(name))
+
+
+class RowsCache:
+    """
+        In-process LRU store of single rows (for example, predictions for input rows).
+        Rows are grouped by scope (for example id of model), size is limited by count of rows
+    """
+    def __init__(self, max_rows):
+        self.max_rows = max_rows
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+        self.statistic = CacheStats()
+
+    def get_many(self, scope, keys: list) -> dict:
+        found = {}
+        with self.lock:
+            for key in keys:
+                item_key = (scope, key)
+                value = self.items.get(item_key)
+                if value is None:
+                    self.statistic.misses += 1
+                    continue
+                self.items.move_to_end(item_key)
+                found[key] = value
+                self.statistic.hits += 1
+        return found
+
+    def set_many(self, scope, values: dict):
+        with self.lock:
+            for key, value in values.items():
+                item_key = (scope, key)
+                self.items[item_key] = value
+                self.items.move_to_end(item_key)
+
+            while len(self.items) > self.max_rows:
+                self.items.popitem(last=False)
+                self.statistic.evictions += 1
+
+    def stats(self):
+        return self.statistic.to_dict()
+
+
 class BaseCache(ABC):
-    def __init__(self, max_size=None, serializer=None):
+    def __init__(self, max_size=None, max_bytes=None, memory_max_bytes=None, serializer=None):
         self.config = Config()
         if max_size is None:
             max_size = self.config["cache"].get("max_size", 50)
         self.max_size = max_size
+        if max_bytes is None:
+            max_bytes = self.config["cache"].get("max_bytes", 1024 ** 3)
+        self.max_bytes = max_bytes
+        if memory_max_bytes is None:
+            memory_max_bytes = self.config["cache"].get("memory_max_bytes", 64 * 1024 ** 2)
+        self.memory = None
+        if memory_max_bytes > 0:
+            self.memory = MemoryCache(memory_max_bytes)
         if serializer is None:
             serializer_module = self.config["cache"].get('serializer')
             if serializer_module == 'pickle':
                 import pickle as s_module
             else:
                 import dill as s_module
-            self.serializer = s_module
+            serializer = s_module
+        self.serializer = serializer
+        self.statistic = CacheStats()
+
+    def set(self, name, value):
+        value = self.serialize(value)
+        if self.memory is not None:
+            self.memory.set(name, value)
+        self.set_raw(name, value)
+
+    def get(self, name):
+        value = None
+        if self.memory is not None:
+            value = self.memory.get(name)
+            if value is not None:
+                self.statistic.memory_hits += 1
+
+        if value is None:
+            value = self.get_raw(name)
+            if value is None:
+                # no value in cache
+                self.statistic.misses += 1
+                return None
+            if self.memory is not None:
+                self.memory.set(name, value)
+
+        self.statistic.hits += 1
+        return self.deserialize(value)
+
+    def delete(self, name):
+        if self.memory is not None:
+            self.memory.delete(name)
+        self.delete_raw(name)
+
+    def stats(self):
+        return self.statistic.to_dict()
+
+    # functions of storage: work with serialized values
+
+    def set_raw(self, name, value: bytes):
+        raise NotImplementedError
+
+    def get_raw(self, name) -> t.Optional[bytes]:
+        raise NotImplementedError
+
+    def delete_raw(self, name):
+        raise NotImplementedError
 
     # default functions
 
@@ -113,6 +282,9 @@ class BaseCache(ABC):
 
 
 class FileCache(BaseCache):
+    # how often the size of cache folder is recalculated (it can be changed by other processes)
+    rescan_interval = 60
+
     def __init__(self, category, path=None, **kwargs):
         super().__init__(**kwargs)
 
@@ -128,23 +300,57 @@ class FileCache(BaseCache):
 
         self.path = cache_path
 
-    def clear_old_cache(self):
-        with FileLock(self.path):
-            # buffer to delete, to not run delete on every adding
-            buffer_size = 5
+        # estimated count of files and size of cache folder
+        self.files_count = None
+        self.files_size = None
+        self.scan_time = None
+
+    def scan_files(self):
+        files = []
+        for entry in os.scandir(self.path):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+        self.files_count = len(files)
+        self.files_size = sum(size for _, size, _ in files)
+        self.scan_time = time.time()
+        return files
+
+    def clear_old_cache(self, added_size=0):
+        if self.scan_time is None or time.time() - self.scan_time > self.rescan_interval:
+            self.scan_files()
+        else:
+            self.files_count += 1
+            self.files_size += added_size
 
-            if self.max_size is None:
-                return
+        # buffer to delete, to not run delete on every adding
+        buffer_size = 5
 
-            cur_count = len(os.listdir(self.path))
+        count_exceeded = self.max_size is not None and self.files_count > self.max_size + buffer_size
+        size_exceeded = self.max_bytes is not None and self.files_size > self.max_bytes
+        if not count_exceeded and not size_exceeded:
+            return
 
-            if cur_count > self.max_size + buffer_size:
+        with FileLock(self.path):
+            # least recently used first: mtime is updated on reading
+            files = sorted(self.scan_files())
+            for _, size, path in files:
+                if (
+                    (self.max_size is None or self.files_count <= self.max_size)
+                    and (self.max_bytes is None or self.files_size <= self.max_bytes)
+                ):
+                    break
                 try:
-                    files = sorted(Path(self.path).iterdir(), key=os.path.getmtime)
-                    for file in files[:cur_count - self.max_size]:
-                        self.delete_file(file)
+                    self.delete_file(path)
                 except FileNotFoundError:
                     pass
+                if self.memory is not None:
+                    self.memory.delete(Path(path).name)
+                self.files_count -= 1
+                self.files_size -= size
+                self.statistic.evictions += 1
 
     def file_path(self, name):
         return self.path / name
@@ -152,15 +358,14 @@ class FileCache(BaseCache):
     def set_df(self, name, df):
         path = self.file_path(name)
         df.to_pickle(path)
-        self.clear_old_cache()
+        self.clear_old_cache(os.path.getsize(path))
 
-    def set(self, name, value):
+    def set_raw(self, name, value):
         path = self.file_path(name)
-        value = self.serialize(value)
 
         with open(path, 'wb') as fd:
             fd.write(value)
-        self.clear_old_cache()
+        self.clear_old_cache(len(value))
 
     def get_df(self, name):
         path = self.file_path(name)
@@ -168,9 +373,10 @@ class FileCache(BaseCache):
             if not os.path.exists(path):
                 return None
             value = pd.read_pickle(path)
+            os.utime(path)
         return value
 
-    def get(self, name):
+    def get_raw(self, name):
         path = self.file_path(name)
 
         with FileLock(self.path):
@@ -178,10 +384,11 @@ class FileCache(BaseCache):
                 return None
             with open(path, 'rb') as fd:
                 value = fd.read()
-        value = self.deserialize(value)
+            # mark as recently used
+            os.utime(path)
         return value
 
-    def delete(self, name):
+    def delete_raw(self, name):
         path = self.file_path(name)
         self.delete_file(path)
 
@@ -200,58 +407,86 @@ class RedisCache(BaseCache):
             connection_info = self.config["cache"].get("connection", {})
         self.client = walrus.Database(**connection_info)
 
-    def clear_old_cache(self, key_added):
-
-        if self.max_size is None:
-            return
-
+    def clear_old_cache(self):
         # buffer to delete, to not run delete on every adding
         buffer_size = 5
 
         cur_count = self.client.hlen(self.category)
+        cur_size = int(self.client.get(self.size_key) or 0)
 
-        # remove oldest
-        if cur_count > self.max_size + buffer_size:
-            # 5 is buffer to delete, to not run delete on every adding
-
-            keys = self.client.hgetall(self.category)
-            # to list
-            keys = list(keys.items())
-            # sort by timestamp
-            keys.sort(key=lambda x: x[1])
+        count_exceeded = self.max_size is not None and cur_count > self.max_size + buffer_size
+        size_exceeded = self.max_bytes is not None and cur_size > self.max_bytes
+        if not count_exceeded and not size_exceeded:
+            return
 
-            for key, _ in keys[:cur_count - self.max_size]:
-                self.delete_key(key)
+        # remove least recently used
+        keys = self.client.hgetall(self.category)
+        sizes = self.client.hgetall(self.sizes_key)
+        # to list
+        keys = list(keys.items())
+        # sort by timestamp
+        keys.sort(key=lambda x: int(x[1]))
+
+        for key, _ in keys:
+            if (
+                (self.max_size is None or cur_count <= self.max_size)
+                and (self.max_bytes is None or cur_size <= self.max_bytes)
+            ):
+                break
+            self.delete_key(key)
+            if self.memory is not None:
+                if isinstance(key, bytes):
+                    key = key.decode()
+                self.memory.delete(key[len(self.category) + 1:])
+            cur_count -= 1
+            cur_size -= int(sizes.get(key, 0))
+            self.statistic.evictions += 1
 
     def redis_key(self, name):
         return f'{self.category}_{name}'
 
-    def set(self, name, value):
+    @property
+    def sizes_key(self):
+        # hash with sizes of all keys of category
+        return f'{self.category}__sizes'
+
+    @property
+    def size_key(self):
+        # total size of values in category
+        return f'{self.category}__size'
+
+    def set_raw(self, name, value):
         key = self.redis_key(name)
-        value = self.serialize(value)
 
+        old_size = self.client.hget(self.sizes_key, key)
         self.client.set(key, value)
-        # using key with category name to store all keys with modify time
+        # using key with category name to store all keys with access time
         self.client.hset(self.category, key, int(time.time() * 1000))
+        self.client.hset(self.sizes_key, key, len(value))
+        self.client.incrby(self.size_key, len(value) - int(old_size or 0))
 
-        self.clear_old_cache(key)
+        self.clear_old_cache()
 
-    def get(self, name):
+    def get_raw(self, name):
         key = self.redis_key(name)
         value = self.client.get(key)
-        if value is None:
-            # no value in cache
-            return None
-        return self.deserialize(value)
+        if value is not None:
+            # mark as recently used
+            self.client.hset(self.category, key, int(time.time() * 1000))
+        return value
 
-    def delete(self, name):
+    def delete_raw(self, name):
         key = self.redis_key(name)
 
         self.delete_key(key)
 
     def delete_key(self, key):
+        size = self.client.hget(self.sizes_key, key)
         self.client.delete(key)
         self.client.hdel(self.category, key)
+        if size is not None:
+            self.client.hdel(self.sizes_key, key)
+            self.client.decrby(self.size_key, int(size))
 
 
 class NoCache:
@@ -267,12 +502,41 @@ class NoCache:
     def set(self, name, value):
         pass
 
+    def stats(self):
+        return CacheStats().to_dict()
+
+
+# cache objects are reused to keep in-process cache and statistic between queries
+_caches = {}
+_caches_lock = threading.Lock()
+
 
 def get_cache(category, **kwargs):
     config = Config()
-    if config.get('cache')['type'] == 'redis':
-        return RedisCache(category, **kwargs)
-    if config.get('cache')['type'] == 'none':
-        return NoCache(category, **kwargs)
-    else:
-        return FileCache(category, **kwargs)
+    cache_type = config.get('cache')['type']
+    key = (cache_type, category, ctx.company_id, repr(sorted(kwargs.items())))
+
+    with _caches_lock:
+        cache = _caches.get(key)
+        if cache is None:
+            if cache_type == 'redis':
+                cache = RedisCache(category, **kwargs)
+            elif cache_type == 'none':
+                cache = NoCache(category, **kwargs)
+            else:
+                cache = FileCache(category, **kwargs)
+            _caches[key] = cache
+    return cache
+
+
+_rows_cache = None
+
+
+def get_rows_cache():
+    global _rows_cache
+    if _rows_cache is None:
+        with _caches_lock:
+            if _rows_cache is None:
+                max_rows = Config()['cache'].get('rows_max_size', 100000)
+                _rows_cache = RowsCache(max_rows)
+    return _rows_cache
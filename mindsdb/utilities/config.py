@@ -138,7 +138,8 @@ class Config():
                     "password": "",
                     "port": "47335",
                     "database": "mindsdb",
-                    "ssl": True
+                    "ssl": True,
+                    "fetch_chunk_size": 10000
                 },
                 "mongodb": {
                     "host": api_host,
@@ -154,6 +155,43 @@ class Config():
             "cache": {
                 "type": "local"
             },
+            "map_reduce": {
+                "batch_size": 1000,
+                "max_workers": 4
+            },
+            "plan_cache": {
+                "max_size": 1000
+            },
+            "connection_pool": {
+                "min_size": 0,
+                "max_size": 20,
+                "wait_timeout": 30,
+                "ttl": 60,
+                "health_check_interval": 30
+            },
+            "jobs": {
+                "check_interval": 30,
+                "max_workers": 4
+            },
+            "chatbots": {
+                "max_workers": 8
+            },
+            "triggers": {
+                "batch_max_rows": 1000,
+                "batch_max_latency": 1,
+                "max_buffered_rows": 10000
+            },
+            "predict_batching": {
+                "enabled": False,
+                "window_ms": 5,
+                "max_rows": 1000
+            },
+            "ml_process_pool": {
+                "ttl": 120,
+                "max_processes": None,
+                "max_model_concurrency": 2,
+                "max_memory_usage": 0.9
+            },
             'ml_task_queue': ml_queue
         }
 
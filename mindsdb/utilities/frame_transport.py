@@ -0,0 +1,197 @@
+"""
+Transport of dataframes between processes in Arrow IPC format.
+
+Pickling of big dataframe and copying it through a pipe is slow. Instead of it:
+ - for local processes dataframe is written to memory-mapped file (in /dev/shm if it is available)
+   and only small descriptor (SharedFrame) is pickled. Receiver reads the file without copying
+   of arrow buffers.
+ - for the redis queue dataframe is serialised into Arrow IPC stream.
+
+Dataframes which can not be converted to arrow and back without changes of types (mixed types
+in column, nested objects, non-string column names) are pickled as before.
+"""
+
+import os
+import tempfile
+from uuid import uuid4
+from typing import Optional
+
+import pandas as pd
+try:
+    import pyarrow as pa
+except ImportError:
+    # without pyarrow dataframes are pickled
+    pa = None
+
+
+ARROW_MAGIC = b'MDBARROW'
+
+# dataframes smaller than that are pickled: it is faster than writing a file
+SHARED_FRAME_MIN_SIZE = 1024 * 1024
+
+
+def _get_shared_dir() -> str:
+    if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK):
+        return '/dev/shm'
+    return tempfile.gettempdir()
+
+
+def _is_object_type_safe(arrow_type) -> bool:
+    """ types which are converted back to the same python objects in 'object' column
+    """
+    return (
+        pa.types.is_string(arrow_type)
+        or pa.types.is_large_string(arrow_type)
+        or pa.types.is_binary(arrow_type)
+        or pa.types.is_large_binary(arrow_type)
+        or pa.types.is_date(arrow_type)
+        or pa.types.is_time(arrow_type)
+        or pa.types.is_decimal(arrow_type)
+        or pa.types.is_boolean(arrow_type)
+        or pa.types.is_null(arrow_type)
+    )
+
+
+def df_to_arrow(df: pd.DataFrame) -> Optional['pa.Table']:
+    """ convert dataframe to arrow table if it can be converted back without changes
+
+        Args:
+            df (pd.DataFrame): dataframe to convert
+
+        Returns:
+            pa.Table or None
+    """
+    if pa is None:
+        return None
+    columns = list(df.columns)
+    if not all(isinstance(name, str) for name in columns) or len(set(columns)) != len(columns):
+        return None
+    try:
+        table = pa.Table.from_pandas(df)
+    except (pa.ArrowException, TypeError, ValueError):
+        return None
+    for name, dtype in df.dtypes.items():
+        if dtype == object and not _is_object_type_safe(table.schema.field(name).type):
+            return None
+    return table
+
+
+def df_to_ipc(df: pd.DataFrame, compression: Optional[str] = None) -> Optional[bytes]:
+    """ serialise dataframe to Arrow IPC stream
+
+        Args:
+            df (pd.DataFrame): dataframe to serialise
+            compression (str): codec for buffers of the stream: 'zstd' or 'lz4', not compressed if it is not available
+
+        Returns:
+            bytes or None if dataframe can not be converted to arrow
+    """
+    table = df_to_arrow(df)
+    if table is None:
+        return None
+    if compression is not None and not pa.Codec.is_available(compression):
+        compression = None
+    sink = pa.BufferOutputStream()
+    sink.write(ARROW_MAGIC)
+    options = pa.ipc.IpcWriteOptions(compression=compression)
+    with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def is_ipc(b: bytes) -> bool:
+    return b[:len(ARROW_MAGIC)] == ARROW_MAGIC
+
+
+def df_from_ipc(b: bytes) -> pd.DataFrame:
+    """ load dataframe from Arrow IPC stream made by df_to_ipc
+
+        Args:
+            b (bytes): serialised dataframe
+
+        Returns:
+            pd.DataFrame
+    """
+    buffer = pa.py_buffer(b)[len(ARROW_MAGIC):]
+    return pa.ipc.open_stream(buffer).read_all().to_pandas()
+
+
+class SharedFrame:
+    """ Descriptor of dataframe which is written to memory-mapped file. It is cheap to pickle.
+        The file is deleted by the receiver after loading or by the sender if the receiver
+        did not take it.
+    """
+
+    def __init__(self, path: str, rows_count: int):
+        self.path = path
+        self.rows_count = rows_count
+
+    @staticmethod
+    def from_df(df: pd.DataFrame) -> Optional['SharedFrame']:
+        """ write dataframe to shared file
+
+            Args:
+                df (pd.DataFrame): dataframe to share
+
+            Returns:
+                SharedFrame or None if it is better to pickle the dataframe
+        """
+        if df.memory_usage(index=False, deep=False).sum() < SHARED_FRAME_MIN_SIZE:
+            return None
+        table = df_to_arrow(df)
+        if table is None:
+            return None
+        path = os.path.join(_get_shared_dir(), f'mindsdb_frame_{uuid4().hex}.arrow')
+        try:
+            with pa.OSFile(path, 'wb') as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+        except Exception:
+            if os.path.exists(path):
+                os.unlink(path)
+            return None
+        return SharedFrame(path, len(df))
+
+    def to_df(self) -> pd.DataFrame:
+        """ read dataframe from shared file
+
+            Returns:
+                pd.DataFrame
+        """
+        with pa.memory_map(self.path, 'r') as source:
+            return pa.ipc.open_file(source).read_all().to_pandas()
+
+    def delete(self) -> None:
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def pop_df(self) -> pd.DataFrame:
+        """ read dataframe and delete the file
+
+            Returns:
+                pd.DataFrame
+        """
+        try:
+            return self.to_df()
+        finally:
+            self.delete()
+
+
+def share_df(obj):
+    """ replace dataframe by SharedFrame if it is worth it, other objects are returned as is
+    """
+    if isinstance(obj, pd.DataFrame):
+        shared_frame = SharedFrame.from_df(obj)
+        if shared_frame is not None:
+            return shared_frame
+    return obj
+
+
+def unshare_df(obj):
+    """ replace SharedFrame by dataframe and delete the shared file, other objects are returned as is
+    """
+    if isinstance(obj, SharedFrame):
+        return obj.pop_df()
+    return obj
@@ -5,6 +5,15 @@ TASKS_STREAM_NAME = b'ml-tasks'
 TASKS_STREAM_CONSUMER_GROUP_NAME = 'ml_executors'
 TASKS_STREAM_CONSUMER_NAME = 'ml_executor'
 
+# time to live of task keys in redis
+TASK_KEYS_TTL = 180
+# max time without updates of task status
+TASK_TIMEOUT = 30
+# count of rows in one chunk of dataframe
+DATAFRAME_CHUNK_SIZE = 100000
+# max count of chunks of dataframe in redis which are not read yet
+DATAFRAME_MAX_QUEUED_CHUNKS = 8
+
 
 class ML_TASK_TYPE(Enum):
     LEARN = b'learn'
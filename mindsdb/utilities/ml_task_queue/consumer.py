@@ -8,6 +8,7 @@ from functools import wraps
 from collections.abc import Callable
 
 import psutil
+import pandas as pd
 from walrus import Database
 from pandas import DataFrame
 from redis.exceptions import ConnectionError as RedisConnectionError
@@ -15,13 +16,14 @@ from redis.exceptions import ConnectionError as RedisConnectionError
 from mindsdb.utilities.config import Config
 from mindsdb.utilities.context import context as ctx
 from mindsdb.integrations.libs.process_cache import process_cache
-from mindsdb.utilities.ml_task_queue.utils import RedisKey, StatusNotifier, to_bytes, from_bytes
+from mindsdb.utilities.ml_task_queue.utils import RedisKey, StatusNotifier, DataframeStream, from_bytes
 from mindsdb.utilities.ml_task_queue.base import BaseRedisQueue
 from mindsdb.utilities.fs import clean_unlinked_process_marks
 from mindsdb.utilities.functions import mark_process
 from mindsdb.utilities.ml_task_queue.const import (
     ML_TASK_TYPE,
     ML_TASK_STATUS,
+    TASK_KEYS_TTL,
     TASKS_STREAM_NAME,
     TASKS_STREAM_CONSUMER_NAME,
     TASKS_STREAM_CONSUMER_GROUP_NAME
@@ -169,44 +171,55 @@ class MLTaskConsumer(BaseRedisQueue):
             if len(company_id) == 0:
                 company_id = None
             redis_key = RedisKey(message_content.get(b'redis_key'))
-
-            # region read dataframe
-            dataframe_bytes = self.cache.get(redis_key.dataframe)
-            dataframe = None
-            if dataframe_bytes is not None:
-                dataframe = from_bytes(dataframe_bytes)
-                self.cache.delete(redis_key.dataframe)
-            # endregion
+            has_dataframe = int(message_content.get(b'has_dataframe', 0)) == 1
+            is_chunked = int(message_content.get(b'is_chunked', 0)) == 1
 
             ctx.load(payload['context'])
         finally:
             self._ready_event.set()
 
+        status_notifier = StatusNotifier(redis_key, ML_TASK_STATUS.PROCESSING, self.db, self.cache)
+        status_notifier.start()
+        input_stream = DataframeStream(self.db, redis_key.input, redis_key)
+        output_stream = DataframeStream(self.db, redis_key.output, redis_key)
         try:
-            task = process_cache.apply_async(
-                task_type=task_type,
-                model_id=model_id,
-                payload=payload,
-                dataframe=dataframe
-            )
-            status_notifier = StatusNotifier(redis_key, ML_TASK_STATUS.PROCESSING, self.db, self.cache)
-            status_notifier.start()
-            result = task.result()
+            if is_chunked:
+                # rows are predicted independently: every chunk is sent back as soon as it is predicted
+                for dataframe in input_stream:
+                    result = self._run_task(task_type, model_id, payload, dataframe)
+                    output_stream.write(result)
+            else:
+                dataframe = None
+                if has_dataframe:
+                    chunks = list(input_stream)
+                    dataframe = pd.concat(chunks) if len(chunks) > 1 else chunks[0]
+                result = self._run_task(task_type, model_id, payload, dataframe)
+                if isinstance(result, DataFrame):
+                    output_stream.write(result)
         except Exception as e:
             self.wait_redis_ping()
             status_notifier.stop()
-            exception_bytes = to_bytes(e)
-            self.cache.set(redis_key.exception, exception_bytes, 10)
+            output_stream.error(e)
             self.db.publish(redis_key.status, ML_TASK_STATUS.ERROR.value)
-            self.cache.set(redis_key.status, ML_TASK_STATUS.ERROR.value, 180)
+            self.cache.set(redis_key.status, ML_TASK_STATUS.ERROR.value, TASK_KEYS_TTL)
         else:
             self.wait_redis_ping()
             status_notifier.stop()
-            if isinstance(result, DataFrame):
-                dataframe_bytes = to_bytes(result)
-                self.cache.set(redis_key.dataframe, dataframe_bytes, 10)
+            output_stream.end()
             self.db.publish(redis_key.status, ML_TASK_STATUS.COMPLETE.value)
-            self.cache.set(redis_key.status, ML_TASK_STATUS.COMPLETE.value, 180)
+            self.cache.set(redis_key.status, ML_TASK_STATUS.COMPLETE.value, TASK_KEYS_TTL)
+        finally:
+            self.db.delete(redis_key.input)
+
+    @staticmethod
+    def _run_task(task_type: ML_TASK_TYPE, model_id: int, payload: dict, dataframe: DataFrame = None):
+        task = process_cache.apply_async(
+            task_type=task_type,
+            model_id=model_id,
+            payload=payload,
+            dataframe=dataframe
+        )
+        return task.result()
 
     def run(self) -> None:
         """ Start new listen thread each time when _ready_event is set
@@ -5,13 +5,15 @@ from pandas import DataFrame
 
 from mindsdb.utilities.context import context as ctx
 from mindsdb.utilities.config import Config
-from mindsdb.utilities.ml_task_queue.utils import RedisKey, to_bytes
+from mindsdb.utilities.ml_task_queue.utils import RedisKey, DataframeStream, DataframeWriter
 from mindsdb.utilities.ml_task_queue.task import Task
 from mindsdb.utilities.ml_task_queue.base import BaseRedisQueue
 from mindsdb.utilities.ml_task_queue.const import (
     TASKS_STREAM_NAME,
     ML_TASK_TYPE,
-    ML_TASK_STATUS
+    ML_TASK_STATUS,
+    TASK_KEYS_TTL,
+    DATAFRAME_CHUNK_SIZE
 )
 
 
@@ -23,8 +25,11 @@ class MLTaskProducer(BaseRedisQueue):
             stream
             cache
             pubsub
+            chunk_size (int): count of rows in a chunk of input dataframe
     """
 
+    chunk_size = DATAFRAME_CHUNK_SIZE
+
     def __init__(self) -> None:
         config = Config().get('ml_task_queue', {})
 
@@ -42,6 +47,21 @@ class MLTaskProducer(BaseRedisQueue):
         self.cache = self.db.cache()
         self.pubsub = self.db.pubsub()
 
+    @staticmethod
+    def is_chunked_predict(task_type: ML_TASK_TYPE, payload: dict, dataframe: DataFrame = None) -> bool:
+        """ check if rows of dataframe can be predicted by chunks independently: it is not true
+            for learning and for time series models, which use previous rows
+
+            Returns:
+                bool
+        """
+        if task_type != ML_TASK_TYPE.PREDICT or dataframe is None:
+            return False
+        if '__mdb_forecast_offset' in dataframe.columns:
+            return False
+        learn_args = getattr(payload.get('predictor_record'), 'learn_args', None) or {}
+        return learn_args.get('timeseries_settings', {}).get('is_timeseries', False) is not True
+
     def apply_async(self, task_type: ML_TASK_TYPE, model_id: int, payload: dict, dataframe: DataFrame = None) -> Task:
         ''' Add tasks to the queue
 
@@ -49,12 +69,13 @@ class MLTaskProducer(BaseRedisQueue):
                 task_type (ML_TASK_TYPE): type of the task
                 model_id (int): model identifier
                 payload (dict): lightweight model data that will be added to stream message
-                dataframe (DataFrame): dataframe will be transfered via regular redis storage
+                dataframe (DataFrame): dataframe will be streamed by chunks via redis list
 
             Returns:
                 Task: object representing the task
         '''
         try:
+            is_chunked = self.is_chunked_predict(task_type, payload, dataframe)
             payload = pickle.dumps(payload, protocol=5)
             redis_key = RedisKey.new()
             message = {
@@ -62,16 +83,23 @@ class MLTaskProducer(BaseRedisQueue):
                 "company_id": '' if ctx.company_id is None else ctx.company_id,     # None can not be dumped
                 "model_id": model_id,
                 "payload": payload,
-                "redis_key": redis_key.base
+                "redis_key": redis_key.base,
+                "has_dataframe": int(dataframe is not None),
+                "is_chunked": int(is_chunked)
             }
 
             self.wait_redis_ping()
-            if dataframe is not None:
-                self.cache.set(redis_key.dataframe, to_bytes(dataframe), 180)
-            self.cache.set(redis_key.status, ML_TASK_STATUS.WAITING, 180)
+            self.cache.set(redis_key.status, ML_TASK_STATUS.WAITING, TASK_KEYS_TTL)
 
+            # message goes first: consumer can start processing of the first chunk while others are sent
             self.stream.add(message)
-            return Task(self.db, redis_key)
+            input_writer = None
+            if dataframe is not None:
+                # input is sent in background: consumer waits while its result is not read
+                input_stream = DataframeStream(self.db, redis_key.input, redis_key)
+                input_writer = DataframeWriter(input_stream, dataframe, chunk_size=self.chunk_size)
+                input_writer.start()
+            return Task(self.db, redis_key, input_writer)
         except ConnectionError:
             print('Cant send message to redis: connect failed')
             raise
@@ -1,10 +1,12 @@
 from collections.abc import Callable
+from typing import Iterator
 
 import redis
+import pandas as pd
 from pandas import DataFrame
 
-from mindsdb.utilities.ml_task_queue.utils import RedisKey, from_bytes
-from mindsdb.utilities.ml_task_queue.const import ML_TASK_STATUS
+from mindsdb.utilities.ml_task_queue.utils import RedisKey, DataframeStream, DataframeWriter
+from mindsdb.utilities.ml_task_queue.const import TASK_TIMEOUT
 
 
 class Task:
@@ -15,57 +17,50 @@ class Task:
             redis_key (RedisKey): redis keys associated with task
             dataframe (DataFrame): task result
             exception (Exception): task exeuton  runtime exception
+            input_writer (DataframeWriter): worker which sends input dataframe
             _timeout (int): max time without status updating
     """
 
-    def __init__(self, connection: redis.Redis, redis_key: RedisKey) -> None:
+    def __init__(self, connection: redis.Redis, redis_key: RedisKey, input_writer: DataframeWriter = None) -> None:
         self.db = connection
         self.redis_key = redis_key
+        self.input_writer = input_writer
         self.dataframe = None
         self.exception = None
-        self._timeout = 30
+        self._timeout = TASK_TIMEOUT
+        self._is_done = False
 
-    def subscribe(self) -> ML_TASK_STATUS:
-        """ return tasks status untill it is not done or failed
+    def stream(self) -> Iterator[DataFrame]:
+        """ iterate over chunks of the result as soon as they are ready
+
+            Returns:
+                Iterator[DataFrame]: chunks of result
         """
-        pubsub = self.db.pubsub()
-        cache = self.db.cache()
-        pubsub.subscribe(self.redis_key.status)
-        while (msg := pubsub.get_message(timeout=self._timeout)):
-            if msg['type'] not in pubsub.PUBLISH_MESSAGE_TYPES:
-                continue
-            ml_task_status = ML_TASK_STATUS(msg['data'])
-            if ml_task_status == ML_TASK_STATUS.COMPLETE:
-                dataframe_bytes = cache.get(self.redis_key.dataframe)
-                if dataframe_bytes is not None:
-                    self.dataframe = from_bytes(dataframe_bytes)
-                cache.delete(self.redis_key.dataframe)
-            elif ml_task_status == ML_TASK_STATUS.ERROR:
-                exception_bytes = cache.get(self.redis_key.exception)
-                if exception_bytes is not None:
-                    self.exception = from_bytes(exception_bytes)
-            yield ml_task_status
-        else:
-            # there is no mesasges, timeout
-            ml_task_status = ML_TASK_STATUS.TIMEOUT
-            yield ml_task_status
+        if self._is_done:
+            raise Exception('Result of the task is already read')
+        self._is_done = True
+        try:
+            yield from DataframeStream(self.db, self.redis_key.output, self.redis_key, self._timeout)
+        except Exception as e:
+            self.exception = e
+            raise
+        finally:
+            if self.input_writer is not None:
+                # task is finished or result is not read anymore: the rest of the input is not needed
+                self.input_writer.stop()
+                self.input_writer.join()
+                self.db.delete(self.redis_key.input)
 
-    def wait(self, status: ML_TASK_STATUS = ML_TASK_STATUS.COMPLETE) -> None:
-        """ block threasd untill task is not done or failed
+    def wait(self) -> None:
+        """ block thread untill task is not done or failed
         """
-        for status in self.subscribe():
-            if status in (ML_TASK_STATUS.WAITING, ML_TASK_STATUS.PROCESSING):
-                continue
-            if status == ML_TASK_STATUS.ERROR:
-                if self.exception is not None:
-                    raise self.exception
-                else:
-                    raise Exception('Unknown error during ML task execution')
-            if status == ML_TASK_STATUS.TIMEOUT:
-                raise Exception(f"Can't get answer in {self._timeout} seconds")
-            if status == ML_TASK_STATUS.COMPLETE:
-                return
-            raise KeyError('Unknown task status')
+        if self._is_done:
+            if self.exception is not None:
+                raise self.exception
+            return
+        chunks = list(self.stream())
+        if len(chunks) > 0:
+            self.dataframe = pd.concat(chunks) if len(chunks) > 1 else chunks[0]
 
     def result(self) -> DataFrame:
         """ wait task is done and return result
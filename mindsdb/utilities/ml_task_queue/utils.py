@@ -2,23 +2,37 @@ import time
 import pickle
 import socket
 import threading
+from typing import Iterator, Optional
 
+from pandas import DataFrame
 from walrus import Database
 from redis.exceptions import ConnectionError as RedisConnectionError
 
 from mindsdb.utilities.context import context as ctx
-from mindsdb.utilities.ml_task_queue.const import ML_TASK_STATUS
+from mindsdb.utilities.frame_transport import df_to_ipc, df_from_ipc, is_ipc
+from mindsdb.utilities.ml_task_queue.const import (
+    ML_TASK_STATUS,
+    TASK_KEYS_TTL,
+    TASK_TIMEOUT,
+    DATAFRAME_CHUNK_SIZE,
+    DATAFRAME_MAX_QUEUED_CHUNKS
+)
 
 
-def to_bytes(obj: object) -> bytes:
-    """ dump object into bytes
+def to_bytes(obj: object, compression: Optional[str] = None) -> bytes:
+    """ dump object into bytes. Dataframes are dumped as Arrow IPC stream if it is possible
 
         Args:
             obj (object): object to convert
+            compression (str): codec to compress Arrow IPC stream
 
         Returns:
             bytes
     """
+    if isinstance(obj, DataFrame):
+        ipc_bytes = df_to_ipc(obj, compression=compression)
+        if ipc_bytes is not None:
+            return ipc_bytes
     return pickle.dumps(obj, protocol=5)
 
 
@@ -31,6 +45,8 @@ def from_bytes(b: bytes) -> object:
         Returns:
             object
     """
+    if is_ipc(b):
+        return df_from_ipc(b)
     return pickle.loads(b)
 
 
@@ -80,12 +96,138 @@ class RedisKey:
         return (self._base_key + b'-status').decode()
 
     @property
-    def dataframe(self) -> str:
-        return (self._base_key + b'-dataframe').decode()
+    def input(self) -> str:
+        return (self._base_key + b'-input').decode()
 
     @property
-    def exception(self) -> str:
-        return (self._base_key + b'-exception').decode()
+    def output(self) -> str:
+        return (self._base_key + b'-output').decode()
+
+
+def is_task_alive(db: Database, redis_key: RedisKey, timeout: int = TASK_TIMEOUT) -> bool:
+    """ check that status of the task was updated within timeout
+
+        Args:
+            db (Database): redis db object
+            redis_key (RedisKey): keys of the task
+            timeout (int): max time without updates of status
+
+        Returns:
+            bool
+    """
+    ttl = db.ttl(db.cache().make_key(redis_key.status))
+    return ttl is not None and ttl > TASK_KEYS_TTL - timeout
+
+
+class DataframeStream:
+    """ Dataframe which is passed through redis list as sequence of compressed Arrow IPC chunks.
+        Reader pops chunks while writer adds them, so only a few chunks are kept in redis at once.
+        The end of the stream is an empty element, the error is a pickled exception.
+    """
+
+    def __init__(self, db: Database, key: str, redis_key: RedisKey, timeout: int = TASK_TIMEOUT) -> None:
+        """
+            Args:
+                db (Database): redis db object
+                key (str): name of redis list
+                redis_key (RedisKey): keys of the task, status of the task is used to check that it is alive
+                timeout (int): max time to wait for the other side
+        """
+        self.db = db
+        self.key = key
+        self.redis_key = redis_key
+        self.timeout = timeout
+
+    def _push(self, value: bytes) -> None:
+        pipeline = self.db.pipeline()
+        pipeline.rpush(self.key, value)
+        pipeline.expire(self.key, TASK_KEYS_TTL)
+        pipeline.execute()
+
+    def write(self, dataframe: DataFrame, chunk_size: int = DATAFRAME_CHUNK_SIZE,
+              stop_event: threading.Event = None) -> None:
+        """ add dataframe to the stream by chunks. Waits if reader is behind
+
+            Args:
+                dataframe (DataFrame): data to add
+                chunk_size (int): count of rows in a chunk
+                stop_event (threading.Event): writing is interrupted if the event is set
+        """
+        for start in range(0, max(len(dataframe), 1), chunk_size):
+            last_read_at = time.time()
+            while True:
+                if stop_event is not None and stop_event.is_set():
+                    return
+                if self.db.llen(self.key) < DATAFRAME_MAX_QUEUED_CHUNKS:
+                    break
+                if is_task_alive(self.db, self.redis_key, self.timeout):
+                    last_read_at = time.time()
+                elif time.time() - last_read_at > self.timeout:
+                    raise Exception(f"Can't send data to ML task in {self.timeout} seconds")
+                time.sleep(0.05)
+            self._push(to_bytes(dataframe[start:start + chunk_size], compression='zstd'))
+
+    def end(self) -> None:
+        self._push(b'')
+
+    def error(self, exception: Exception) -> None:
+        self._push(to_bytes(exception))
+
+    def __iter__(self) -> Iterator[DataFrame]:
+        """ read chunks until the end of the stream
+
+            Raises:
+                Exception: exception that was written to the stream or if there is no data within timeout
+        """
+        last_read_at = time.time()
+        while True:
+            item = self.db.blpop(self.key, timeout=1)
+            if item is None:
+                if is_task_alive(self.db, self.redis_key, self.timeout):
+                    last_read_at = time.time()
+                elif time.time() - last_read_at > self.timeout:
+                    raise Exception(f"Can't get data of ML task in {self.timeout} seconds")
+                continue
+            last_read_at = time.time()
+            value = item[1]
+            if value == b'':
+                self.db.delete(self.key)
+                return
+            obj = from_bytes(value)
+            if isinstance(obj, Exception):
+                self.db.delete(self.key)
+                raise obj
+            yield obj
+
+
+class DataframeWriter(threading.Thread):
+    """ Worker that writes dataframe to the stream in background. Result of the task is read
+        at the same time: consumer can't get the next chunk of input until it sends the result of previous ones
+    """
+
+    def __init__(self, stream: DataframeStream, dataframe: DataFrame, chunk_size: int = DATAFRAME_CHUNK_SIZE) -> None:
+        threading.Thread.__init__(self, daemon=True)
+        self.stream = stream
+        self.dataframe = dataframe
+        self.chunk_size = chunk_size
+        self._stop_event = threading.Event()
+
+    def stop(self) -> None:
+        """ interrupt writing, it is used if the result is not needed anymore
+        """
+        self._stop_event.set()
+
+    def run(self):
+        try:
+            self.stream.write(self.dataframe, chunk_size=self.chunk_size, stop_event=self._stop_event)
+            if self._stop_event.is_set() is False:
+                self.stream.end()
+        except Exception as e:
+            try:
+                # consumer waits for the input: pass the error to it
+                self.stream.error(e)
+            except Exception:
+                pass
 
 
 class StatusNotifier(threading.Thread):
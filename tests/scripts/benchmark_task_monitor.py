@@ -0,0 +1,93 @@
+"""
+Benchmark of load of TaskMonitor on the metadata database: count of SQL statements per check of tasks
+
+How to run (from project root):
+    env PYTHONPATH=./ python tests/scripts/benchmark_task_monitor.py --tasks 100 1000 --ticks 10
+"""
+import os
+import argparse
+import tempfile
+import time
+
+import sqlalchemy as sa
+
+from mindsdb.interfaces.storage import db
+from mindsdb.interfaces.tasks import task_monitor
+from mindsdb.interfaces.tasks.task_monitor import TaskMonitor
+
+
+class FakeTaskThread:
+    # tasks are not executed, only load of monitor is measured
+    def __init__(self, task_id):
+        self.task_id = task_id
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def join(self, timeout=None):
+        pass
+
+    def is_alive(self):
+        return True
+
+
+class StatementsCounter:
+    def __init__(self, engine):
+        self.count = 0
+        sa.event.listen(engine, 'before_cursor_execute', self.callback)
+
+    def callback(self, *args, **kwargs):
+        self.count += 1
+
+    def measure(self, fnc):
+        self.count = 0
+        start = time.perf_counter()
+        fnc()
+        return self.count, time.perf_counter() - start
+
+
+def run(tasks_count, ticks):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db.init(f'sqlite:///{os.path.join(tmp_dir, "mindsdb.sqlite3.db")}')
+        db.Base.metadata.create_all(db.engine)
+        db.session.add_all([
+            db.Tasks(company_id=None, object_type='chatbot', object_id=i, active=True)
+            for i in range(tasks_count)
+        ])
+        db.session.commit()
+
+        counter = StatementsCounter(db.engine)
+        task_monitor.TaskThread = FakeTaskThread
+        monitor = TaskMonitor()
+
+        count, duration = counter.measure(monitor.check_tasks)
+        print(f'{tasks_count:>6} tasks, start:  {count:>6} statements, {duration:.3f}s')
+
+        total_count, total_duration = 0, 0
+        for _ in range(ticks):
+            count, duration = counter.measure(monitor.check_tasks)
+            total_count += count
+            total_duration += duration
+        print(f'{tasks_count:>6} tasks, tick:   {total_count / ticks:>6.0f} statements, {total_duration / ticks:.3f}s')
+
+        task = db.session.query(db.Tasks).first()
+        task.reload = True
+        db.session.commit()
+        count, duration = counter.measure(monitor.check_tasks)
+        print(f'{tasks_count:>6} tasks, reload: {count:>6} statements, {duration:.3f}s')
+
+        db.session.remove()
+        db.engine.dispose()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tasks', type=int, nargs='+', default=[100, 1000])
+    parser.add_argument('--ticks', type=int, default=10)
+    args = parser.parse_args()
+
+    for tasks_count in args.tasks:
+        run(tasks_count, args.ticks)
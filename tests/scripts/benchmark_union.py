@@ -0,0 +1,49 @@
+"""
+Benchmark of UNION / UNION ALL execution in SQLQuery
+
+How to run (from project root):
+    env PYTHONPATH=./ python tests/scripts/benchmark_union.py --rows 100000 1000000 10000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from mindsdb_sql.planner.steps import UnionStep
+from mindsdb_sql.planner.step_result import Result
+
+from mindsdb.api.mysql.mysql_proxy.classes.sql_query import SQLQuery, ResultSet
+
+
+def make_result_set(rows, seed):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'id': rng.integers(0, rows, rows),
+        'value': rng.random(rows).round(2),
+        'name': pd.Series(rng.integers(0, 1000, rows)).astype(str).radd('name_'),
+    })
+    return ResultSet().from_df(df, database='db', table_name='t')
+
+
+def run(rows):
+    # SQLQuery is not initialized: execute_step of UnionStep uses only steps data
+    query = SQLQuery.__new__(SQLQuery)
+    steps_data = [make_result_set(rows // 2, 1), make_result_set(rows // 2, 2)]
+
+    for unique in (False, True):
+        step = UnionStep(left=Result(0), right=Result(1), unique=unique)
+        start = time.perf_counter()
+        result = query.execute_step(step, steps_data)
+        duration = time.perf_counter() - start
+        name = 'UNION' if unique else 'UNION ALL'
+        print(f'{name:>9} {rows:>10} rows -> {result.length():>10} rows: {duration:.3f}s')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, nargs='+', default=[100000, 1000000, 10000000])
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        run(rows)
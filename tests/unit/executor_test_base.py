@@ -244,6 +244,7 @@ class BaseExecutorTest(BaseUnitTest):
 
         from mindsdb.integrations.libs.response import RESPONSE_TYPE
         from mindsdb.integrations.libs.response import HandlerResponse as Response
+        from mindsdb.integrations.libs.base import DatabaseHandler
 
         def handler_response(df):
             response = Response(RESPONSE_TYPE.TABLE, df)
@@ -316,6 +317,16 @@ class BaseExecutorTest(BaseUnitTest):
 
         mock_handler().query.side_effect = query_f
 
+        def query_stream_f(query, fetch_size=1000):
+            return DatabaseHandler.query_stream(mock_handler(), query, fetch_size)
+
+        mock_handler().query_stream.side_effect = query_stream_f
+
+        def insert_dataframe_f(table, df, batch_size=1000):
+            return DatabaseHandler.insert_dataframe(mock_handler(), table, df, batch_size)
+
+        mock_handler().insert_dataframe.side_effect = insert_dataframe_f
+
     def set_project(self, project):
         r = self.db.Project.query.filter_by(name=project["name"]).first()
         if r is not None:
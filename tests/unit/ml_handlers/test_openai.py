@@ -255,3 +255,17 @@ class TestOpenAI(BaseExecutorTest):
 
         for i in range(N):
             assert "positive" in result_df["completion"].iloc[i].lower()
+
+
+def test_create_validation_known_args():
+    """Test that args of common options of ml engines are accepted, it doesn't require API key"""
+    using = {
+        'question_column': 'question',
+        'cache_rows': True,
+        'predict_batching': True
+    }
+    OpenAIHandler.create_validation('answer', args={'using': using})
+
+    using['evidently_wrong_argument'] = 'wrong value'
+    with pytest.raises(Exception, match='Unknown arguments'):
+        OpenAIHandler.create_validation('answer', args={'using': using})
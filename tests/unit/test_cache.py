@@ -10,7 +10,7 @@ import os
 
 import pandas as pd
 
-from mindsdb.utilities.cache import get_cache, RedisCache, FileCache, dataframe_checksum
+from mindsdb.utilities.cache import get_cache, RedisCache, FileCache, MemoryCache, dataframe_checksum
 
 
 class TestCashe(unittest.TestCase):
@@ -41,6 +41,44 @@ class TestCashe(unittest.TestCase):
 
         self.cache_test(cache)
 
+    def test_file_max_bytes(self):
+        cache = FileCache('test_max_bytes', max_size=100, max_bytes=3000, memory_max_bytes=0)
+        for name in os.listdir(cache.path):
+            cache.delete(name)
+
+        value = 'x' * 1000
+        for i in range(5):
+            cache.set(str(i), value)
+            time.sleep(0.01)
+            # keep the first record in use
+            assert cache.get('0') == value
+
+        # least recently used are deleted, the first record is kept
+        assert cache.get('0') == value
+        assert cache.get('1') is None
+        assert cache.get('4') == value
+
+        stats = cache.stats()
+        assert stats['evictions'] >= 2
+        assert stats['misses'] == 1
+
+    def test_memory_cache(self):
+        cache = MemoryCache(max_bytes=10)
+        cache.set('a', b'12345')
+        cache.set('b', b'12345')
+        cache.get('a')
+        cache.set('c', b'12345')
+
+        # b is least recently used
+        assert cache.get('b') is None
+        assert cache.get('a') == b'12345'
+        assert cache.size == 10
+
+        # too big value is not stored
+        cache.set('d', b'x' * 11)
+        assert cache.get('d') is None
+        assert cache.size == 10
+
     def cache_test(self, cache):
 
         # test save
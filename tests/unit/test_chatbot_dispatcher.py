@@ -0,0 +1,45 @@
+import time
+import threading
+from unittest.mock import patch, MagicMock
+
+from mindsdb.interfaces.chatbot import dispatcher as dispatcher_module
+from mindsdb.interfaces.chatbot.dispatcher import MessageDispatcher
+
+
+class TestMessageDispatcher:
+    def test_chats_in_parallel(self):
+        processed = []
+        release = threading.Event()
+
+        def process(chat_id, text):
+            if text == 'slow':
+                # waits for message of other chat
+                release.wait(5)
+            if text == 'fail':
+                raise RuntimeError('error')
+            processed.append((chat_id, text))
+            if chat_id == 'b':
+                release.set()
+
+        with patch.object(dispatcher_module, 'db', MagicMock()):
+            dispatcher = MessageDispatcher(max_workers=2)
+            dispatcher.submit('a', process, 'a', 'slow')
+            dispatcher.submit('a', process, 'a', 'fail')
+            dispatcher.submit('a', process, 'a', 'next')
+            dispatcher.submit('b', process, 'b', 'fast')
+
+            for _ in range(50):
+                if len(processed) == 3:
+                    break
+                time.sleep(0.1)
+            dispatcher.shutdown()
+
+        # other chat is not blocked, order of messages of the chat is kept
+        assert processed == [('b', 'fast'), ('a', 'slow'), ('a', 'next')]
+
+        stats = dispatcher.stats()
+        assert stats['processed'] == 3
+        assert stats['failed'] == 1
+        assert stats['in_flight'] == 0
+        assert stats['chats'] == 0
+        assert stats['latency_max'] >= stats['latency_avg'] > 0
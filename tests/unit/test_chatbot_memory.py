@@ -0,0 +1,141 @@
+import os
+import tempfile
+
+import pandas as pd
+
+from mindsdb.interfaces.storage import db
+from mindsdb.interfaces.chatbot.memory import HandlerMemory, DBMemory
+from mindsdb.interfaces.chatbot.types import ChatBotMessage
+
+
+CHAT_PARAMS = {
+    'chat_table': {
+        'name': 'messages',
+        'chat_id_col': 'chat_id',
+        'username_col': 'user',
+        'text_col': 'text',
+        'time_col': 'sent_at',
+    }
+}
+
+
+class FakeResponse:
+    def __init__(self, data_frame):
+        self.data_frame = data_frame
+
+
+class FakeChatHandler:
+    def __init__(self):
+        self.messages = []
+        self.queries = []
+
+    def query(self, query):
+        self.queries.append(query)
+        where = query.where if query.where.op == '=' else query.where.args[0]
+        df = pd.DataFrame(self.messages, columns=['chat_id', 'user', 'text', 'sent_at'])
+        # the handler doesn't support filter by time
+        return FakeResponse(df[df.chat_id == where.args[1].value])
+
+
+class StrictChatHandler(FakeChatHandler):
+    def query(self, query):
+        if query.where.op != '=':
+            # like api handlers which can't be filtered by unknown condition
+            raise NotImplementedError(f'Not implemented: {query.where.op}')
+        return super().query(query)
+
+
+class FakeChatTask:
+    bot_id = 1
+
+    def __init__(self, chat_handler=None):
+        self.chat_handler = chat_handler or FakeChatHandler()
+
+
+class TestChatMemory:
+    def test_handler_memory(self):
+        task = FakeChatTask()
+        memory = HandlerMemory(task, CHAT_PARAMS)
+        memory.MAX_DEPTH = 3
+
+        task.chat_handler.messages = [
+            ['a', 'user', 'hi', 1],
+            ['a', 'bot', 'hello', 2],
+            ['b', 'user', 'hi', 1],
+        ]
+        history = memory.get_chat('a').get_history()
+        assert [m.text for m in history] == ['hi', 'hello']
+
+        # only new messages are requested
+        task.chat_handler.messages.append(['a', 'user', 'question', 3])
+        task.chat_handler.messages.append(['a', 'bot', 'answer', 4])
+        history = memory.get_chat('a').get_history()
+        query = task.chat_handler.queries[-1]
+        assert query.where.op == 'and'
+        condition = query.where.args[1]
+        assert condition.op == '>'
+        assert condition.args[1].value == 2
+
+        # ring buffer keeps the last messages
+        assert [m.text for m in history] == ['hello', 'question', 'answer']
+
+        # history from cache
+        chat = memory.get_chat('a')
+        chat.get_history()
+        queries_count = len(task.chat_handler.queries)
+        chat.get_history()
+        assert len(task.chat_handler.queries) == queries_count
+
+    def test_handler_without_time_filter(self):
+        task = FakeChatTask(StrictChatHandler())
+        memory = HandlerMemory(task, CHAT_PARAMS)
+        task.chat_handler.messages = [
+            ['a', 'user', 'hi', 1],
+            ['a', 'bot', 'hello', 2],
+        ]
+        memory.get_chat('a').get_history()
+
+        # query with time condition fails: new messages are selected from the whole chat
+        task.chat_handler.messages.append(['a', 'user', 'question', 3])
+        history = memory.get_chat('a').get_history()
+        assert [m.text for m in history] == ['hi', 'hello', 'question']
+        assert [query.where.op for query in task.chat_handler.queries] == ['=', '=']
+
+    def test_cached_chats_limit(self):
+        task = FakeChatTask()
+        memory = HandlerMemory(task, CHAT_PARAMS)
+        memory.MAX_CACHED_CHATS = 2
+        task.chat_handler.messages = [[chat_id, 'user', 'hi', 1] for chat_id in 'abc']
+
+        for chat_id in 'abc':
+            memory.get_chat(chat_id).get_history()
+        assert list(memory._cache.keys()) == ['b', 'c']
+
+
+class TestDBMemory:
+    def setup_class(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        db.init(f'sqlite:///{os.path.join(cls.tmp_dir.name, "mindsdb.sqlite3.db")}')
+        db.Base.metadata.create_all(db.engine)
+
+    def teardown_class(cls):
+        db.session.remove()
+        db.engine.dispose()
+        cls.tmp_dir.cleanup()
+
+    def test_db_memory(self):
+        memory = DBMemory(FakeChatTask(), CHAT_PARAMS)
+        memory.MAX_DEPTH = 2
+
+        chat = memory.get_chat('a')
+        for text in ('one', 'two', 'three'):
+            chat.add_to_history(ChatBotMessage(ChatBotMessage.Type.DIRECT, text, 'user'))
+
+        # the last messages are loaded from db
+        assert [m.text for m in memory.get_chat('a').get_history()] == ['two', 'three']
+
+        # new messages are added to the cache without reading of db
+        chat.add_to_history(ChatBotMessage(ChatBotMessage.Type.DIRECT, 'four', 'bot'))
+        db.session.query(db.ChatBotsHistory).delete()
+        db.session.commit()
+        assert [m.text for m in memory.get_chat('a').get_history()] == ['three', 'four']
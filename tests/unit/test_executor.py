@@ -1,4 +1,4 @@
-from unittest.mock import patch
+from unittest.mock import patch, MagicMock
 import datetime as dt
 import tempfile
 import pytest
@@ -33,6 +33,85 @@ class Test(BaseExecutorMockPredictor):
         # check sql in query method
         assert mock_handler().query.call_args[0][0].to_string() == 'SELECT * FROM tasks'
 
+    @patch('mindsdb.integrations.handlers.postgres_handler.Handler')
+    def test_integration_select_by_chunks(self, mock_handler):
+
+        data = [[i, 'x'] for i in range(25)]
+        df = pd.DataFrame(data, columns=['a', 'b'])
+        self.set_handler(mock_handler, name='pg', tables={'tasks': df})
+
+        self.command_executor.session.fetch_chunk_size = 10
+        try:
+            ret = self.command_executor.execute_command(parse_sql('select * from pg.tasks'))
+            assert ret.error_code is None
+            chunks = list(ret.data)
+        finally:
+            self.command_executor.session.fetch_chunk_size = None
+
+        assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+        assert sum(chunks, []) == data
+        assert [col.name for col in ret.columns] == ['a', 'b']
+
+    @patch('mindsdb.integrations.handlers.postgres_handler.Handler')
+    def test_integration_select_chunks_not_streamed(self, mock_handler):
+
+        data = [[i, 'x'] for i in range(25)]
+        df = pd.DataFrame(data, columns=['a', 'b'])
+        self.set_handler(mock_handler, name='pg', tables={'tasks': df})
+
+        is_closed = False
+
+        def query_stream_f(query, fetch_size=1000):
+            nonlocal is_closed
+            try:
+                for start in range(0, len(df), fetch_size):
+                    yield df[start:start + fetch_size]
+            finally:
+                is_closed = True
+
+        mock_handler().query_stream.side_effect = query_stream_f
+
+        self.command_executor.session.fetch_chunk_size = 10
+        try:
+            # is not streamed: result is a list of records
+            ret = self.command_executor.execute_command(parse_sql('select * from information_schema.databases'))
+            assert ret.error_code is None
+            assert isinstance(ret.data, list)
+            assert len(ret.data) > 0
+
+            # stream is interrupted by consumer: cursor of the handler is closed
+            ret = self.command_executor.execute_command(parse_sql('select * from pg.tasks'))
+            assert next(ret.data) == data[:10]
+            ret.data.close()
+            assert is_closed
+        finally:
+            self.command_executor.session.fetch_chunk_size = None
+
+    @patch('mindsdb.integrations.handlers.postgres_handler.Handler')
+    def test_plan_cache(self, mock_handler):
+        from mindsdb.api.mysql.mysql_proxy.classes.plan_cache import plan_cache
+
+        df = pd.DataFrame([[1, 'x']], columns=['a', 'b'])
+        self.set_handler(mock_handler, name='pg', tables={'tasks': df})
+
+        plan_hits = plan_cache.stats()['plan_hits']
+        for i in range(2):
+            ret = self.command_executor.execute_command(parse_sql('select * from pg.tasks where a > 0'))
+            assert ret.error_code is None
+        assert plan_cache.stats()['plan_hits'] == plan_hits + 1
+
+        # metadata is changed: plan is not taken from cache
+        self.set_handler(mock_handler, name='pg2', tables={'tasks': df})
+        ret = self.command_executor.execute_command(parse_sql('select * from pg.tasks where a > 0'))
+        assert ret.error_code is None
+        assert plan_cache.stats()['plan_hits'] == plan_hits + 1
+
+        # parsed statements
+        query = plan_cache.parse('select * from pg.tasks where a > 0')
+        query.where = None
+        assert plan_cache.parse('select * from pg.tasks where a > 0').where is not None
+        assert plan_cache.stats()['parse_hits'] > 0
+
     def test_predictor_1_row(self):
         predicted_value = 3.14
         predictor = {
@@ -1150,6 +1229,75 @@ class TestExecutionTools:
         df = pd.DataFrame(d)
         query_df(df, 'select * from models')
 
+    def test_query_df_object_columns(self):
+        # type of value is changed after the first rows, it shouldn't fail on type infer
+        df = pd.DataFrame({
+            'a': [None] * 2000 + ['x'],
+            'b': [1] * 2000 + [None],
+            'c': [1] * 2000 + ['y'],
+        }, dtype=object)
+        res = query_df(df, 'select count(a) a, sum(b) b, max(c) c from df')
+        assert res['a'][0] == 1
+        assert res['b'][0] == 2000
+        assert res['c'][0] == 'y'
+
+    def test_map_reduce_vars_condition(self):
+        from mindsdb.api.mysql.mysql_proxy.classes.sql_query import (
+            split_query_vars, make_vars_condition, join_conditions
+        )
+
+        query = parse_sql("select * from t where x > 1 and g = '$var[g]' and h = '$var[h]'", dialect='mindsdb')
+        var_columns, conditions = split_query_vars(query.where)
+        assert list(var_columns.keys()) == ['g', 'h']
+        assert len(conditions) == 1
+
+        # single variable -> IN
+        query.where = join_conditions(conditions + [
+            make_vars_condition({'g': var_columns['g']}, [{'g': 'a'}, {'g': 'b'}])
+        ], 'and')
+        assert query.where.to_string() == "(x > 1) AND (g IN ('a', 'b'))"
+
+        # several variables
+        groups = [{'g': i, 'h': i * 10} for i in range(5)]
+        query.where = make_vars_condition(var_columns, groups)
+        sql = query.where.to_string()
+        for group in groups:
+            assert f"(g = {group['g']}) AND (h = {group['h']})" in sql
+
+        # variable is used not in equality: can't be rewritten
+        query = parse_sql("select * from t where x > '$var[g]'", dialect='mindsdb')
+        assert split_query_vars(query.where) is None
+
+    def test_map_reduce_batches_result(self):
+        from mindsdb_sql.planner.steps import FetchDataframeStep
+        from mindsdb.api.mysql.mysql_proxy.classes.sql_query import SQLQuery, ResultSet
+
+        df = pd.DataFrame({
+            'g': [3, 1, 2, 1, 3, 2],
+            'x': [10, 11, 12, 13, 14, 15],
+        })
+
+        sql_query = SQLQuery.__new__(SQLQuery)
+        sql_query.session = MagicMock()
+
+        def fetch(step, steps_data):
+            return ResultSet().from_df(query_df(df, step.query), database='db', table_name='t')
+
+        sql_query._fetch_dataframe_step = fetch
+
+        query = parse_sql("select x from t where g = '$var[g]' and x > 10", dialect='mindsdb')
+        step = FetchDataframeStep(integration='db', query=query)
+        # duplicated groups and group without rows
+        vars = [{'g': 2}, {'g': 1}, {'g': 2}, {'g': 5}, {'g': 3}]
+
+        batched = sql_query._map_reduce_fetch(step, vars, [])
+        with patch.object(SQLQuery, '_get_map_reduce_batches', return_value=None):
+            per_group = sql_query._map_reduce_fetch(step, vars, [])
+
+        assert batched.get_column_names() == ['x']
+        assert batched.get_records_raw() == per_group.get_records_raw()
+        assert [r[0] for r in batched.get_records_raw()] == [12, 15, 11, 13, 12, 15, 14]
+
 
 class TestIfExistsIfNotExists(BaseExecutorMockPredictor):
 
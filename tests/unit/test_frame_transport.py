@@ -0,0 +1,65 @@
+import os
+import datetime as dt
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mindsdb.utilities.context import context as ctx
+from mindsdb.utilities.frame_transport import SharedFrame, share_df, unshare_df, df_to_ipc
+from mindsdb.integrations.libs.process_cache import warm_function
+
+pytest.importorskip('pyarrow')
+
+
+def make_df(rows):
+    return pd.DataFrame({
+        'int': np.arange(rows),
+        'float': np.random.random(rows),
+        'str': [f'value_{i}' if i % 3 else None for i in range(rows)],
+        'date': [dt.date(2020, 1, 1 + i % 28) for i in range(rows)]
+    })
+
+
+def add_column(payload, df):
+    df['result'] = df['int'] * 2
+    return df
+
+
+class TestFrameTransport:
+    def test_shared_frame(self):
+        df = make_df(100000)
+        shared_frame = share_df(df)
+        assert isinstance(shared_frame, SharedFrame)
+        assert os.path.exists(shared_frame.path)
+        assert unshare_df(shared_frame).equals(df)
+        assert os.path.exists(shared_frame.path) is False
+
+        # small dataframe is pickled
+        assert share_df(df[:10]) is not None and not isinstance(share_df(df[:10]), SharedFrame)
+
+        # types which are changed in arrow
+        for values in ([1, 'a'], [[1, 2], [3]], [1, None]):
+            df = pd.DataFrame({'a': pd.Series(values * 100000, dtype=object)})
+            assert share_df(df) is df
+            assert df_to_ipc(df) is None
+
+    def test_ipc_bytes(self):
+        from mindsdb.utilities.ml_task_queue.utils import to_bytes, from_bytes
+
+        df = make_df(100).set_index('str')
+        b = to_bytes(df)
+        assert df_to_ipc(df) == b
+        assert from_bytes(b).equals(df)
+
+        for obj in (pd.DataFrame({1: [1]}), {'a': 1}, Exception('error')):
+            assert type(from_bytes(to_bytes(obj))) is type(obj)
+
+    def test_warm_function(self):
+        df = make_df(100000)
+        with ProcessPoolExecutor(1) as pool:
+            result = pool.submit(warm_function, add_column, ctx.dump(), {}, share_df(df)).result()
+        assert isinstance(result, SharedFrame)
+        result = unshare_df(result)
+        assert result['result'].equals(df['int'] * 2)
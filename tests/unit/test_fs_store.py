@@ -0,0 +1,242 @@
+import os
+import hashlib
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from mindsdb.utilities.config import Config
+from mindsdb.utilities.context import context as ctx
+from mindsdb.interfaces.storage import fs
+
+
+class FakeConfig:
+    def __init__(self, permanent_storage):
+        config = Config()
+        self.paths = config.paths
+        self.data = {
+            'paths': config['paths'],
+            'permanent_storage': permanent_storage
+        }
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+
+def read_folder(folder_path: Path) -> dict:
+    return {
+        path.relative_to(folder_path).as_posix(): path.read_bytes()
+        for path in folder_path.rglob('*')
+        if path.is_file() and path.name not in fs.SERVICE_FILES_NAMES
+    }
+
+
+class TestLocalFSStore:
+    def test_generation(self):
+        root = Path(tempfile.mkdtemp(dir=Config().paths['tmp']))
+        store = fs.LocalFSStore()
+        store.storage = str(root / 'storage')
+        src_dir, dst_dir = root / 'src', root / 'dst'
+        src = src_dir / 'resource'
+        (src / 'sub').mkdir(parents=True)
+        (src / 'data.bin').write_bytes(os.urandom(2500))
+        (src / 'sub' / 'text.txt').write_bytes(b'text')
+
+        store.put('resource', str(src_dir))
+        store.get('resource', str(dst_dir))
+        assert read_folder(dst_dir / 'resource') == read_folder(src)
+
+        # fresh copy: folders are not walked and not copied
+        with mock.patch.object(fs, 'get_dir_size') as get_dir_size, \
+                mock.patch.object(fs, 'replace_dir') as replace_dir:
+            store.get('resource', str(dst_dir))
+            assert get_dir_size.call_count == 0
+            assert replace_dir.call_count == 0
+
+        # new generation is copied, removed files are deleted
+        (src / 'sub' / 'text.txt').unlink()
+        (src / 'new.txt').write_bytes(b'new')
+        store.put('resource', str(src_dir))
+        store.get('resource', str(dst_dir))
+        assert read_folder(dst_dir / 'resource') == read_folder(src)
+        assert list(dst_dir.iterdir()) == [dst_dir / 'resource']
+
+    def test_replace_dir(self):
+        for exchange in (True, False):
+            if exchange and fs.renameat2 is None:
+                # atomic swap of folders is not supported
+                continue
+            root = Path(tempfile.mkdtemp(dir=Config().paths['tmp']))
+            src, dst = root / 'src', root / 'dst'
+            src.mkdir()
+            (src / 'new.txt').write_bytes(b'new')
+            dst.mkdir()
+            (dst / 'old.txt').write_bytes(b'old')
+
+            exchange_dirs = fs.exchange_dirs if exchange else lambda *args: False
+            with mock.patch.object(fs, 'exchange_dirs', exchange_dirs), \
+                    mock.patch.object(fs.os, 'replace', wraps=os.replace) as replace:
+                fs.replace_dir(str(src), str(dst))
+                # folder is swapped without the moment when destination is missing
+                assert replace.call_count == (0 if exchange else 2)
+            assert read_folder(dst) == {'new.txt': b'new'}
+            assert sorted(root.iterdir()) == [dst, src]
+
+    def test_push_lock(self):
+        ctx.set_default()
+        file_storage = fs.FileStorage(resource_group=fs.RESOURCE_GROUP.TAB, resource_id=0, sync=False)
+        with mock.patch.object(fs, 'FileLock') as file_lock, \
+                mock.patch.object(file_storage, 'fs_store') as fs_store:
+            file_storage.push()
+            # generation file is written into local folder under exclusive lock
+            file_lock.assert_called_once_with(file_storage.folder_path, mode='w')
+            assert fs_store.put.call_count == 1
+
+
+class TestS3IncrementalFSStore:
+    def test_sync(self):
+        moto = pytest.importorskip('moto')
+        with moto.mock_aws():
+            self._test_sync()
+
+    def test_local_chunks_reuse(self):
+        moto = pytest.importorskip('moto')
+        with moto.mock_aws():
+            self._test_local_chunks_reuse()
+
+    def test_chunks_gc(self):
+        moto = pytest.importorskip('moto')
+        with moto.mock_aws():
+            self._test_chunks_gc()
+
+    @staticmethod
+    def get_config():
+        os.environ.setdefault('AWS_ACCESS_KEY_ID', 'testing')
+        os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'testing')
+        return FakeConfig({
+            'location': 's3',
+            'bucket': 'test-bucket',
+            'incremental': True,
+            'chunk_size': 1024,
+            's3_credentials': {'region_name': 'us-east-1'}
+        })
+
+    def _test_sync(self):
+        config = self.get_config()
+        with mock.patch.object(fs, 'Config', lambda: config):
+            store = fs.FsStore()
+            assert isinstance(store, fs.S3IncrementalFSStore)
+            store.s3.create_bucket(Bucket='test-bucket')
+
+            def count_chunks():
+                response = store.s3.list_objects_v2(Bucket='test-bucket', Prefix='chunks/')
+                return response.get('KeyCount', 0)
+
+            root = Path(tempfile.mkdtemp(dir=Config().paths['tmp']))
+            src_dir, dst_dir = root / 'src', root / 'dst'
+            src = src_dir / 'resource'
+            (src / 'sub').mkdir(parents=True)
+            (src / 'data.bin').write_bytes(os.urandom(2500))
+            (src / 'sub' / 'text.txt').write_bytes(b'a' * 1500)
+            (src / 'empty.txt').write_bytes(b'')
+
+            store.put('resource', src_dir)
+            # 3 chunks of data.bin, 2 chunks of text.txt
+            assert count_chunks() == 5
+
+            store.get('resource', dst_dir)
+            assert read_folder(dst_dir / 'resource') == read_folder(src)
+
+            # only changed chunk is uploaded
+            (src / 'sub' / 'text.txt').write_bytes(b'a' * 1024 + b'b' * 476)
+            (src / 'empty.txt').unlink()
+            store.put('resource', src_dir)
+            # replaced chunk is deleted
+            assert count_chunks() == 5
+
+            # only changed chunk is downloaded, removed file is deleted
+            with mock.patch.object(store.s3, 'download_fileobj', wraps=store.s3.download_fileobj) as download:
+                store.get('resource', dst_dir)
+                assert download.call_count == 1
+            assert read_folder(dst_dir / 'resource') == read_folder(src)
+
+            # resource is not changed: nothing is downloaded
+            with mock.patch.object(store.s3, 'get_object', wraps=store.s3.get_object) as get_object:
+                store.get('resource', dst_dir)
+                assert get_object.call_count == 0
+
+            store.delete('resource')
+            with pytest.raises(Exception):
+                store.s3.head_object(Bucket='test-bucket', Key='resource.manifest.json')
+
+    def _test_local_chunks_reuse(self):
+        with mock.patch.object(fs, 'Config', self.get_config):
+            store = fs.FsStore()
+            store.s3.create_bucket(Bucket='test-bucket')
+
+            root = Path(tempfile.mkdtemp(dir=Config().paths['tmp']))
+            src_dir, dst_dir = root / 'src', root / 'dst'
+            src = src_dir / 'resource'
+            src.mkdir(parents=True)
+            (src / 'a.bin').write_bytes(b'x' * 512 + b'y' * 512)
+
+            store.chunk_size = 512
+            store.put('resource', src_dir)
+            store.get('resource', dst_dir)
+
+            # local file is changed, but its size and mtime are the same
+            dst_file = dst_dir / 'resource' / 'a.bin'
+            stat = dst_file.stat()
+            dst_file.write_bytes(b'z' * 1024)
+            os.utime(dst_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+            # chunk of b.bin is the first chunk of local a.bin, but chunks of local files have other size
+            store.chunk_size = 1024
+            (src / 'b.bin').write_bytes(b'x' * 512)
+            store.put('resource', src_dir)
+            store.get('resource', dst_dir)
+            assert read_folder(dst_dir / 'resource') == read_folder(src)
+
+            # chunks of unchanged local files are reused
+            (src / 'c.bin').write_bytes(b'x' * 512)
+            store.put('resource', src_dir)
+            with mock.patch.object(store.s3, 'download_fileobj', wraps=store.s3.download_fileobj) as download:
+                store.get('resource', dst_dir)
+                assert download.call_count == 0
+            assert read_folder(dst_dir / 'resource') == read_folder(src)
+
+    def _test_chunks_gc(self):
+        with mock.patch.object(fs, 'Config', self.get_config):
+            store = fs.FsStore()
+            store.s3.create_bucket(Bucket='test-bucket')
+
+            def list_chunks():
+                response = store.s3.list_objects_v2(Bucket='test-bucket', Prefix='chunks/')
+                return {item['Key'] for item in response.get('Contents', [])}
+
+            root = Path(tempfile.mkdtemp(dir=Config().paths['tmp']))
+            src_dir = root / 'src'
+            for name in ('res1', 'res2'):
+                (src_dir / name).mkdir(parents=True)
+                # the first chunk is shared by resources
+                (src_dir / name / 'data.bin').write_bytes(b'x' * 1024 + name.encode() * 100)
+                store.put(name, src_dir)
+            assert len(list_chunks()) == 3
+
+            # old chunk of res1 is deleted, shared chunk is kept
+            (src_dir / 'res1' / 'data.bin').write_bytes(b'x' * 1024 + b'new' * 100)
+            store.put('res1', src_dir)
+            assert len(list_chunks()) == 3
+
+            store.delete('res2')
+            assert len(list_chunks()) == 2
+
+            # chunk is deleted by other process while resource is saved: it is uploaded again
+            shared_chunk = store._get_chunk_key(hashlib.sha256(b'x' * 1024).hexdigest())
+            store.s3.delete_object(Bucket='test-bucket', Key=shared_chunk)
+            store.put('res1', src_dir)
+            assert shared_chunk in list_chunks()
+
+            store.delete('res1')
+            assert list_chunks() == set()
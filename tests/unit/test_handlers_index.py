@@ -0,0 +1,102 @@
+import json
+import tempfile
+from pathlib import Path
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+from mindsdb.utilities.config import Config
+from mindsdb.utilities.context import context as ctx
+from mindsdb.interfaces.database import integrations
+from mindsdb.interfaces.database.integrations import IntegrationController, HandlerModules
+
+
+class TestHandlersIndex:
+    def make_controller(self, index_path, environment=None, changed_dirs=()):
+        controller = IntegrationController.__new__(IntegrationController)
+        controller.imported = []
+
+        def import_handler(base_import, handler_dir):
+            # don't import real handlers: only the fact of import is checked
+            controller.imported.append(handler_dir.name)
+            handler_meta = {'name': handler_dir.name, 'import': {'success': True}}
+            controller.handlers_import_status[handler_dir.name] = handler_meta
+            controller.handler_modules.register(handler_dir.name, f'{base_import}{handler_dir.name}')
+            return handler_meta
+
+        def get_dir_fingerprint(handler_dir):
+            return [1, 2 if handler_dir.name in changed_dirs else 1]
+
+        controller.import_handler = import_handler
+        controller._get_handlers_index_path = lambda: index_path
+        controller._get_environment_fingerprint = lambda: environment or {'mindsdb': 'test'}
+        controller._get_handler_dir_fingerprint = get_dir_fingerprint
+        controller._load_handler_modules()
+        return controller
+
+    def test_index(self):
+        index_path = Path(tempfile.mkdtemp(dir=Config().paths['tmp'])) / 'handlers_index.json'
+
+        # empty index: all handlers are imported
+        controller = self.make_controller(index_path)
+        handlers = set(controller.imported)
+        assert len(handlers) > 0
+        assert set(json.loads(index_path.read_text())['handlers']) == handlers
+
+        # index is reused: nothing is imported
+        controller = self.make_controller(index_path)
+        assert controller.imported == []
+        assert set(controller.handlers_import_status) == handlers
+        assert all(name in controller.handler_modules for name in handlers)
+
+        # handler folder is changed: only it is imported
+        changed_dir = sorted(handlers)[0]
+        controller = self.make_controller(index_path, changed_dirs={changed_dir})
+        assert controller.imported == [changed_dir]
+
+        # environment is changed: all handlers are imported
+        controller = self.make_controller(index_path, environment={'mindsdb': 'other'})
+        assert set(controller.imported) == handlers
+        assert json.loads(index_path.read_text())['environment'] == {'mindsdb': 'other'}
+
+        # corrupted index is rebuilt
+        index_path.write_text('{"environment": ')
+        controller = self.make_controller(index_path)
+        assert set(controller.imported) == handlers
+        assert set(json.loads(index_path.read_text())['handlers']) == handlers
+
+    def test_lazy_import_error(self):
+        controller = IntegrationController.__new__(IntegrationController)
+        controller.handlers_import_status = {
+            'broken': {'name': 'broken', 'import': {'success': True, 'folder': 'broken_handler'}}
+        }
+        handler_modules = HandlerModules(controller)
+        handler_modules.register('broken', 'mindsdb.integrations.handlers.not_existing_handler')
+        assert 'broken' in handler_modules
+
+        # import error is reported in import status instead of raising of ImportError
+        assert handler_modules.get('broken') is None
+        import_status = controller.handlers_import_status['broken']['import']
+        assert import_status['success'] is False
+        assert 'not_existing_handler' in import_status['error_message']
+        assert import_status['folder'] == 'broken_handler'
+        assert 'broken' not in handler_modules
+
+    def test_get_broken_handler(self):
+        ctx.set_default()
+        controller = IntegrationController.__new__(IntegrationController)
+        # index says that handler was imported successfully
+        controller.handlers_import_status = {
+            'broken': {'name': 'broken', 'import': {'success': True, 'folder': 'broken_handler'}}
+        }
+        controller.handler_modules = HandlerModules(controller)
+        controller.handler_modules.register('broken', 'mindsdb.integrations.handlers.not_existing_handler')
+        controller._get_integration_record_data = lambda record, show_secrets: {
+            'id': 1, 'name': 'db1', 'engine': 'broken', 'connection_data': {}
+        }
+
+        with patch.object(integrations, 'db', MagicMock()):
+            for _ in range(2):
+                with pytest.raises(Exception, match="Handler 'broken' cannot be used") as e:
+                    controller.get_handler('db1', case_sensitive=True, cached=False)
+                assert 'not_existing_handler' in str(e.value)
@@ -0,0 +1,179 @@
+import threading
+from time import time
+from types import SimpleNamespace
+
+import pytest
+
+from mindsdb.interfaces.database.integrations import HandlersPool, HandlersCache, IntegrationController
+from mindsdb.utilities.context import context as ctx
+
+
+class FakeHandler:
+    def __init__(self, name='test'):
+        self.name = name
+        self.is_connected = True
+        self.checks = 0
+
+    def connect(self):
+        self.is_connected = True
+
+    def disconnect(self):
+        self.is_connected = False
+
+    def check_connection(self):
+        self.checks += 1
+        return SimpleNamespace(success=True)
+
+
+class TestHandlersPool:
+    def test_lease_and_release(self):
+        pool = HandlersPool(min_size=0, max_size=2, wait_timeout=0.1, health_check_interval=30)
+
+        # empty pool: slot is reserved for new handler
+        assert pool.checkout(1) is None
+        handler1 = FakeHandler()
+        pool.checkin_new(1, handler1)
+
+        # the same thread gets the same handler
+        assert pool.checkout(1) is handler1
+
+        assert pool.checkout(2) is None
+        pool.checkin_new(2, FakeHandler())
+
+        # pool is exhausted
+        with pytest.raises(Exception):
+            pool.checkout(3)
+
+        pool.release(1)
+        assert pool.checkout(3) is handler1
+
+        stats = pool.stats()
+        assert stats['active'] == 2
+        assert stats['idle'] == 0
+        assert stats['created'] == 2
+        assert stats['timeouts'] == 1
+
+        # handler of finished thread is returned to pool and closed after ttl
+        pool.clean(ttl=0, alive_threads={2})
+        assert pool.stats()['active'] == 1
+        assert handler1.is_connected is False
+
+    def test_wait_for_release(self):
+        pool = HandlersPool(min_size=0, max_size=1, wait_timeout=5, health_check_interval=30)
+        handler = FakeHandler()
+        pool.checkout(1)
+        pool.checkin_new(1, handler)
+
+        threading.Timer(0.1, pool.release, args=(1,)).start()
+        assert pool.checkout(2) is handler
+        assert pool.stats()['wait_count'] == 1
+
+    def test_health_check_time_is_kept_on_release(self):
+        pool = HandlersPool(min_size=0, max_size=1, wait_timeout=0.1, health_check_interval=30)
+        handler = FakeHandler()
+        pool.checkout(1)
+        pool.checkin_new(1, handler)
+
+        # handler is used for a long time: last health check is expired
+        pool.leased[1]['checked_at'] = time() - 60
+        pool.release(1)
+        assert pool.idle[0]['checked_at'] < time() - 30
+
+        # expired handler is checked before lease
+        assert pool.checkout(1) is handler
+        assert handler.checks == 1
+
+        # it is not checked again until interval is passed
+        pool.release(1)
+        assert pool.checkout(1) is handler
+        assert handler.checks == 1
+
+
+class TestHandlersCache:
+    @staticmethod
+    def get_controller():
+        ctx.set_default()
+        cache = HandlersCache()
+
+        def get_handler(name):
+            handler = cache.get(name)
+            if handler is None:
+                handler = FakeHandler(name)
+                cache.set(handler)
+            return handler
+
+        return SimpleNamespace(handlers_cache=cache, get_handler=get_handler)
+
+    def test_use_handler(self):
+        controller = self.get_controller()
+        cache = controller.handlers_cache
+
+        with IntegrationController.use_handler(controller, 'db1') as handler:
+            assert cache.is_leased('db1')
+        # lease is returned to pool after use
+        assert cache.is_leased('db1') is False
+        assert cache.pools[cache._pool_key('db1')].stats()['idle'] == 1
+
+        # handler which is leased by thread before is not released
+        assert controller.get_handler('db1') is handler
+        with IntegrationController.use_handler(controller, 'db1') as handler2:
+            assert handler2 is handler
+        assert cache.is_leased('db1')
+
+        cache.release('db1')
+        assert cache.is_leased('db1') is False
+
+    def test_release_in_worker_thread(self):
+        controller = self.get_controller()
+        cache = controller.handlers_cache
+        controller.get_handler('db1')
+        controller.get_handler('db2')
+
+        def worker():
+            ctx.set_default()
+            # long-lived thread releases handlers after every unit of work
+            controller.get_handler('db1')
+            cache.release()
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+
+        pool = cache.pools[cache._pool_key('db1')]
+        assert pool.stats()['active'] == 1
+        assert pool.stats()['idle'] == 1
+
+        cache.release()
+        assert cache.is_leased('db1') is False
+        assert cache.is_leased('db2') is False
+
+    def test_first_handler_reserves_slot(self):
+        ctx.set_default()
+        cache = HandlersCache()
+        cache.max_size = 1
+        cache.wait_timeout = 0.1
+        created = threading.Event()
+        release = threading.Event()
+
+        def worker():
+            ctx.set_default()
+            # pool doesn't exist yet: slot is reserved for the handler which is being created
+            assert cache.get('db1') is None
+            created.set()
+            release.wait(timeout=5)
+            cache.set(FakeHandler('db1'))
+            cache.release()
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        created.wait(timeout=5)
+        # pool is full: the other thread can't create one more handler
+        with pytest.raises(Exception, match='Timeout'):
+            cache.get('db1')
+        release.set()
+        thread.join()
+
+        handler = cache.get('db1')
+        assert handler is not None and handler.name == 'db1'
+        assert cache.pools[cache._pool_key('db1')].stats()['created'] == 1
+        cache.release()
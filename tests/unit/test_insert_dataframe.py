@@ -0,0 +1,55 @@
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+from mindsdb_sql.parser.ast import Identifier
+
+from mindsdb.integrations.libs.response import RESPONSE_TYPE
+from mindsdb.integrations.handlers.sqlite_handler.sqlite_handler import SQLiteHandler
+from mindsdb.integrations.handlers.duckdb_handler.duckdb_handler import DuckDBHandler
+
+
+def make_df():
+    return pd.DataFrame({
+        'id': [1, 2, 3, 4, 5],
+        'value': [1.5, np.nan, 3.25, None, 5.0],
+        'name': ['a', None, "it's", 'd', 'e'],
+    })
+
+
+def check_round_trip(handler):
+    df = make_df()
+    res = handler.native_query('CREATE TABLE items (id INTEGER, value DOUBLE, name VARCHAR)')
+    assert res.type != RESPONSE_TYPE.ERROR
+
+    # several batches
+    res = handler.insert_dataframe(Identifier('items'), df, batch_size=2)
+    assert res.type == RESPONSE_TYPE.OK
+
+    res = handler.native_query('SELECT id, value, name FROM items ORDER BY id')
+    assert res.type == RESPONSE_TYPE.TABLE
+    result = res.data_frame
+
+    assert list(result['id']) == [1, 2, 3, 4, 5]
+    assert list(result['name']) == ['a', None, "it's", 'd', 'e']
+    assert result['value'].isna().tolist() == [False, True, False, True, False]
+    assert list(result['value'].dropna()) == [1.5, 3.25, 5.0]
+
+    # wrong column: error response
+    res = handler.insert_dataframe(Identifier('items'), pd.DataFrame({'unknown': [1]}))
+    assert res.type == RESPONSE_TYPE.ERROR
+
+
+class TestInsertDataframe:
+    def test_sqlite(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            handler = SQLiteHandler('test', connection_data={'db_file': os.path.join(tmp_dir, 'test.db')})
+            check_round_trip(handler)
+            handler.disconnect()
+
+    def test_duckdb(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            handler = DuckDBHandler('test', connection_data={'database': os.path.join(tmp_dir, 'test.duckdb')})
+            check_round_trip(handler)
+            handler.disconnect()
@@ -0,0 +1,100 @@
+import time
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mindsdb.utilities.context import context as ctx
+from mindsdb.utilities.ml_task_queue.const import ML_TASK_TYPE, TASK_KEYS_TTL, TASKS_STREAM_NAME
+from mindsdb.utilities.ml_task_queue.utils import RedisKey, DataframeStream
+from mindsdb.utilities.ml_task_queue.task import Task
+from mindsdb.utilities.ml_task_queue.producer import MLTaskProducer
+
+
+@pytest.fixture
+def db():
+    fakeredis = pytest.importorskip('fakeredis')
+    from walrus import Database
+    return Database(connection_pool=fakeredis.FakeRedis().connection_pool)
+
+
+class TestDataframeStream:
+    def test_stream(self, db):
+        redis_key = RedisKey(b'task')
+        db.cache().set(redis_key.status, b'processing', TASK_KEYS_TTL)
+        df = pd.DataFrame({
+            'a': np.arange(25),
+            'b': [str(i) for i in range(25)]
+        })
+
+        def write():
+            stream = DataframeStream(db, redis_key.output, redis_key)
+            # more chunks than can be queued: writer waits for reader
+            stream.write(df, chunk_size=2)
+            stream.end()
+
+        thread = threading.Thread(target=write)
+        thread.start()
+        task = Task(db, redis_key)
+        chunks = list(task.stream())
+        thread.join()
+        assert len(chunks) == 13
+        assert pd.concat(chunks).equals(df)
+        assert db.exists(redis_key.output) == 0
+
+        DataframeStream(db, redis_key.output, redis_key).error(ValueError('wrong value'))
+        with pytest.raises(ValueError):
+            Task(db, redis_key).result()
+
+    def test_timeout(self, db):
+        redis_key = RedisKey(b'task')
+        task = Task(db, redis_key)
+        task._timeout = 1
+        with pytest.raises(Exception, match='Can\'t get data'):
+            task.result()
+
+    def test_chunked_predict(self, db):
+        producer = MLTaskProducer.__new__(MLTaskProducer)
+        producer.db = db
+        producer.stream = db.Stream(TASKS_STREAM_NAME)
+        producer.cache = db.cache()
+        producer.chunk_size = 1
+        # input has more chunks than input and output queues can hold together
+        df = pd.DataFrame({'a': np.arange(40)})
+
+        def consume():
+            # the same as consumer does with chunked prediction: result of chunk is sent before next is read
+            while len(producer.stream.range()) == 0:
+                time.sleep(0.01)
+            _message_id, message = producer.stream.range()[0]
+            redis_key = RedisKey(message[b'redis_key'])
+            output_stream = DataframeStream(db, redis_key.output, redis_key)
+            for chunk in DataframeStream(db, redis_key.input, redis_key):
+                output_stream.write(chunk * 2, chunk_size=1)
+            output_stream.end()
+
+        consumer = threading.Thread(target=consume, daemon=True)
+        consumer.start()
+        result = {}
+
+        def predict():
+            ctx.set_default()
+            task = producer.apply_async(ML_TASK_TYPE.PREDICT, 1, {}, df)
+            result['df'] = task.result()
+
+        thread = threading.Thread(target=predict, daemon=True)
+        thread.start()
+        thread.join(timeout=30)
+        assert thread.is_alive() is False
+        assert result['df']['a'].tolist() == (df['a'] * 2).tolist()
+
+    def test_is_chunked_predict(self):
+        df = pd.DataFrame({'a': [1]})
+
+        class Record:
+            learn_args = {'timeseries_settings': {'is_timeseries': True}}
+
+        assert MLTaskProducer.is_chunked_predict(ML_TASK_TYPE.PREDICT, {}, df) is True
+        assert MLTaskProducer.is_chunked_predict(ML_TASK_TYPE.LEARN, {}, df) is False
+        assert MLTaskProducer.is_chunked_predict(ML_TASK_TYPE.PREDICT, {'predictor_record': Record()}, df) is False
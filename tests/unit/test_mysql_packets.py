@@ -0,0 +1,32 @@
+import datetime as dt
+import logging
+
+from mindsdb.api.mysql.mysql_proxy.data_types.mysql_packets import ResultsetRowPacket
+
+
+class FakeSession:
+    def __init__(self, sequence_number):
+        self.packet_sequence_number = sequence_number
+        self.logging = logging.getLogger(__name__)
+
+
+class TestResultsetRowPacket:
+    def test_encode_rows(self):
+        rows = [
+            [1, 'abc', None, 2.5, dt.datetime(2020, 1, 1)],
+            ['x' * 300, 'ю' * 100, '', True, 'y' * 70000],
+        ] * 150
+
+        # packets created one by one
+        session = FakeSession(250)
+        expected = b''
+        for row in rows:
+            expected += ResultsetRowPacket(data=row, session=session).accum()
+            session.packet_sequence_number = (session.packet_sequence_number + 1) % 256
+
+        max_lengths = [1] * 5
+        string, next_seq = ResultsetRowPacket.encode_rows(rows, 250, max_lengths)
+
+        assert bytes(string) == expected
+        assert next_seq == session.packet_sequence_number
+        assert max_lengths == [300, 200, 1, 4, 70000]
@@ -0,0 +1,71 @@
+import threading
+
+import pandas as pd
+import pytest
+
+from mindsdb.integrations.libs.predict_batcher import PredictBatcher
+
+
+class TestPredictBatcher:
+    def run_requests(self, batcher, predict_fn, values):
+        results = {}
+        barrier = threading.Barrier(len(values))
+
+        def request(value):
+            barrier.wait()
+            try:
+                results[value] = batcher.predict('model', pd.DataFrame({'x': [value]}), predict_fn)
+            except Exception as e:
+                results[value] = e
+
+        threads = [threading.Thread(target=request, args=(value,)) for value in values]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_batching(self):
+        batcher = PredictBatcher(window_ms=200, max_rows=100)
+        calls = []
+
+        def predict_fn(df):
+            calls.append(len(df))
+            if 3 in df['x'].values:
+                raise Exception('wrong value')
+            return pd.DataFrame({'y': df['x'] * 2})
+
+        results = self.run_requests(batcher, predict_fn, list(range(3)))
+        assert calls == [3]
+        for value, result in results.items():
+            assert result['y'].tolist() == [value * 2]
+
+        # error of one request: requests are predicted separately
+        calls.clear()
+        results = self.run_requests(batcher, predict_fn, list(range(4)))
+        assert calls[0] == 4 and len(calls) == 5
+        assert isinstance(results[3], Exception)
+        assert results[2]['y'].tolist() == [4]
+
+        stats = batcher.stats()
+        assert stats['requests'] == 7
+        assert stats['batches'] == 2
+        assert stats['fallbacks'] == 1
+        assert stats['batch_size']['<=4'] == 2
+
+    def test_max_rows(self):
+        # full batch does not wait for the window
+        batcher = PredictBatcher(window_ms=10000, max_rows=2)
+        calls = []
+
+        def predict_fn(df):
+            calls.append(len(df))
+            return df
+
+        results = self.run_requests(batcher, predict_fn, [1, 2])
+        assert calls == [2]
+        assert sorted(x['x'][0] for x in results.values()) == [1, 2]
+
+        batcher = PredictBatcher(window_ms=1, max_rows=2)
+        with pytest.raises(ZeroDivisionError):
+            batcher.predict('model', pd.DataFrame({'x': [1]}), lambda df: 1 / 0)
@@ -61,3 +61,84 @@ class Test(BaseExecutorMockPredictor):
 
         predict_args = self.mock_predict.call_args[1]['params']
         assert predict_args == {'p1': 1, 'p2': [1,2]}
+
+
+class TestCacheRows:
+
+    def test_predict_unique_rows(self):
+        from mindsdb.integrations.libs.ml_exec_base import predict_unique_rows
+
+        calls = []
+
+        def predict_f(df):
+            calls.append(len(df))
+            return pd.DataFrame({'p': df['a'] * 10, '__mindsdb_row_id': df['__mindsdb_row_id']})
+
+        df = pd.DataFrame({
+            'a': [1, 2, 1, 1, 2],
+            'b': ['x', 'y', 'x', 'x', 'y'],
+            '__mindsdb_row_id': [1, 2, 3, 4, 5],
+        })
+        # id of model has to be unique for the test: rows cache is global
+        model_id = -1000
+
+        predictions = predict_unique_rows(df, model_id, predict_f)
+        assert calls == [2]
+        assert list(predictions['p']) == [10, 20, 10, 10, 20]
+
+        # known rows are not predicted again
+        df = pd.DataFrame({
+            'a': [2, 3],
+            'b': ['y', 'z'],
+            '__mindsdb_row_id': [6, 7],
+        })
+        predictions = predict_unique_rows(df, model_id, predict_f)
+        assert calls == [2, 1]
+        assert list(predictions['p']) == [20, 30]
+
+    def test_predict_unique_rows_scope(self):
+        from mindsdb.integrations.libs.ml_exec_base import predict_unique_rows
+
+        calls = []
+
+        def predict_f(df):
+            calls.append(len(df))
+            return pd.DataFrame({'p': [str(x) for x in df.to_dict(orient='records')]})
+
+        model_id = -1001
+        df = pd.DataFrame({'a': [1], 'b': [2]})
+        assert predict_unique_rows(df, model_id, predict_f)['p'][0] == str({'a': 1, 'b': 2})
+        assert calls == [1]
+
+        # columns are swapped
+        df = pd.DataFrame({'b': [1], 'a': [2]})
+        assert predict_unique_rows(df, model_id, predict_f)['p'][0] == str({'b': 1, 'a': 2})
+        assert calls == [1, 1]
+
+        # the same row with other column order is known
+        df = pd.DataFrame({'b': [2], 'a': [1]})
+        predict_unique_rows(df, model_id, predict_f)
+        assert calls == [1, 1]
+
+        # column is renamed
+        df = pd.DataFrame({'a': [1], 'c': [2]})
+        assert predict_unique_rows(df, model_id, predict_f)['p'][0] == str({'a': 1, 'c': 2})
+        assert calls == [1, 1, 1]
+
+        # other type of column
+        df = pd.DataFrame({'a': [1.0], 'b': [2]})
+        predict_unique_rows(df, model_id, predict_f)
+        assert calls == [1, 1, 1, 1]
+
+        # other params of prediction
+        df = pd.DataFrame({'a': [1], 'b': [2]})
+        args = {'predict_params': {'prompt_template': 'x'}}
+        predict_unique_rows(df, model_id, predict_f, args)
+        assert calls == [1, 1, 1, 1, 1]
+        predict_unique_rows(df, model_id, predict_f, args)
+        assert calls == [1, 1, 1, 1, 1]
+
+        # values can't be hashed: all rows are predicted
+        df = pd.DataFrame({'a': [{'x': 1}, {'x': 1}], 'b': [[1], [1]]})
+        assert len(predict_unique_rows(df, model_id, predict_f)) == 2
+        assert calls == [1, 1, 1, 1, 1, 2]
@@ -0,0 +1,213 @@
+import os
+import time
+import signal
+from unittest import mock
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from mindsdb.utilities.ml_task_queue.const import ML_TASK_TYPE
+from mindsdb.integrations.libs import process_cache as process_cache_module
+from mindsdb.integrations.libs.process_cache import ProcessCache
+
+
+class FakeProcess:
+    def __init__(self, on_task_done):
+        self.task = None
+        self.markers = []
+        self.last_usage_at = time.time()
+        self._on_task_done = on_task_done
+        self.broken = False
+        self.fail_submit = False
+        self.is_stopped = False
+
+    def ready(self):
+        if self.broken:
+            return False
+        return self.task is None or self.task.done()
+
+    def is_broken(self):
+        return self.broken
+
+    def add_marker(self, marker):
+        if marker not in self.markers:
+            self.markers.append(marker)
+
+    def has_marker(self, marker):
+        return marker in self.markers
+
+    def is_marked(self):
+        return len(self.markers) > 0
+
+    def markers_count(self):
+        return len(self.markers)
+
+    def apply_async(self, func, *args):
+        if self.fail_submit:
+            # process is killed while it is idle
+            self.broken = True
+            raise BrokenProcessPool('process is killed')
+        self.task = Future()
+        self.task.add_done_callback(lambda _task: self._on_task_done(self))
+        return self.task
+
+    def shutdown(self):
+        self.is_stopped = True
+
+
+def fake_predict(payload, dataframe):
+    return 'ok'
+
+
+def predict_payload():
+    return {
+        'handler_meta': {'module_path': 'json', 'engine': 'dummy'},
+        'context': {'company_id': None}
+    }
+
+
+def wait_for(condition, timeout=5):
+    start = time.time()
+    while condition() is False:
+        assert time.time() - start < timeout
+        time.sleep(0.01)
+
+
+class TestProcessCache:
+    @staticmethod
+    def get_cache():
+        cache = ProcessCache()
+        cache._settings = {
+            'ttl': 120,
+            'max_processes': 2,
+            'max_model_concurrency': 1,
+            'max_memory_usage': 1.1,
+            'preload': {}
+        }
+        return cache
+
+    def test_scheduling(self):
+        cache = self.get_cache()
+        processes = []
+
+        def start_process(_handler_module):
+            process = FakeProcess(cache._process_done_callback)
+            processes.append(process)
+            return process
+
+        cache._start_process = start_process
+
+        def predict(model_id):
+            payload = {
+                'handler_meta': {'module_path': 'dummy', 'engine': 'dummy'},
+                'context': {'company_id': None}
+            }
+            return cache.apply_async(ML_TASK_TYPE.PREDICT, model_id, payload)
+
+        task1 = predict(1)
+        # limit of concurrency of the model: waiting
+        task2 = predict(1)
+        task3 = predict(2)
+        # limit of processes: waiting
+        task4 = predict(3)
+        assert len(processes) == 2
+        assert cache.stats()['queue_size'] == 2
+
+        # queued task of model 1 goes to the process with loaded model
+        processes[0].task.set_result('result1')
+        assert task1.result(timeout=5) == 'result1'
+        wait_for(lambda: processes[0].ready() is False)
+        assert cache.stats()['queue_size'] == 1
+        assert cache.stats()['affinity_hits'] == 1
+
+        processes[1].task.set_result('result3')
+        assert task3.result(timeout=5) == 'result3'
+        wait_for(lambda: cache.stats()['queue_size'] == 0)
+        assert processes[1].markers == [(2, None), (3, None)]
+
+        processes[0].task.set_result('result2')
+        processes[1].task.set_exception(RuntimeError('error4'))
+        assert task2.result(timeout=5) == 'result2'
+        assert isinstance(task4.exception(timeout=5), RuntimeError)
+
+        stats = cache.stats()
+        assert stats['running_models'] == 0
+        assert stats['handlers']['dummy'] == {'processes': 2, 'busy': 0, 'models': 3}
+        cache._stop_clean()
+
+    def test_clean(self):
+        cache = self.get_cache()
+        cache._is_memory_exhausted = lambda: False
+        broken, expired, used, unused = [FakeProcess(cache._process_done_callback) for _ in range(4)]
+        for process in (broken, expired, used):
+            process.add_marker((1, None))
+        expired.last_usage_at = time.time() - 1000
+        cache.cache['dummy'] = {
+            'handler_module': None,
+            'processes': [broken, expired, used, unused]
+        }
+
+        # process is broken while task is running
+        broken.apply_async(None)
+        broken.broken = True
+
+        cache._clean_processes()
+        assert cache.cache['dummy']['processes'] == [used, unused]
+        assert broken.is_stopped and expired.is_stopped
+        assert cache.stats()['processes_stopped'] == 2
+        cache._stop_clean()
+
+    def test_submit_to_broken_process(self):
+        cache = self.get_cache()
+        processes = []
+
+        def start_process(_handler_module):
+            process = FakeProcess(cache._process_done_callback)
+            processes.append(process)
+            return process
+
+        cache._start_process = start_process
+
+        task1 = cache.apply_async(ML_TASK_TYPE.PREDICT, 1, predict_payload())
+        processes[0].task.set_result('result1')
+        assert task1.result(timeout=5) == 'result1'
+
+        # the error is passed to the caller, broken process is removed
+        processes[0].fail_submit = True
+        task2 = cache.apply_async(ML_TASK_TYPE.PREDICT, 1, predict_payload())
+        assert isinstance(task2.exception(timeout=5), BrokenProcessPool)
+        assert cache.cache['dummy']['processes'] == []
+        assert processes[0].is_stopped
+        assert cache.stats()['running_models'] == 0
+
+        # next task gets new process
+        task3 = cache.apply_async(ML_TASK_TYPE.PREDICT, 1, predict_payload())
+        processes[1].task.set_result('result3')
+        assert task3.result(timeout=5) == 'result3'
+        cache._stop_clean()
+
+    def test_killed_idle_process(self):
+        if os.name != 'posix':
+            pytest.skip('SIGKILL is required')
+        cache = self.get_cache()
+        with mock.patch.object(process_cache_module, 'predict_process', fake_predict):
+            task = cache.apply_async(ML_TASK_TYPE.PREDICT, 1, predict_payload())
+            assert task.result(timeout=30) == 'ok'
+
+            process = cache.cache['dummy']['processes'][0]
+            assert process.ready() and process.is_broken() is False
+            for pid in list(process.pool._processes):
+                os.kill(pid, signal.SIGKILL)
+            wait_for(process.is_broken, timeout=10)
+            assert process.ready() is False
+
+            # dead process is replaced by new one
+            task = cache.apply_async(ML_TASK_TYPE.PREDICT, 1, predict_payload())
+            assert task.result(timeout=30) == 'ok'
+            assert process not in cache.cache['dummy']['processes']
+            assert cache.stats()['processes_started'] == 2
+
+        for process in cache.cache['dummy']['processes']:
+            process.shutdown()
+        cache._stop_clean()
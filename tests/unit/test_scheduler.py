@@ -0,0 +1,95 @@
+import time
+import threading
+import datetime as dt
+from unittest.mock import patch, MagicMock
+
+from mindsdb.interfaces.jobs import scheduler as scheduler_module
+from mindsdb.interfaces.jobs.scheduler import Scheduler
+
+
+class FakeRecord:
+    def __init__(self, id):
+        self.id = id
+        self.name = f'job{id}'
+        self.next_run_at = dt.datetime.now()
+
+
+class FakeJobsExecutor:
+    records = []
+    barrier = None
+
+    def get_next_tasks(self):
+        return self.records
+
+    def lock_record(self, record_id):
+        return record_id * 10
+
+    def execute_task_local(self, record_id, history_id):
+        # all jobs have to be started at the same time to pass the barrier
+        self.barrier.wait(timeout=5)
+
+
+class TestScheduler:
+    def test_concurrent_jobs(self):
+        FakeJobsExecutor.records = [FakeRecord(i) for i in range(1, 4)]
+        FakeJobsExecutor.barrier = threading.Barrier(3)
+
+        scheduler = Scheduler({'jobs': {'max_workers': 3}})
+        with patch.object(scheduler_module, 'JobsExecutor', FakeJobsExecutor), \
+                patch.object(scheduler_module, 'db', MagicMock()):
+            start = time.time()
+            scheduler.check_timetable()
+            assert time.time() - start < 5
+
+        stats = scheduler.stats()
+        assert stats['dispatched'] == 3
+        assert stats['completed'] == 3
+        assert stats['failed'] == 0
+        assert stats['running'] == 0
+        scheduler.stop_thread()
+
+    def test_max_workers(self):
+        FakeJobsExecutor.records = [FakeRecord(i) for i in range(1, 4)]
+        FakeJobsExecutor.barrier = threading.Barrier(1)
+
+        scheduler = Scheduler({'jobs': {'max_workers': 1}})
+        scheduler._running[1] = 10
+        with patch.object(scheduler_module, 'JobsExecutor', FakeJobsExecutor), \
+                patch.object(scheduler_module, 'db', MagicMock()):
+            # pool is busy with running job
+            scheduler.check_timetable()
+        assert scheduler.stats()['dispatched'] == 0
+        scheduler.stop_thread()
+
+    def test_job_locked_by_other_instance(self):
+        record = FakeRecord(1)
+        record.next_run_at = dt.datetime.now() - dt.timedelta(seconds=60)
+
+        class LockedJobsExecutor(FakeJobsExecutor):
+            records = [record]
+
+            def get_next_tasks(self):
+                return [r for r in self.records if r.next_run_at < dt.datetime.now()]
+
+            def get_next_run_at(self, exclude_ids=None):
+                dates = [r.next_run_at for r in self.records if r.id not in (exclude_ids or [])]
+                return min(dates) if dates else None
+
+            def lock_record(self, record_id):
+                # job is run by other instance
+                return None
+
+        scheduler = Scheduler({'jobs': {'max_workers': 2}})
+        with patch.object(scheduler_module, 'JobsExecutor', LockedJobsExecutor), \
+                patch.object(scheduler_module, 'db', MagicMock()):
+            scheduler.check_timetable(wait=False)
+            assert scheduler.stats()['dispatched'] == 0
+            # due job which can't be locked doesn't wake scheduler up immediately
+            assert scheduler._get_sleep_time(30) >= 30
+
+            # job is rescheduled by other instance
+            record.next_run_at = dt.datetime.now() + dt.timedelta(seconds=5)
+            scheduler.check_timetable(wait=False)
+            assert scheduler._locked_elsewhere == {}
+            assert 0 < scheduler._get_sleep_time(30) <= 5
+        scheduler.stop_thread()
@@ -0,0 +1,85 @@
+import os
+import tempfile
+from unittest.mock import patch
+
+import sqlalchemy as sa
+
+from mindsdb.interfaces.storage import db
+from mindsdb.interfaces.tasks import task_monitor
+from mindsdb.interfaces.tasks.task_monitor import TaskMonitor
+
+
+class FakeTaskThread:
+    def __init__(self, task_id):
+        self.task_id = task_id
+        self.stopped = False
+
+    def start(self):
+        pass
+
+    def stop(self):
+        self.stopped = True
+
+    def join(self, timeout=None):
+        pass
+
+    def is_alive(self):
+        return not self.stopped
+
+
+class TestTaskMonitor:
+    def setup_class(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        db.init(f'sqlite:///{os.path.join(cls.tmp_dir.name, "mindsdb.sqlite3.db")}')
+        db.Base.metadata.create_all(db.engine)
+
+    def teardown_class(cls):
+        db.session.remove()
+        db.engine.dispose()
+        cls.tmp_dir.cleanup()
+
+    def test_check_tasks(self):
+        db.session.add_all([
+            db.Tasks(object_type='chatbot', object_id=i, active=True)
+            for i in range(3)
+        ])
+        db.session.commit()
+
+        statements = []
+        sa.event.listen(db.engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+        with patch.object(task_monitor, 'TaskThread', FakeTaskThread):
+            monitor = TaskMonitor()
+            monitor.check_tasks()
+            assert len(monitor._active_tasks) == 3
+            threads = dict(monitor._active_tasks)
+            # tasks were changed by lock: one more check
+            monitor.check_tasks()
+
+            # nothing is changed: only generation is checked and heartbeat is written
+            statements.clear()
+            monitor.check_tasks()
+            assert len(statements) == 2
+            assert statements[1].startswith('UPDATE tasks SET alive_time')
+
+            # reload task
+            task = db.session.query(db.Tasks).filter(db.Tasks.object_id == 1).first()
+            task.reload = True
+            db.session.commit()
+            task_id = task.id
+
+            monitor.check_tasks()
+            assert threads[task_id].stopped
+            assert task_id not in monitor._active_tasks
+
+            # is started again on the next check
+            monitor.check_tasks()
+            assert monitor._active_tasks[task_id] is not threads[task_id]
+            assert db.session.query(db.Tasks).get(task_id).reload is False
+
+            # deactivate task
+            task = db.session.query(db.Tasks).filter(db.Tasks.object_id == 2).first()
+            task.active = False
+            db.session.commit()
+            monitor.check_tasks()
+            assert len(monitor._active_tasks) == 2
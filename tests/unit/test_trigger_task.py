@@ -0,0 +1,84 @@
+import time
+import threading
+from unittest import mock
+
+from mindsdb_sql import parse_sql
+from mindsdb_sql.parser.ast import Data
+from mindsdb_sql.planner.utils import query_traversal
+
+from mindsdb.interfaces.triggers import trigger_task
+from mindsdb.interfaces.triggers.trigger_task import TriggerTask
+
+
+class FakeExecutor:
+    def __init__(self, delay=0):
+        self.batches = []
+        self.delay = delay
+
+    def execute_command(self, query):
+        def find_data(node, **kwargs):
+            if isinstance(node, Data):
+                self.batches.append([row['x'] for row in node.data])
+
+        query_traversal(query, find_data)
+        time.sleep(self.delay)
+        return mock.Mock(error_code=None)
+
+
+class TestTriggerTask:
+    def make_task(self, executor, batch_max_rows, batch_max_latency, max_buffered_rows):
+        task = TriggerTask(task_id=1, object_id=1)
+        task.batch_max_rows = batch_max_rows
+        task.batch_max_latency = batch_max_latency
+        task.max_buffered_rows = max_buffered_rows
+        task.query = task._prepare_query(parse_sql('insert into tbl (select * from TABLE_DELTA)', dialect='mindsdb'))
+        task.command_executor = executor
+        task._stop_event = threading.Event()
+        return task
+
+    def run_task(self, task, rows):
+        with mock.patch.object(trigger_task.db, 'session'):
+            thread = threading.Thread(target=task._flush_worker)
+            thread.start()
+            for row in rows:
+                task._callback(row)
+            with task._condition:
+                task._is_finished = True
+                task._condition.notify_all()
+            thread.join()
+
+    def test_batches(self):
+        executor = FakeExecutor()
+        task = self.make_task(executor, batch_max_rows=10, batch_max_latency=10, max_buffered_rows=100)
+        self.run_task(task, [{'x': i} for i in range(25)])
+        assert executor.batches == [list(range(10)), list(range(10, 20)), list(range(20, 25))]
+        # prepared query is not changed
+        assert task._delta_rows == []
+
+    def test_latency(self):
+        executor = FakeExecutor()
+        task = self.make_task(executor, batch_max_rows=10, batch_max_latency=0.1, max_buffered_rows=100)
+
+        def rows():
+            yield {'x': 1}
+            yield {'x': 2}
+            time.sleep(0.5)
+            yield {'x': 3}
+
+        self.run_task(task, rows())
+        assert executor.batches == [[1, 2], [3]]
+
+    def test_backpressure(self):
+        executor = FakeExecutor(delay=0.05)
+        task = self.make_task(executor, batch_max_rows=2, batch_max_latency=0.01, max_buffered_rows=4)
+        buffer_sizes = []
+        original_callback = task._callback
+
+        def callback(row):
+            original_callback(row)
+            buffer_sizes.append(len(task._buffer))
+
+        task._callback = callback
+        self.run_task(task, [{'x': i} for i in range(20)])
+        assert max(buffer_sizes) <= 4
+        assert sum(executor.batches, []) == list(range(20))